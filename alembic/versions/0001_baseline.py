@@ -0,0 +1,151 @@
+"""Baseline schema
+
+Creates the original tables. Databases created before migrations existed
+already have them (via create_all), so each table is only created if missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _lookup_table(name: str) -> None:
+    op.create_table(
+        name,
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(100), nullable=False, unique=True),
+    )
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "brew_templates" not in existing:
+        op.create_table(
+            "brew_templates",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("name", sa.String(200), nullable=False, unique=True),
+            sa.Column("roaster", sa.String(200)),
+            sa.Column("bean_name", sa.String(200)),
+            sa.Column("bean_origin", sa.String(200)),
+            sa.Column("bean_process", sa.String(100)),
+            sa.Column("roast_date", sa.Date),
+            sa.Column("roast_level", sa.String(50)),
+            sa.Column("flavor_notes_expected", sa.Text),
+            sa.Column("bean_amount_grams", sa.Float),
+            sa.Column("grind_setting", sa.String(20)),
+            sa.Column("grinder", sa.String(100)),
+            sa.Column("bloom", sa.Boolean),
+            sa.Column("bloom_time_seconds", sa.Integer),
+            sa.Column("bloom_water_ml", sa.Float),
+            sa.Column("water_amount_ml", sa.Float),
+            sa.Column("water_temp_f", sa.Float),
+            sa.Column("water_temp_c", sa.Float),
+            sa.Column("brew_method", sa.String(100)),
+            sa.Column("brew_device", sa.String(100)),
+            sa.Column("brew_time_seconds", sa.Integer),
+            sa.Column("water_filter_type", sa.String(100)),
+            sa.Column("altitude_ft", sa.Integer),
+            sa.Column("notes", sa.Text),
+            sa.Column("created_at", sa.DateTime),
+            sa.Column("updated_at", sa.DateTime),
+        )
+
+    if "brews" not in existing:
+        op.create_table(
+            "brews",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("brew_date", sa.Date, nullable=False),
+            sa.Column("roaster", sa.String(200), nullable=False),
+            sa.Column("bean_name", sa.String(200), nullable=False),
+            sa.Column("bean_origin", sa.String(200)),
+            sa.Column("bean_process", sa.String(100)),
+            sa.Column("roast_date", sa.Date),
+            sa.Column("roast_level", sa.String(50)),
+            sa.Column("flavor_notes_expected", sa.Text),
+            sa.Column("bean_amount_grams", sa.Float, nullable=False),
+            sa.Column("grind_setting", sa.String(20)),
+            sa.Column("grinder", sa.String(100)),
+            sa.Column("bloom", sa.Boolean),
+            sa.Column("bloom_time_seconds", sa.Integer),
+            sa.Column("bloom_water_ml", sa.Float),
+            sa.Column("water_amount_ml", sa.Float, nullable=False),
+            sa.Column("water_temp_f", sa.Float),
+            sa.Column("water_temp_c", sa.Float),
+            sa.Column("brew_method", sa.String(100), nullable=False),
+            sa.Column("brew_device", sa.String(100)),
+            sa.Column("brew_time_seconds", sa.Integer),
+            sa.Column("water_filter_type", sa.String(100)),
+            sa.Column("altitude_ft", sa.Integer),
+            sa.Column("notes", sa.Text),
+            sa.Column(
+                "template_id", sa.Integer,
+                sa.ForeignKey("brew_templates.id", ondelete="SET NULL"),
+            ),
+            sa.Column("created_at", sa.DateTime),
+            sa.Column("updated_at", sa.DateTime),
+        )
+
+    if "ratings" not in existing:
+        op.create_table(
+            "ratings",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column(
+                "brew_id", sa.Integer,
+                sa.ForeignKey("brews.id", ondelete="CASCADE"), unique=True, nullable=False,
+            ),
+            sa.Column("overall_score", sa.Float, nullable=False),
+            sa.Column("bitterness", sa.Float),
+            sa.Column("acidity", sa.Float),
+            sa.Column("sweetness", sa.Float),
+            sa.Column("body", sa.Float),
+            sa.Column("aroma", sa.Float),
+            sa.Column("aftertaste", sa.Float),
+            sa.Column("flavor_notes_experienced", sa.Text),
+            sa.Column("comments", sa.Text),
+        )
+
+    if "recommendation_rules" not in existing:
+        op.create_table(
+            "recommendation_rules",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("condition_field", sa.String(100), nullable=False),
+            sa.Column("condition_operator", sa.String(10), nullable=False),
+            sa.Column("condition_value", sa.String(50), nullable=False),
+            sa.Column("suggestion", sa.Text, nullable=False),
+            sa.Column("category", sa.String(100)),
+        )
+
+    for name in ("flavor_notes", "brew_devices", "grinders", "brew_methods"):
+        if name not in existing:
+            _lookup_table(name)
+
+    if "bean_inventory" not in existing:
+        op.create_table(
+            "bean_inventory",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("bean_name", sa.String(200), nullable=False),
+            sa.Column("roaster", sa.String(200)),
+            sa.Column("initial_amount_grams", sa.Float, nullable=False),
+            sa.Column("created_at", sa.DateTime),
+            sa.Column("updated_at", sa.DateTime),
+            sa.UniqueConstraint("bean_name", "roaster", name="uq_bean_roaster"),
+        )
+
+
+def downgrade() -> None:
+    for name in (
+        "bean_inventory", "brew_methods", "grinders", "brew_devices", "flavor_notes",
+        "recommendation_rules", "ratings", "brews", "brew_templates",
+    ):
+        op.drop_table(name)
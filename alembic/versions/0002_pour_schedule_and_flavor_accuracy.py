@@ -0,0 +1,47 @@
+"""Add per-pour schedule columns and flavor note accuracy
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+POUR_COLUMNS = {
+    "bloom_pour_time_seconds": sa.Integer(),
+    "first_pour_grams": sa.Integer(),
+    "first_pour_time_seconds": sa.Integer(),
+    "second_pour_grams": sa.Integer(),
+    "second_pour_time_seconds": sa.Integer(),
+    "final_pour_grams": sa.Integer(),
+    "final_pour_time_seconds": sa.Integer(),
+    "pour_method": sa.String(50),
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    brew_cols = {c["name"] for c in inspector.get_columns("brews")}
+    for name, col_type in POUR_COLUMNS.items():
+        if name not in brew_cols:
+            op.add_column("brews", sa.Column(name, col_type, nullable=True))
+
+    rating_cols = {c["name"] for c in inspector.get_columns("ratings")}
+    if "flavor_notes_accuracy" not in rating_cols:
+        op.add_column("ratings", sa.Column("flavor_notes_accuracy", sa.Float, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("ratings") as batch:
+        batch.drop_column("flavor_notes_accuracy")
+    with op.batch_alter_table("brews") as batch:
+        for name in reversed(list(POUR_COLUMNS)):
+            batch.drop_column(name)
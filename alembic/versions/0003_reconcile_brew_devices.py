@@ -0,0 +1,43 @@
+"""Drop the legacy coffee_inventory table and reconcile brew_devices
+
+brew.brew_device is stored as a plain string, so removing lookup rows does
+not affect existing brews; it only changes what the dropdown offers.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DESIRED_DEVICES = ["Flair Espresso", "Chemex", "V60 01", "V60 02", "Kalita Wave 185"]
+RETIRED_DEVICES = [
+    "V60", "Kalita Wave", "AeroPress", "French Press", "Moka Pot",
+    "Clever Dripper", "Origami", "Fellow Stagg", "Siphon",
+    "Breville Barista Express",
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if "coffee_inventory" in sa.inspect(conn).get_table_names():
+        op.drop_table("coffee_inventory")
+
+    devices = sa.table("brew_devices", sa.column("name", sa.String))
+    conn.execute(devices.delete().where(devices.c.name.in_(RETIRED_DEVICES)))
+    present = {r[0] for r in conn.execute(sa.select(devices.c.name))}
+    missing = [{"name": n} for n in DESIRED_DEVICES if n not in present]
+    if missing:
+        conn.execute(devices.insert(), missing)
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,51 @@
+"""Add rating_rollups and data_version tables
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "rating_rollups" not in existing:
+        op.create_table(
+            "rating_rollups",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("day", sa.Date, nullable=False),
+            sa.Column("bean_name", sa.String(200), nullable=False),
+            sa.Column("grinder", sa.String(100)),
+            sa.Column("brew_method", sa.String(100), nullable=False),
+            sa.Column("metric", sa.String(50), nullable=False),
+            sa.Column("count", sa.Integer, nullable=False),
+            sa.Column("total", sa.Float, nullable=False),
+            sa.Column("total_sq", sa.Float, nullable=False),
+        )
+        op.create_index("ix_rating_rollups_metric_day", "rating_rollups", ["metric", "day"])
+        op.create_index("ix_rating_rollups_bucket", "rating_rollups", ["day", "bean_name", "brew_method"])
+
+    if "data_version" not in existing:
+        op.create_table(
+            "data_version",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("epoch", sa.String(32), nullable=False),
+            sa.Column("version", sa.Integer, nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("data_version")
+    op.drop_index("ix_rating_rollups_bucket", table_name="rating_rollups")
+    op.drop_index("ix_rating_rollups_metric_day", table_name="rating_rollups")
+    op.drop_table("rating_rollups")
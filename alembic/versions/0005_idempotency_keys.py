@@ -0,0 +1,37 @@
+"""Add idempotency_keys table
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "idempotency_keys" not in existing:
+        op.create_table(
+            "idempotency_keys",
+            sa.Column("scope", sa.String(50), primary_key=True),
+            sa.Column("key", sa.String(200), primary_key=True),
+            sa.Column("request_hash", sa.String(64), nullable=False),
+            sa.Column("status_code", sa.Integer, nullable=False),
+            sa.Column("response", sa.Text, nullable=False),
+            sa.Column("created_at", sa.DateTime, nullable=False),
+        )
+        op.create_index("ix_idempotency_keys_created_at", "idempotency_keys", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_keys_created_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
@@ -0,0 +1,58 @@
+"""Add updated_at indexes, ratings.updated_at and tombstones for delta sync
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNCED_TABLES = ("brews", "ratings", "brew_templates", "bean_inventory")
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    columns = {t: {c["name"] for c in inspector.get_columns(t)} for t in SYNCED_TABLES}
+    if "updated_at" not in columns["ratings"]:
+        op.add_column("ratings", sa.Column("updated_at", sa.DateTime, nullable=True))
+        columns["ratings"].add("updated_at")
+        if "updated_at" in columns["brews"]:
+            # Existing ratings last changed no later than their brew did.
+            op.execute(
+                "UPDATE ratings SET updated_at = "
+                "(SELECT brews.updated_at FROM brews WHERE brews.id = ratings.brew_id)"
+            )
+
+    for table in SYNCED_TABLES:
+        indexes = {ix["name"] for ix in inspector.get_indexes(table)}
+        # Very old databases may lack updated_at; check_schema reports those.
+        if "updated_at" in columns[table] and f"ix_{table}_updated_at" not in indexes:
+            op.create_index(f"ix_{table}_updated_at", table, ["updated_at"])
+
+    if "tombstones" not in inspector.get_table_names():
+        op.create_table(
+            "tombstones",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("entity", sa.String(30), nullable=False),
+            sa.Column("entity_id", sa.Integer, nullable=False),
+            sa.Column("deleted_at", sa.DateTime, nullable=False),
+        )
+        op.create_index("ix_tombstones_deleted_at", "tombstones", ["deleted_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tombstones_deleted_at", table_name="tombstones")
+    op.drop_table("tombstones")
+    for table in reversed(SYNCED_TABLES):
+        op.drop_index(f"ix_{table}_updated_at", table_name=table)
+    with op.batch_alter_table("ratings") as batch:
+        batch.drop_column("updated_at")
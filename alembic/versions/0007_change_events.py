@@ -0,0 +1,35 @@
+"""Add change_events outbox for live updates
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "change_events" not in existing:
+        op.create_table(
+            "change_events",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("kind", sa.String(50), nullable=False),
+            sa.Column("payload", sa.Text, nullable=False),
+            sa.Column("created_at", sa.DateTime, nullable=False),
+        )
+        op.create_index("ix_change_events_created_at", "change_events", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_change_events_created_at", table_name="change_events")
+    op.drop_table("change_events")
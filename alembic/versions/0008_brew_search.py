@@ -0,0 +1,40 @@
+"""Add the brew_search full-text index
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00
+
+SQLite gets an FTS5 virtual table, Postgres a tsvector table with a GIN
+index. It is filled by app.bootstrap (search_service.ensure_index).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS brew_search USING fts5("
+            "roaster, bean_name, flavor_notes_expected, flavor_notes_experienced, notes, comments, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+    elif dialect == "postgresql":
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS brew_search ("
+            "brew_id INTEGER PRIMARY KEY, document TSVECTOR NOT NULL)"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_brew_search_document ON brew_search USING GIN (document)"
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS brew_search")
@@ -0,0 +1,56 @@
+"""Index brew roaster, bean, origin, process and method values
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 00:00:00
+
+B-tree indexes serve the autocomplete rebuild (index-only GROUP BY) and the
+list filters once resolved to exact values. On Postgres, pg_trgm GIN indexes
+additionally serve the ILIKE list filters when the extension is available.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VALUE_COLUMNS = ("roaster", "bean_name", "bean_origin", "bean_process", "brew_method")
+TRIGRAM_COLUMNS = ("roaster", "brew_method")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {c["name"] for c in inspector.get_columns("brews")}
+    indexes = {ix["name"] for ix in inspector.get_indexes("brews")}
+
+    for column in VALUE_COLUMNS:
+        if column in columns and f"ix_brews_{column}" not in indexes:
+            op.create_index(f"ix_brews_{column}", "brews", [column])
+
+    if bind.dialect.name == "postgresql":
+        # Creating the extension needs privileges the app role may lack.
+        with bind.begin_nested() as savepoint:
+            try:
+                op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            except sa.exc.DBAPIError:
+                savepoint.rollback()
+                return
+        for column in TRIGRAM_COLUMNS:
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_brews_{column}_trgm "
+                f"ON brews USING GIN ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for column in TRIGRAM_COLUMNS:
+            op.execute(f"DROP INDEX IF EXISTS ix_brews_{column}_trgm")
+    for column in reversed(VALUE_COLUMNS):
+        op.drop_index(f"ix_brews_{column}", table_name="brews")
@@ -0,0 +1,223 @@
+"""Add the beans catalog and bean_id keys on brews, templates and inventory
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 00:00:00
+
+Existing roaster / bean_name strings are deduplicated into beans on the same
+normalized key as app.services.bean_service (case-folded, whitespace
+collapsed); each bean takes its most used spelling, which is written back to
+the rows that spelled it differently. Inventory entries naming the same bean
+are merged into the most recently updated one, which gets the sum of their
+gram amounts. A bean name without a roaster joins the only roaster with a
+bean of that name, if there is exactly one.
+Rows whose bean name is blank get no bean and keep a NULL bean_id, as
+bean_service does for new rows.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LINKED_TABLES = ("brews", "brew_templates", "bean_inventory")
+
+
+def _normalize(text):
+    return " ".join(text.split()).casefold() if text else ""
+
+
+def _clean(text):
+    return " ".join(text.split()) if text and text.strip() else None
+
+
+def _create_beans() -> None:
+    op.create_table(
+        "beans",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("roaster", sa.String(200)),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("origin", sa.String(200)),
+        sa.Column("process", sa.String(100)),
+        sa.Column("roaster_key", sa.String(200), nullable=False),
+        sa.Column("name_key", sa.String(200), nullable=False),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime),
+        sa.UniqueConstraint("roaster_key", "name_key", name="uq_beans_key"),
+    )
+    op.create_index("ix_beans_name_key", "beans", ["name_key"])
+    op.create_index("ix_beans_updated_at", "beans", ["updated_at"])
+
+
+def _link(bind, columns: dict[str, set[str]]) -> None:
+    now = datetime.utcnow()
+    tables = {
+        name: sa.table(name, *(sa.column(c) for c in ("id", "roaster", "bean_name", "bean_id", "updated_at")))
+        for name in LINKED_TABLES
+    }
+    has_details = {"bean_origin", "bean_process"} <= columns["brews"]
+
+    # Every spelling in use, per table, and how often.
+    spellings = {
+        name: bind.execute(
+            sa.select(t.c.roaster, t.c.bean_name, sa.func.count())
+            .where(t.c.bean_id.is_(None), t.c.bean_name.isnot(None))
+            .group_by(t.c.roaster, t.c.bean_name)
+        ).all()
+        for name, t in tables.items()
+    }
+    votes: dict[tuple[str, str], Counter] = defaultdict(Counter)
+    for rows in spellings.values():
+        for roaster, bean_name, count in rows:
+            bean_key = (_normalize(roaster), _normalize(bean_name))
+            if bean_key[1]:
+                votes[bean_key][(_clean(roaster), _clean(bean_name))] += count
+
+    roasters_by_name = defaultdict(set)
+    for roaster_key, name_key in votes:
+        if roaster_key:
+            roasters_by_name[name_key].add(roaster_key)
+
+    def resolve(bean_key):
+        roaster_key, name_key = bean_key
+        if not roaster_key and len(roasters_by_name[name_key]) == 1:
+            return (next(iter(roasters_by_name[name_key])), name_key)
+        return bean_key
+
+    details = defaultdict(lambda: [Counter(), Counter()])
+    if has_details:
+        detail_table = sa.table("brews", *(sa.column(c) for c in ("roaster", "bean_name", "bean_origin", "bean_process")))
+        for roaster, bean_name, origin, process, count in bind.execute(
+            sa.select(detail_table.c.roaster, detail_table.c.bean_name, detail_table.c.bean_origin,
+                      detail_table.c.bean_process, sa.func.count())
+            .group_by(detail_table.c.roaster, detail_table.c.bean_name,
+                      detail_table.c.bean_origin, detail_table.c.bean_process)
+        ):
+            counters = details[(_normalize(roaster), _normalize(bean_name))]
+            if _clean(origin):
+                counters[0][_clean(origin)] += count
+            if _clean(process):
+                counters[1][_clean(process)] += count
+
+    beans = sa.table("beans", *(sa.column(c) for c in (
+        "id", "roaster", "name", "origin", "process", "roaster_key", "name_key", "created_at", "updated_at",
+    )))
+    existing = {
+        (row.roaster_key, row.name_key): (row.id, row.roaster, row.name)
+        for row in bind.execute(sa.select(beans.c.id, beans.c.roaster, beans.c.name, beans.c.roaster_key, beans.c.name_key))
+    }
+    for bean_key in sorted({resolve(k) for k in votes} - set(existing)):
+        (roaster, name), _ = max(votes[bean_key].items(), key=lambda item: item[1])
+        origins, processes = details[bean_key]
+        bind.execute(sa.insert(beans).values(
+            roaster=roaster, name=name,
+            origin=origins.most_common(1)[0][0] if origins else None,
+            process=processes.most_common(1)[0][0] if processes else None,
+            roaster_key=bean_key[0], name_key=bean_key[1], created_at=now, updated_at=now,
+        ))
+    existing = {
+        (row.roaster_key, row.name_key): (row.id, row.roaster, row.name)
+        for row in bind.execute(sa.select(beans.c.id, beans.c.roaster, beans.c.name, beans.c.roaster_key, beans.c.name_key))
+    }
+
+    inventory = sa.table("bean_inventory", *(sa.column(c) for c in (
+        "id", "roaster", "bean_name", "bean_id", "initial_amount_grams", "updated_at",
+    )))
+    # bean_id -> the entry kept for it; the others' grams are added to it.
+    kept = dict(bind.execute(
+        sa.select(inventory.c.bean_id, inventory.c.id).where(inventory.c.bean_id.isnot(None))
+    ).all())
+    merged_grams: dict[int, float] = defaultdict(float)
+    duplicates = []
+    for row in bind.execute(
+        sa.select(inventory.c.id, inventory.c.roaster, inventory.c.bean_name, inventory.c.initial_amount_grams)
+        .where(inventory.c.bean_id.is_(None))
+        .order_by(*([inventory.c.updated_at.desc()] if "updated_at" in columns["bean_inventory"] else []),
+                  inventory.c.id.desc())
+    ):
+        bean_key = (_normalize(row.roaster), _normalize(row.bean_name))
+        if not bean_key[1]:
+            continue
+        bean_id = existing[resolve(bean_key)][0]
+        if bean_id in kept:
+            duplicates.append(row.id)
+            merged_grams[kept[bean_id]] += row.initial_amount_grams or 0.0
+        else:
+            kept[bean_id] = row.id
+    for inv_id, grams in merged_grams.items():
+        values = {"initial_amount_grams": inventory.c.initial_amount_grams + grams}
+        if "updated_at" in columns["bean_inventory"]:
+            values["updated_at"] = now
+        bind.execute(sa.update(inventory).where(inventory.c.id == inv_id).values(**values))
+    if duplicates:
+        bind.execute(sa.delete(inventory).where(inventory.c.id.in_(duplicates)))
+        if "tombstones" in sa.inspect(bind).get_table_names():
+            tombstones = sa.table("tombstones", *(sa.column(c) for c in ("entity", "entity_id", "deleted_at")))
+            bind.execute(sa.insert(tombstones), [
+                {"entity": "inventory", "entity_id": i, "deleted_at": now} for i in duplicates
+            ])
+
+    for name, t in tables.items():
+        has_updated_at = "updated_at" in columns[name]
+        for roaster, bean_name, _ in spellings[name]:
+            bean_key = (_normalize(roaster), _normalize(bean_name))
+            if not bean_key[1]:
+                continue
+            bean_id, bean_roaster, bean_name_spelling = existing[resolve(bean_key)]
+            values = {"bean_id": bean_id}
+            new_roaster = bean_roaster if bean_roaster is not None else roaster
+            if (new_roaster, bean_name_spelling) != (roaster, bean_name):
+                values.update(roaster=new_roaster, bean_name=bean_name_spelling)
+                if has_updated_at:
+                    values["updated_at"] = now  # so sync clients pick up the new spelling
+            bind.execute(
+                sa.update(t)
+                .where(t.c.bean_id.is_(None), t.c.roaster.is_not_distinct_from(roaster), t.c.bean_name == bean_name)
+                .values(**values)
+            )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "beans" not in inspector.get_table_names():
+        _create_beans()
+
+    columns = {t: {c["name"] for c in inspector.get_columns(t)} for t in LINKED_TABLES}
+    for table in LINKED_TABLES:
+        if "bean_id" not in columns[table]:
+            if bind.dialect.name == "sqlite":
+                # SQLite can add a referencing column in place; batch mode would copy the table.
+                op.execute(f"ALTER TABLE {table} ADD COLUMN bean_id INTEGER REFERENCES beans (id)")
+            else:
+                op.add_column(table, sa.Column(
+                    "bean_id", sa.Integer, sa.ForeignKey("beans.id", name=f"fk_{table}_bean_id"), nullable=True,
+                ))
+            columns[table].add("bean_id")
+
+    _link(bind, columns)
+
+    for table in LINKED_TABLES:
+        indexes = {ix["name"] for ix in sa.inspect(bind).get_indexes(table)}
+        if f"ix_{table}_bean_id" not in indexes:
+            op.create_index(f"ix_{table}_bean_id", table, ["bean_id"], unique=table == "bean_inventory")
+
+
+def downgrade() -> None:
+    for table in reversed(LINKED_TABLES):
+        op.drop_index(f"ix_{table}_bean_id", table_name=table)
+        if op.get_bind().dialect.name == "sqlite":
+            op.execute(f"ALTER TABLE {table} DROP COLUMN bean_id")
+        else:
+            op.drop_constraint(f"fk_{table}_bean_id", table, type_="foreignkey")
+            op.drop_column(table, "bean_id")
+    op.drop_index("ix_beans_updated_at", table_name="beans")
+    op.drop_index("ix_beans_name_key", table_name="beans")
+    op.drop_table("beans")
@@ -0,0 +1,44 @@
+"""Add the brew_expected_notes and brew_experienced_notes junction tables
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 00:00:00
+
+They hold the notes of brews.flavor_notes_expected and
+ratings.flavor_notes_experienced as flavor_notes ids, and are filled by
+app.bootstrap (flavor_service.ensure_notes).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("brew_expected_notes", "brew_experienced_notes")
+
+
+def upgrade() -> None:
+    existing = sa.inspect(op.get_bind()).get_table_names()
+    for table in TABLES:
+        if table in existing:
+            continue
+        op.create_table(
+            table,
+            sa.Column("brew_id", sa.Integer, sa.ForeignKey("brews.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column(
+                "flavor_note_id", sa.Integer, sa.ForeignKey("flavor_notes.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+        )
+        op.create_index(f"ix_{table}_flavor_note_id", table, ["flavor_note_id"])
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_index(f"ix_{table}_flavor_note_id", table_name=table)
+        op.drop_table(table)
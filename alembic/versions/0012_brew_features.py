@@ -0,0 +1,63 @@
+"""Add the brew_features analytics table
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 00:00:00
+
+One row of derived numeric features per brew, indexed on the analytics
+filter columns. It is filled by app.bootstrap (feature_service.ensure_features).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0012"
+down_revision: Union[str, None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXED = ("brew_date", "bean_id", "grinder", "brew_method")
+
+
+def _create_features() -> None:
+    op.create_table(
+        "brew_features",
+        sa.Column("brew_id", sa.Integer, sa.ForeignKey("brews.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("brew_date", sa.Date, nullable=False),
+        sa.Column("bean_id", sa.Integer),
+        sa.Column("grinder", sa.String(100)),
+        sa.Column("brew_method", sa.String(100), nullable=False),
+        sa.Column("bean_amount_grams", sa.Float),
+        sa.Column("water_amount_ml", sa.Float),
+        sa.Column("brew_ratio", sa.Float),
+        sa.Column("water_temp_c", sa.Float),
+        sa.Column("water_temp_f", sa.Float),
+        sa.Column("grind_setting", sa.Integer),
+        sa.Column("days_since_roast", sa.Integer),
+        sa.Column("brew_time_seconds", sa.Integer),
+        sa.Column("bloom_time_seconds", sa.Integer),
+        sa.Column("pour_count", sa.Integer),
+        sa.Column("pour_total_grams", sa.Float),
+        sa.Column("overall_score", sa.Float),
+        sa.Column("bitterness", sa.Float),
+        sa.Column("acidity", sa.Float),
+        sa.Column("sweetness", sa.Float),
+        sa.Column("body", sa.Float),
+        sa.Column("aroma", sa.Float),
+        sa.Column("aftertaste", sa.Float),
+    )
+    for column in INDEXED:
+        op.create_index(f"ix_brew_features_{column}", "brew_features", [column])
+
+
+def upgrade() -> None:
+    if "brew_features" not in sa.inspect(op.get_bind()).get_table_names():
+        _create_features()
+
+
+def downgrade() -> None:
+    for column in reversed(INDEXED):
+        op.drop_index(f"ix_brew_features_{column}", table_name="brew_features")
+    op.drop_table("brew_features")
@@ -0,0 +1,57 @@
+"""Key rating_rollups on bean_id instead of the bean name string
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 00:00:00
+
+The rollups are derived data, so the table is recreated empty and
+app.bootstrap refills it (rollup_service.ensure_rollups).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0013"
+down_revision: Union[str, None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_rollups(bean_column: sa.Column) -> None:
+    op.create_table(
+        "rating_rollups",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("day", sa.Date, nullable=False),
+        bean_column,
+        sa.Column("grinder", sa.String(100)),
+        sa.Column("brew_method", sa.String(100), nullable=False),
+        sa.Column("metric", sa.String(50), nullable=False),
+        sa.Column("count", sa.Integer, nullable=False),
+        sa.Column("total", sa.Float, nullable=False),
+        sa.Column("total_sq", sa.Float, nullable=False),
+    )
+    op.create_index("ix_rating_rollups_metric_day", "rating_rollups", ["metric", "day"])
+    op.create_index("ix_rating_rollups_bucket", "rating_rollups", ["day", bean_column.name, "brew_method"])
+
+
+def _drop_rollups() -> None:
+    op.drop_index("ix_rating_rollups_bucket", table_name="rating_rollups")
+    op.drop_index("ix_rating_rollups_metric_day", table_name="rating_rollups")
+    op.drop_table("rating_rollups")
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "rating_rollups" in inspector.get_table_names():
+        if "bean_id" in {c["name"] for c in inspector.get_columns("rating_rollups")}:
+            return
+        _drop_rollups()
+    _create_rollups(sa.Column("bean_id", sa.Integer))
+
+
+def downgrade() -> None:
+    # Left empty; the previous release's bootstrap rebuilds the rollups.
+    _drop_rollups()
+    _create_rollups(sa.Column("bean_name", sa.String(200), nullable=False))
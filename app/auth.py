@@ -5,8 +5,9 @@ from itsdangerous import URLSafeSerializer
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.config import settings
+from app.profiling import instrument_templates
 
-templates = Jinja2Templates(directory="app/templates")
+templates = instrument_templates(Jinja2Templates(directory="app/templates"))
 serializer = URLSafeSerializer(settings.secret_key, salt="auth")
 
 COOKIE_NAME = "coffee_session"
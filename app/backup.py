@@ -0,0 +1,56 @@
+"""Database snapshots: create, list, verify and restore.
+
+    python -m app.backup create                # full snapshot
+    python -m app.backup create --incremental  # changes since the last snapshot
+    python -m app.backup list
+    python -m app.backup verify <name>
+    python -m app.backup restore <name>        # stop the app first
+
+Run it from cron (or another process) so backups never occupy a web
+worker; snapshots go to BACKUP_DIR.
+"""
+
+import argparse
+import sys
+
+from app.services import backup_service
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.backup", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="Write a snapshot")
+    create.add_argument("--incremental", action="store_true")
+    create.add_argument("--no-prune", action="store_true", help="Keep all older snapshots")
+    commands.add_parser("list", help="List complete snapshots")
+    commands.add_parser("verify", help="Check a snapshot's checksum").add_argument("name")
+    commands.add_parser("restore", help="Restore a snapshot").add_argument("name")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "create":
+            if args.incremental:
+                manifest = backup_service.create_incremental()
+            else:
+                manifest = backup_service.create_full()
+            print(f"{manifest['name']}  {manifest['size']} bytes  sha256 {manifest['sha256']}")
+            if not args.no_prune:
+                for name in backup_service.prune():
+                    print(f"pruned {name}")
+        elif args.command == "list":
+            for m in backup_service.list_backups():
+                print(f"{m['name']:<40} {m['kind']:<12} {m['format']:<8} {m['size']:>12}  {m['created_at']}")
+        elif args.command == "verify":
+            backup_service.verify(args.name)
+            print(f"{args.name}: OK")
+        elif args.command == "restore":
+            applied = backup_service.restore(args.name)
+            print("restored " + " -> ".join(applied))
+    except backup_service.BackupError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
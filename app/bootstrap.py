@@ -0,0 +1,85 @@
+"""Database bootstrap: apply Alembic migrations and seed reference data.
+
+Run once per deploy, before the web workers start:
+
+    python -m app.bootstrap
+
+Workers only compare the database's Alembic stamp with SCHEMA_REVISION at
+startup, so they never issue DDL or race each other on it.
+"""
+
+import os
+
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import DBAPIError
+
+from app.database import SessionLocal, engine as default_engine
+
+# Must match the newest file in alembic/versions (checked by the test suite).
+SCHEMA_REVISION = "0013"
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PG_LOCK_ID = 0x636F6666  # arbitrary, shared by every bootstrap run
+
+
+def current_revision(engine: Engine) -> str | None:
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError:
+        return None
+
+
+def check_schema(engine: Engine = default_engine) -> None:
+    revision = current_revision(engine)
+    if revision != SCHEMA_REVISION:
+        raise RuntimeError(
+            f"Database schema is at revision {revision or 'none'}, expected "
+            f"{SCHEMA_REVISION}. Run `python -m app.bootstrap` before starting the app."
+        )
+
+
+def migrate(engine: Engine = default_engine) -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", os.path.join(_PROJECT_ROOT, "alembic"))
+    with engine.begin() as conn:
+        # Serialise concurrent bootstraps (e.g. several containers) on Postgres.
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _PG_LOCK_ID})
+        config.attributes["connection"] = conn
+        command.upgrade(config, "head")
+
+
+def seed() -> None:
+    from app.services.cache_service import ensure_data_version
+    from app.services.feature_service import ensure_features
+    from app.services.flavor_service import ensure_notes
+    from app.services.lookup_service import seed_lookups
+    from app.services.recommendation_service import seed_rules
+    from app.services.rollup_service import ensure_rollups
+    from app.services.search_service import ensure_index
+
+    db = SessionLocal()
+    try:
+        seed_rules(db)
+        seed_lookups(db)
+        ensure_rollups(db)
+        ensure_index(db)
+        ensure_notes(db)
+        ensure_features(db)
+        ensure_data_version(db)
+    finally:
+        db.close()
+
+
+def bootstrap(engine: Engine = default_engine) -> None:
+    migrate(engine)
+    seed()
+
+
+if __name__ == "__main__":
+    bootstrap()
+    print(f"Database ready at schema revision {SCHEMA_REVISION}")
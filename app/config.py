@@ -9,6 +9,70 @@ class Settings(BaseSettings):
     port: int = 8000
     debug: bool = False
 
+    # Connection pool
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0  # 0 = no limit
+
+    # SQLite tuning, applied on every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+
+    # Optional read replica for analytics / list / export reads
+    read_replica_url: str = ""
+    read_replica_sticky_seconds: int = 10
+
+    # Serve the hot read endpoints from async handlers (aiosqlite / asyncpg)
+    async_db: bool = False
+
+    # Request profiling: /metrics, optional Server-Timing header, and a
+    # warning when one request runs more SQL statements than the budget
+    metrics_enabled: bool = True
+    server_timing: bool = False
+    query_budget: int = 20  # 0 disables the check
+
+    # Opt-in cProfile captures for grind analysis (POST ... profile=true)
+    grind_profiling: bool = False
+    profile_dir: str = ""  # default: <tmp>/coffee-profiles
+    profile_keep: int = 50
+
+    idempotency_ttl_hours: int = 24
+
+    # Delta sync: deletions are remembered this long; older cursors get a full reset
+    sync_tombstone_days: int = 90
+    sync_page_size: int = 1000  # rows per response; the rest follow via next_page
+    # Each sync looks back this far before its cursor, since a row's updated_at
+    # is set before its transaction commits: keep above the longest write.
+    sync_cursor_overlap_seconds: float = 5.0
+
+    # Live updates over Server-Sent Events (/api/v1/events)
+    events_enabled: bool = True
+    event_poll_seconds: float = 1.0  # outbox polling; Postgres is also woken by NOTIFY
+    event_retention_minutes: int = 60  # how far back a reconnecting client can resume
+    event_heartbeat_seconds: float = 15.0
+    # Outbox ids skipped by a poll are watched this long for a late commit
+    # (ids are taken at insert, visible at commit); keep above the longest write.
+    event_gap_seconds: float = 30.0
+
+    # Snapshots (python -m app.backup, POST /api/v1/data/backups)
+    backup_dir: str = "backups"
+    backup_keep: int = 7  # full snapshots kept, each with its incrementals
+    backup_pages_per_step: int = 4096  # SQLite pages copied per step outside WAL mode
+
+    auto_migrate: bool = False
+    response_cache_size: int = 256
+    lookup_stamp_file: str = ""
+    lookup_cache_ttl_seconds: float = 300.0
+    # Autocomplete index: new values are picked up on the next request after a
+    # write; a full rebuild (dropping values no brew uses any more) runs this often.
+    autocomplete_rebuild_seconds: float = 600.0
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
 
@@ -1,28 +1,191 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from fastapi import Request
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from app.config import settings
 
-database_url = settings.database_url
-# Some hosts (Railway, Heroku) hand out "postgres://"; SQLAlchemy needs "postgresql://".
-if database_url.startswith("postgres://"):
-    database_url = database_url.replace("postgres://", "postgresql://", 1)
 
-connect_args = {}
-if database_url.startswith("sqlite"):
-    connect_args["check_same_thread"] = False
+def normalize_url(url: str) -> str:
+    # Some hosts (Railway, Heroku) hand out "postgres://"; SQLAlchemy needs "postgresql://".
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
 
-engine = create_engine(database_url, connect_args=connect_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _apply_sqlite_pragmas(dbapi_conn, _record) -> None:
+    # WAL lets readers run alongside the single writer; busy_timeout makes a
+    # second gunicorn worker wait for the write lock instead of failing.
+    cursor = dbapi_conn.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}")
+    cursor.close()
+
+
+def _pool_kwargs() -> dict:
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _sqlite_pool_kwargs(url: str) -> dict:
+    # In-memory databases get a single-connection pool from SQLAlchemy;
+    # only file databases take the queue pool settings.
+    if ":memory:" in url or url.rstrip("/").endswith("sqlite:"):
+        return {}
+    return _pool_kwargs()
+
+
+def create_app_engine(url: str) -> Engine:
+    """Build an engine with the pool / pragma settings from Settings."""
+    url = normalize_url(url)
+    if url.startswith("sqlite"):
+        engine = create_engine(
+            url,
+            connect_args={
+                "check_same_thread": False,
+                "timeout": settings.sqlite_busy_timeout_ms / 1000,
+            },
+            **_sqlite_pool_kwargs(url),
+        )
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+        return engine
+
+    connect_args = {}
+    if settings.db_statement_timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={int(settings.db_statement_timeout_ms)}"
+    return create_engine(url, connect_args=connect_args, **_pool_kwargs())
+
+
+def async_url(url: str) -> str:
+    """Swap the sync driver for its asyncio counterpart (aiosqlite / asyncpg)."""
+    url = normalize_url(url)
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    driver = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}.get(dialect)
+    if driver is None:
+        raise ValueError(f"No async driver configured for {dialect!r}")
+    return f"{dialect}+{driver}://{rest}"
+
+
+def create_async_app_engine(url: str) -> AsyncEngine:
+    """Async twin of create_app_engine, with the same pool / pragma settings."""
+    url = async_url(url)
+    if url.startswith("sqlite"):
+        engine = create_async_engine(
+            url,
+            connect_args={"timeout": settings.sqlite_busy_timeout_ms / 1000},
+        )
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+        return engine
+
+    connect_args = {}
+    if settings.db_statement_timeout_ms:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(int(settings.db_statement_timeout_ms))
+        }
+    return create_async_engine(url, connect_args=connect_args, **_pool_kwargs())
+
+
+class RoutingSession(Session):
+    """Session that can send its reads to a replica engine.
+
+    Reads go to the replica only while ``use_replica`` is set (see
+    get_read_db). Flushes and DML always go to the primary, and after the
+    first write the session stays on the primary so it reads its own writes.
+    """
+
+    def __init__(self, *args, replica: Engine | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+        self.use_replica = False
+
+    def _use_primary(self) -> None:
+        self.use_replica = False
+        state = self.info.get("request_state")
+        if state is not None:
+            state.wrote_primary = True
+
+    def flush(self, objects=None) -> None:
+        # Autoflush and commit flush through here too.
+        if self.new or self.dirty or self.deleted:
+            self._use_primary()
+        super().flush(objects)
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if getattr(clause, "is_dml", False):
+            self._use_primary()
+        if self.use_replica and self.replica is not None:
+            return self.replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+# Requests carrying this cookie read from the primary; it is set for a few
+# seconds after any request that wrote (see app.main).
+PRIMARY_COOKIE = "coffee_primary"
+
+database_url = normalize_url(settings.database_url)
+engine = create_app_engine(database_url)
+replica_engine = (
+    create_app_engine(settings.read_replica_url) if settings.read_replica_url else None
+)
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine, class_=RoutingSession, replica=replica_engine
+)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    db = SessionLocal(info={"request_state": request.state})
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request):
+    """Session for read-only handlers: served by the replica when one is
+    configured, unless this client wrote recently."""
+    db = SessionLocal(info={"request_state": request.state})
+    db.use_replica = PRIMARY_COOKIE not in request.cookies
     try:
         yield db
     finally:
         db.close()
+
+
+# The async engine is only built when ASYNC_DB is enabled, so aiosqlite /
+# asyncpg stay optional for deployments on the sync path.
+_async_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    global _async_session_factory
+    if _async_session_factory is None:
+        replica = None
+        if settings.read_replica_url:
+            replica = create_async_app_engine(settings.read_replica_url).sync_engine
+        _async_session_factory = async_sessionmaker(
+            create_async_app_engine(database_url),
+            expire_on_commit=False,
+            sync_session_class=RoutingSession,
+            replica=replica,
+        )
+    return _async_session_factory
+
+
+async def get_async_db(request: Request):
+    # Only read handlers use the async path, so it routes like get_read_db.
+    async with get_async_session_factory()(info={"request_state": request.state}) as db:
+        db.sync_session.use_replica = PRIMARY_COOKIE not in request.cookies
+        yield db
@@ -0,0 +1,220 @@
+"""Live change events over Server-Sent Events (GET /api/v1/events).
+
+Every worker runs one EventBridge task. It tails the change_events outbox
+(see app.services.event_service) every EVENT_POLL_SECONDS, and on Postgres
+a LISTEN connection wakes it as soon as a write commits. Ids it skipped are
+re-checked for EVENT_GAP_SECONDS, as a transaction holding a lower id can
+commit after a later one. New events go to the in-process Broadcaster,
+which hands the same pre-encoded bytes to every open connection, so
+database work is per worker rather than per client.
+
+Clients reconnecting with Last-Event-ID get the events they missed replayed
+from the outbox; if those have been pruned they get a ``resync`` event and
+should reload their data.
+"""
+
+import asyncio
+import logging
+import time
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import get_db
+from app.services import event_service
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 256
+PRUNE_EVERY = 60  # polls
+MAX_GAPS = 1000  # skipped outbox ids watched at once; the oldest are dropped first
+
+# (event id, SSE frame); id 0 for frames that are not outbox events
+Message = tuple[int, bytes]
+
+
+def encode(event_id: int, kind: str, data: str) -> bytes:
+    return f"id: {event_id}\nevent: {kind}\ndata: {data}\n\n".encode()
+
+
+RESYNC: Message = (0, b'event: resync\ndata: {}\n\n')
+
+
+class Broadcaster:
+    """Fans messages out to per-connection queues on the event loop."""
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, message: Message) -> None:
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # A client this far behind is better off reloading.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+
+broadcaster = Broadcaster()
+
+
+class EventBridge:
+    """Moves committed events from the outbox to this worker's broadcaster."""
+
+    def __init__(self, target: Broadcaster, session_factory: sessionmaker, engine: Engine):
+        self.target = target
+        self.session_factory = session_factory
+        self.engine = engine
+        self.last_id: int | None = None
+        # Skipped ids below last_id that may still commit -> when first missed.
+        self.gaps: dict[int, float] = {}
+        self._wake = asyncio.Event()
+        self._polls = 0
+
+    def poll_once(self) -> list[Message]:
+        """New outbox events since the last poll (runs in a worker thread)."""
+        with self.session_factory() as db:
+            if self.last_id is None:
+                self.last_id = event_service.latest_id(db)
+                return []
+            events = event_service.fetch_since(db, self.last_id, missing=self.gaps)
+            if not events and event_service.latest_id(db) < self.last_id:
+                # The outbox went backwards: the database was restored.
+                self.last_id = event_service.latest_id(db)
+                self.gaps.clear()
+                return [RESYNC]
+            self._polls += 1
+            if self._polls % PRUNE_EVERY == 0:
+                event_service.prune(db)
+        self._track_gaps(events)
+        return [(e.id, encode(e.id, e.kind, e.payload)) for e in events]
+
+    def _track_gaps(self, events) -> None:
+        """Advance last_id past ``events``, remembering the ids it skipped."""
+        now = time.monotonic()
+        for event in events:
+            if self.gaps.pop(event.id, None) is not None:
+                continue  # a late commit filled a gap
+            if event.id > self.last_id:
+                for skipped in range(max(self.last_id + 1, event.id - MAX_GAPS), event.id):
+                    self.gaps[skipped] = now
+                self.last_id = event.id
+        # Rolled-back inserts leave ids that never commit.
+        expired = now - settings.event_gap_seconds
+        self.gaps = {i: seen for i, seen in self.gaps.items() if seen > expired}
+        if len(self.gaps) > MAX_GAPS:
+            self.gaps = dict(sorted(self.gaps.items())[-MAX_GAPS:])
+
+    async def _listen(self):
+        # Postgres only: NOTIFY on commit wakes the poll loop immediately.
+        try:
+            import asyncpg
+
+            dsn = self.engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+            conn = await asyncpg.connect(dsn)
+            await conn.add_listener(event_service.CHANNEL, lambda *_: self._wake.set())
+            return conn
+        except Exception:
+            logger.warning("LISTEN %s failed; falling back to polling", event_service.CHANNEL,
+                           exc_info=True)
+            return None
+
+    async def run(self) -> None:
+        listener = await self._listen() if self.engine.dialect.name == "postgresql" else None
+        try:
+            while True:
+                try:
+                    messages = await run_in_threadpool(self.poll_once)
+                except Exception:
+                    logger.exception("Polling change events failed")
+                    messages = []
+                for message in messages:
+                    self.target.publish(message)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), settings.event_poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+        finally:
+            if listener is not None:
+                await listener.close()
+
+
+def replay(db: Session, last_event_id: int) -> list[Message]:
+    """Events after ``last_event_id``, or a resync if some are no longer kept."""
+    oldest = event_service.oldest_id(db)
+    latest = event_service.latest_id(db)
+    if last_event_id > latest or (oldest is not None and last_event_id < oldest - 1):
+        return [RESYNC]
+    messages = []
+    while True:
+        events = event_service.fetch_since(db, last_event_id)
+        if not events:
+            return messages
+        messages += [(e.id, encode(e.id, e.kind, e.payload)) for e in events]
+        last_event_id = events[-1].id
+
+
+async def stream(queue: asyncio.Queue, backlog: list[Message]):
+    yield b"retry: 3000\n\n"
+    # By id, not "up to the newest": an event committing late has a lower id.
+    sent = {event_id for event_id, _ in backlog}
+    for _, frame in backlog:
+        yield frame
+    while True:
+        try:
+            event_id, frame = await asyncio.wait_for(queue.get(), settings.event_heartbeat_seconds)
+        except asyncio.TimeoutError:
+            yield b": ping\n\n"  # keeps proxies from closing an idle stream
+            continue
+        if event_id and event_id in sent:
+            continue  # already sent from the backlog
+        yield frame
+
+
+router = APIRouter(tags=["events"])
+
+
+@router.get("/api/v1/events")
+async def events(
+    last_event_id: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    """Server-Sent Events stream of brew, rating and inventory changes."""
+    # Subscribe before reading the backlog so nothing falls in between.
+    queue = broadcaster.subscribe()
+    backlog = []
+    if last_event_id and last_event_id.isdigit():
+        backlog = await run_in_threadpool(replay, db, int(last_event_id))
+
+    async def body():
+        try:
+            async for chunk in stream(queue, backlog):
+                yield chunk
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
@@ -1,14 +1,19 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 
 # Auth disabled — app is intentionally open (no login required)
 # from app.auth import AuthMiddleware, router as auth_router
+from app.bootstrap import bootstrap, check_schema
 from app.config import settings
-from app.database import Base, SessionLocal, engine
+from app.database import PRIMARY_COOKIE, SessionLocal, engine
+from app.events import EventBridge, broadcaster, router as events_router
+from app.profiling import ProfilingMiddleware, router as metrics_router
 from app.routers import (
     api_analytics,
+    api_async_reads,
     api_brews,
     api_data,
     api_grind_lab,
@@ -16,82 +21,28 @@ from app.routers import (
     api_ratings,
     api_recommendations,
     api_shelf,
+    api_sync,
     api_templates,
     pages,
 )
-from app.services.lookup_service import seed_lookups
-from app.services.recommendation_service import seed_rules
-
-# Import all models so Base.metadata knows about them
-import app.models.inventory  # noqa: F401
-
-# Create tables
-Base.metadata.create_all(bind=engine)
-
-# Migrate: add missing columns / drop replaced tables
-from sqlalchemy import text, inspect
-with engine.connect() as conn:
-    inspector = inspect(engine)
-    tables = inspector.get_table_names()
-
-    # Drop the old template-keyed inventory table (replaced by bean_inventory)
-    if "coffee_inventory" in tables:
-        conn.execute(text("DROP TABLE coffee_inventory"))
-        conn.commit()
-
-    rating_cols = [c["name"] for c in inspector.get_columns("ratings")] if "ratings" in tables else []
-    if "flavor_notes_accuracy" not in rating_cols:
-        conn.execute(text("ALTER TABLE ratings ADD COLUMN flavor_notes_accuracy FLOAT"))
-        conn.commit()
-
-    # Add per-pour schedule columns to existing brews tables
-    if "brews" in tables:
-        brew_cols = [c["name"] for c in inspector.get_columns("brews")]
-        pour_columns = {
-            "bloom_pour_time_seconds": "INTEGER",
-            "first_pour_grams": "INTEGER",
-            "first_pour_time_seconds": "INTEGER",
-            "second_pour_grams": "INTEGER",
-            "second_pour_time_seconds": "INTEGER",
-            "final_pour_grams": "INTEGER",
-            "final_pour_time_seconds": "INTEGER",
-            "pour_method": "VARCHAR(50)",
-        }
-        for col, col_type in pour_columns.items():
-            if col not in brew_cols:
-                conn.execute(text(f"ALTER TABLE brews ADD COLUMN {col} {col_type}"))
-        conn.commit()
-
-    # Reconcile brew_devices to the current preferred set on already-seeded DBs.
-    # brew.brew_device is stored as a plain string, so removing lookup rows does
-    # not affect existing brews — it only changes what the dropdown offers.
-    if "brew_devices" in tables:
-        desired_devices = ["Flair Espresso", "Chemex", "V60 01", "V60 02", "Kalita Wave 185"]
-        retired_devices = [
-            "V60", "Kalita Wave", "AeroPress", "French Press", "Moka Pot",
-            "Clever Dripper", "Origami", "Fellow Stagg", "Siphon",
-            "Breville Barista Express",
-        ]
-        for name in retired_devices:
-            conn.execute(text("DELETE FROM brew_devices WHERE name = :n"), {"n": name})
-        for name in desired_devices:
-            exists = conn.execute(
-                text("SELECT 1 FROM brew_devices WHERE name = :n"), {"n": name}
-            ).first()
-            if not exists:
-                conn.execute(text("INSERT INTO brew_devices (name) VALUES (:n)"), {"n": name})
-        conn.commit()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    db = SessionLocal()
-    try:
-        seed_rules(db)
-        seed_lookups(db)
-    finally:
-        db.close()
+    # Schema changes and seeding live in `python -m app.bootstrap`; workers
+    # only verify the schema stamp unless AUTO_MIGRATE is set (local dev).
+    if settings.auto_migrate:
+        bootstrap()
+    else:
+        check_schema()
+    bridge = None
+    if settings.events_enabled:
+        bridge = asyncio.create_task(EventBridge(broadcaster, SessionLocal, engine).run())
     yield
+    if bridge is not None:
+        bridge.cancel()
+        with suppress(asyncio.CancelledError):
+            await bridge
 
 
 app = FastAPI(title=settings.app_title, lifespan=lifespan)
@@ -99,6 +50,26 @@ app = FastAPI(title=settings.app_title, lifespan=lifespan)
 # Auth middleware (disabled — no login required)
 # app.add_middleware(AuthMiddleware)
 
+async def stick_to_primary_after_write(request: Request, call_next):
+    """Pin a client's reads to the primary for a few seconds after it writes,
+    so it never reads a replica that has not caught up with its own change."""
+    response = await call_next(request)
+    if getattr(request.state, "wrote_primary", False):
+        response.set_cookie(
+            PRIMARY_COOKIE, "1",
+            max_age=settings.read_replica_sticky_seconds, httponly=True, samesite="lax",
+        )
+    return response
+
+
+if settings.read_replica_url:
+    app.middleware("http")(stick_to_primary_after_write)
+
+# Latency / SQL / template profiling, exposed at /metrics
+if settings.metrics_enabled:
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(metrics_router)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
@@ -110,9 +81,13 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 def health():
     return {"status": "ok"}
 
-# API routers
+# API routers — the async read handlers must come first so they shadow the
+# matching sync GET routes.
+if settings.async_db:
+    app.include_router(api_async_reads.router)
 app.include_router(api_brews.router)
 app.include_router(api_ratings.router)
+app.include_router(api_ratings.bulk_router)
 app.include_router(api_templates.router)
 app.include_router(api_analytics.router)
 app.include_router(api_recommendations.router)
@@ -120,6 +95,9 @@ app.include_router(api_lookups.router)
 app.include_router(api_grind_lab.router)
 app.include_router(api_shelf.router)
 app.include_router(api_data.router)
+app.include_router(api_sync.router)
+if settings.events_enabled:
+    app.include_router(events_router)
 
 # Page routers
 app.include_router(pages.router)
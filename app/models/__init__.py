@@ -1,7 +1,16 @@
+from app.models.bean import Bean
 from app.models.brew import Brew
 from app.models.rating import Rating
 from app.models.template import BrewTemplate
 from app.models.recommendation import RecommendationRule
 from app.models.lookups import FlavorNote, BrewDevice, Grinder, BrewMethod
+from app.models.flavor import BrewExpectedNote, BrewExperiencedNote
+from app.models.rollup import RatingRollup
+from app.models.feature import BrewFeature
+from app.models.data_version import DataVersion
+from app.models.idempotency import IdempotencyKey
+from app.models.tombstone import Tombstone
+from app.models.change_event import ChangeEvent
+from app.models.search import brew_search  # full-text index DDL (not mapped)
 
-__all__ = ["Brew", "Rating", "BrewTemplate", "RecommendationRule", "FlavorNote", "BrewDevice", "Grinder", "BrewMethod"]
+__all__ = ["Bean", "Brew", "Rating", "BrewTemplate", "RecommendationRule", "FlavorNote", "BrewDevice", "Grinder", "BrewMethod", "BrewExpectedNote", "BrewExperiencedNote", "RatingRollup", "BrewFeature", "DataVersion", "IdempotencyKey", "Tombstone", "ChangeEvent"]
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+# One row per roaster + bean, shared by brews, templates and inventory.
+# Matched on the normalized keys (see bean_service.normalize); roaster, name,
+# origin and process keep the display spelling.
+class Bean(Base):
+    __tablename__ = "beans"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    roaster: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    origin: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    process: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    roaster_key: Mapped[str] = mapped_column(String(200), nullable=False)
+    name_key: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
+    )
+
+    __table_args__ = (UniqueConstraint("roaster_key", "name_key", name="uq_beans_key"),)
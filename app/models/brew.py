@@ -11,10 +11,10 @@ class Brew(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     brew_date: Mapped[date] = mapped_column(Date, nullable=False)
-    roaster: Mapped[str] = mapped_column(String(200), nullable=False)
-    bean_name: Mapped[str] = mapped_column(String(200), nullable=False)
-    bean_origin: Mapped[str | None] = mapped_column(String(200), nullable=True)
-    bean_process: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    roaster: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    bean_name: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    bean_origin: Mapped[str | None] = mapped_column(String(200), nullable=True, index=True)
+    bean_process: Mapped[str | None] = mapped_column(String(100), nullable=True, index=True)
     roast_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     roast_level: Mapped[str | None] = mapped_column(String(50), nullable=True)
     flavor_notes_expected: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -36,7 +36,7 @@ class Brew(Base):
     water_amount_ml: Mapped[float] = mapped_column(Float, nullable=False)
     water_temp_f: Mapped[float | None] = mapped_column(Float, nullable=True)
     water_temp_c: Mapped[float | None] = mapped_column(Float, nullable=True)
-    brew_method: Mapped[str] = mapped_column(String(100), nullable=False)
+    brew_method: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
     brew_device: Mapped[str | None] = mapped_column(String(100), nullable=True)
     brew_time_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
     water_filter_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
@@ -45,9 +45,13 @@ class Brew(Base):
     template_id: Mapped[int | None] = mapped_column(
         Integer, ForeignKey("brew_templates.id", ondelete="SET NULL"), nullable=True
     )
+    # Set by bean_service from roaster + bean_name, which hold the bean's spelling.
+    bean_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("beans.id"), nullable=True, index=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
     )
 
     rating: Mapped["Rating | None"] = relationship(
@@ -56,3 +60,4 @@ class Brew(Base):
     template: Mapped["BrewTemplate | None"] = relationship(
         "BrewTemplate", back_populates="brews"
     )
+    bean: Mapped["Bean | None"] = relationship("Bean")
@@ -0,0 +1,41 @@
+from datetime import date
+
+from sqlalchemy import Date, Float, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+# One row per brew with its numeric features and rating dimensions, derived
+# once by feature_service on every brew/rating write and read by analytics.
+class BrewFeature(Base):
+    __tablename__ = "brew_features"
+
+    brew_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("brews.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Filter columns, copied from the brew
+    brew_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    bean_id: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    grinder: Mapped[str | None] = mapped_column(String(100), nullable=True, index=True)
+    brew_method: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    # Brew features
+    bean_amount_grams: Mapped[float | None] = mapped_column(Float, nullable=True)
+    water_amount_ml: Mapped[float | None] = mapped_column(Float, nullable=True)
+    brew_ratio: Mapped[float | None] = mapped_column(Float, nullable=True)
+    water_temp_c: Mapped[float | None] = mapped_column(Float, nullable=True)
+    water_temp_f: Mapped[float | None] = mapped_column(Float, nullable=True)
+    grind_setting: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    days_since_roast: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    brew_time_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    bloom_time_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    pour_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    pour_total_grams: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Rating dimensions (all None while the brew is unrated)
+    overall_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    bitterness: Mapped[float | None] = mapped_column(Float, nullable=True)
+    acidity: Mapped[float | None] = mapped_column(Float, nullable=True)
+    sweetness: Mapped[float | None] = mapped_column(Float, nullable=True)
+    body: Mapped[float | None] = mapped_column(Float, nullable=True)
+    aroma: Mapped[float | None] = mapped_column(Float, nullable=True)
+    aftertaste: Mapped[float | None] = mapped_column(Float, nullable=True)
@@ -0,0 +1,28 @@
+from sqlalchemy import ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+# Flavor notes per brew, parsed by flavor_service from the comma-separated
+# brews.flavor_notes_expected and ratings.flavor_notes_experienced.
+class BrewExpectedNote(Base):
+    __tablename__ = "brew_expected_notes"
+
+    brew_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("brews.id", ondelete="CASCADE"), primary_key=True
+    )
+    flavor_note_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("flavor_notes.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+
+
+class BrewExperiencedNote(Base):
+    __tablename__ = "brew_experienced_notes"
+
+    brew_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("brews.id", ondelete="CASCADE"), primary_key=True
+    )
+    flavor_note_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("flavor_notes.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
@@ -1,7 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, Integer, String, UniqueConstraint
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 
@@ -13,9 +13,14 @@ class BeanInventory(Base):
     bean_name: Mapped[str] = mapped_column(String(200), nullable=False)
     roaster: Mapped[str | None] = mapped_column(String(200), nullable=True)
     initial_amount_grams: Mapped[float] = mapped_column(Float, nullable=False)
+    bean_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("beans.id"), nullable=True, index=True, unique=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
     )
 
+    bean: Mapped["Bean | None"] = relationship("Bean")
+
     __table_args__ = (UniqueConstraint("bean_name", "roaster", name="uq_bean_roaster"),)
@@ -1,4 +1,6 @@
-from sqlalchemy import Float, ForeignKey, Integer, Text
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -21,5 +23,8 @@ class Rating(Base):
     flavor_notes_experienced: Mapped[str | None] = mapped_column(Text, nullable=True)
     flavor_notes_accuracy: Mapped[float | None] = mapped_column(Float, nullable=True)
     comments: Mapped[str | None] = mapped_column(Text, nullable=True)
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
+    )
 
     brew: Mapped["Brew"] = relationship("Brew", back_populates="rating")
@@ -0,0 +1,27 @@
+from datetime import date
+
+from sqlalchemy import Date, Float, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+# Per-day rating aggregates, one row per (day, bean, grinder, method, metric).
+# Maintained by rollup_service on every brew/rating write.
+class RatingRollup(Base):
+    __tablename__ = "rating_rollups"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    bean_id: Mapped[int | None] = mapped_column(Integer, nullable=True)  # None: brews without a bean
+    grinder: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    brew_method: Mapped[str] = mapped_column(String(100), nullable=False)
+    metric: Mapped[str] = mapped_column(String(50), nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    total: Mapped[float] = mapped_column(Float, nullable=False)
+    total_sq: Mapped[float] = mapped_column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_rating_rollups_metric_day", "metric", "day"),
+        Index("ix_rating_rollups_bucket", "day", "bean_id", "brew_method"),
+    )
@@ -0,0 +1,45 @@
+"""Full-text index over brews and their ratings (see app.services.search_service).
+
+Not an ORM model: on SQLite ``brew_search`` is an FTS5 virtual table keyed by
+rowid = brew id, on Postgres a table of weighted tsvectors with a GIN index.
+The hooks below create it next to the mapped tables for ``create_all``;
+migration 0008 creates it for migrated databases.
+"""
+
+from sqlalchemy import DDL, Integer, column, event, table
+
+from app.database import Base
+
+SEARCH_TABLE = "brew_search"
+
+# Indexed text, in FTS5 column order (bm25 weights are per column).
+SEARCH_COLUMNS = (
+    "roaster", "bean_name", "flavor_notes_expected", "flavor_notes_experienced", "notes", "comments",
+)
+
+SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    + ", ".join(SEARCH_COLUMNS)
+    # Prefix indexes keep search-as-you-type ("ethio*") as fast as whole words.
+    + ", tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+
+POSTGRES_DDL = (
+    f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+    "brew_id INTEGER PRIMARY KEY, document TSVECTOR NOT NULL)",
+    f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)",
+)
+
+# Both layouts in one construct; each dialect only touches its own columns.
+brew_search = table(
+    SEARCH_TABLE,
+    column("rowid", Integer),  # SQLite: the brew id
+    *(column(name) for name in SEARCH_COLUMNS),
+    column("brew_id", Integer),  # Postgres
+    column("document"),
+)
+
+event.listen(Base.metadata, "after_create", DDL(SQLITE_DDL).execute_if(dialect="sqlite"))
+for _statement in POSTGRES_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+event.listen(Base.metadata, "before_drop", DDL(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
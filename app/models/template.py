@@ -1,6 +1,6 @@
 from datetime import date, datetime
 
-from sqlalchemy import Boolean, Date, DateTime, Float, Integer, String, Text
+from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -33,9 +33,13 @@ class BrewTemplate(Base):
     water_filter_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
     altitude_ft: Mapped[int | None] = mapped_column(Integer, nullable=True)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    bean_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("beans.id"), nullable=True, index=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
     )
 
     brews: Mapped[list["Brew"]] = relationship("Brew", back_populates="template")
+    bean: Mapped["Bean | None"] = relationship("Bean")
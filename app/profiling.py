@@ -0,0 +1,240 @@
+"""Per-request profiling: route latency histograms, SQL and template timings.
+
+ProfilingMiddleware opens a RequestStats for every HTTP request; SQLAlchemy
+cursor events and the Jinja template class add to it from whichever thread
+the handler runs on (the stats object travels in a ContextVar, which
+Starlette's threadpool copies). Totals are exposed in Prometheus text format
+at /metrics and, when SERVER_TIMING is on, per request as a Server-Timing
+header. Metrics are per worker process.
+"""
+
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import jinja2
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from fastapi.templating import Jinja2Templates
+from sqlalchemy import Engine, event
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    sql_seconds: float = 0.0
+    template_seconds: float = 0.0
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> RequestStats | None:
+    return _current.get()
+
+
+# ---------------------------------------------------------------------------
+# Collectors
+# ---------------------------------------------------------------------------
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.sql_seconds += time.perf_counter() - started
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+class TimedTemplate(jinja2.Template):
+    # Only top-level render() is timed; includes render through the parent.
+    def render(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            stats = _current.get()
+            if stats is not None:
+                stats.template_seconds += time.perf_counter() - started
+
+
+def instrument_templates(templates: Jinja2Templates) -> Jinja2Templates:
+    templates.env.template_class = TimedTemplate
+    return templates
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+class _RouteMetrics:
+    __slots__ = ("buckets", "count", "seconds", "queries", "sql_seconds",
+                 "template_seconds", "over_budget", "statuses")
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.over_budget = 0
+        self.statuses: dict[int, int] = {}
+
+
+_lock = threading.Lock()
+_routes: dict[tuple[str, str], _RouteMetrics] = {}
+
+
+def _record(method: str, route: str, status: int, seconds: float, stats: RequestStats,
+            over_budget: bool) -> None:
+    with _lock:
+        metrics = _routes.get((method, route))
+        if metrics is None:
+            metrics = _routes[(method, route)] = _RouteMetrics()
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                metrics.buckets[i] += 1
+        metrics.count += 1
+        metrics.seconds += seconds
+        metrics.queries += stats.queries
+        metrics.sql_seconds += stats.sql_seconds
+        metrics.template_seconds += stats.template_seconds
+        metrics.over_budget += over_budget
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+
+def reset_metrics() -> None:
+    with _lock:
+        _routes.clear()
+
+
+def _labels(**labels) -> str:
+    def esc(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels.items()) + "}"
+
+
+def render_metrics() -> str:
+    with _lock:
+        snapshot = sorted(_routes.items())
+        lines = [
+            "# HELP coffee_http_request_duration_seconds Request latency by route.",
+            "# TYPE coffee_http_request_duration_seconds histogram",
+        ]
+        for (method, route), m in snapshot:
+            for bound, count in zip(LATENCY_BUCKETS, m.buckets):
+                lines.append("coffee_http_request_duration_seconds_bucket"
+                             f"{_labels(method=method, route=route, le=bound)} {count}")
+            lines.append("coffee_http_request_duration_seconds_bucket"
+                         f"{_labels(method=method, route=route, le='+Inf')} {m.count}")
+            lines.append(f"coffee_http_request_duration_seconds_sum"
+                         f"{_labels(method=method, route=route)} {m.seconds:.6f}")
+            lines.append(f"coffee_http_request_duration_seconds_count"
+                         f"{_labels(method=method, route=route)} {m.count}")
+
+        lines += ["# HELP coffee_http_requests_total Requests by route and status.",
+                  "# TYPE coffee_http_requests_total counter"]
+        for (method, route), m in snapshot:
+            for status, count in sorted(m.statuses.items()):
+                lines.append(f"coffee_http_requests_total"
+                             f"{_labels(method=method, route=route, status=status)} {count}")
+
+        counters = (
+            ("coffee_db_queries_total", "SQL statements executed.", "queries", "{}"),
+            ("coffee_db_query_seconds_total", "Time spent in SQL statements.", "sql_seconds", "{:.6f}"),
+            ("coffee_template_render_seconds_total", "Time spent rendering templates.",
+             "template_seconds", "{:.6f}"),
+            ("coffee_query_budget_exceeded_total",
+             "Requests that ran more SQL statements than QUERY_BUDGET.", "over_budget", "{}"),
+        )
+        for name, help_text, attr, fmt in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (method, route), m in snapshot:
+                value = fmt.format(getattr(m, attr))
+                lines.append(f"{name}{_labels(method=method, route=route)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Middleware and endpoint
+# ---------------------------------------------------------------------------
+
+def _server_timing(stats: RequestStats, elapsed: float) -> bytes:
+    return (
+        f'app;dur={elapsed * 1000:.1f}, '
+        f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.queries} queries", '
+        f'tpl;dur={stats.template_seconds * 1000:.1f}'
+    ).encode()
+
+
+class ProfilingMiddleware:
+    """Plain ASGI middleware so streaming responses are timed to the last byte."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.server_timing:
+                    elapsed = time.perf_counter() - started
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(stats, elapsed)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            label = getattr(route, "path", None) or "unmatched"
+            budget = settings.query_budget
+            over_budget = bool(budget) and stats.queries > budget
+            if over_budget:
+                logger.warning(
+                    "%s %s ran %d SQL statements (budget %d) - possible N+1",
+                    scope["method"], label, stats.queries, budget,
+                )
+            _record(scope["method"], label, status, elapsed, stats, over_budget)
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,47 +1,96 @@
-from typing import Optional
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.services import analytics_service
+from app.database import get_read_db
+from app.services import analytics_service, cache_service, flavor_service
 
 router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
 
 
 @router.get("/summary")
-def get_summary(db: Session = Depends(get_db)):
-    return analytics_service.get_summary(db)
+def get_summary(request: Request, db: Session = Depends(get_read_db)):
+    return cache_service.cached_json(request, db, lambda: analytics_service.get_summary(db))
 
 
 @router.get("/trends")
 def get_trends(
+    request: Request,
     group_by: str = "day",
     bean_name: Optional[str] = Query(None),
     grinder: Optional[str] = Query(None),
     brew_method: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    metric: str = "overall_score",
+    window: int = Query(3, ge=1, le=90),
+    db: Session = Depends(get_read_db),
 ):
-    return analytics_service.get_trends(db, group_by, bean_name=bean_name, grinder=grinder, brew_method=brew_method)
+    return cache_service.cached_json(request, db, lambda: analytics_service.get_trends(
+        db, group_by, bean_name=bean_name, grinder=grinder, brew_method=brew_method,
+        metric=metric, window=window,
+    ))
 
 
 @router.get("/correlations")
 def get_correlations(
+    request: Request,
     x: str = "grind_setting",
     y: str = "overall_score",
     bean_name: Optional[str] = Query(None),
     grinder: Optional[str] = Query(None),
     brew_method: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    summary: bool = False,
+    bins: int = Query(20, ge=1, le=100),
+    max_points: int = Query(500, ge=0, le=5000),
+    db: Session = Depends(get_read_db),
 ):
-    return analytics_service.get_correlations(db, x, y, bean_name=bean_name, grinder=grinder, brew_method=brew_method)
+    if summary:
+        return cache_service.cached_json(request, db, lambda: analytics_service.get_correlation_stats(
+            db, x, y, bean_name=bean_name, grinder=grinder, brew_method=brew_method,
+            bins=bins, max_points=max_points,
+        ))
+    return cache_service.cached_json(request, db, lambda: analytics_service.get_correlations(
+        db, x, y, bean_name=bean_name, grinder=grinder, brew_method=brew_method
+    ))
+
+
+@router.get("/correlation-matrix")
+def get_correlation_matrix(
+    request: Request,
+    bean_name: Optional[str] = Query(None),
+    grinder: Optional[str] = Query(None),
+    brew_method: Optional[str] = Query(None),
+    fields: Optional[list[str]] = Query(None),
+    db: Session = Depends(get_read_db),
+):
+    return cache_service.cached_json(request, db, lambda: analytics_service.get_correlation_matrix(
+        db, bean_name=bean_name, grinder=grinder, brew_method=brew_method, fields=fields
+    ))
 
 
 @router.get("/filter-options")
-def get_filter_options(db: Session = Depends(get_db)):
-    return analytics_service.get_filter_options(db)
+def get_filter_options(request: Request, db: Session = Depends(get_read_db)):
+    return cache_service.cached_json(request, db, lambda: analytics_service.get_filter_options(db))
 
 
 @router.get("/distributions")
-def get_distributions(field: str = "brew_method", db: Session = Depends(get_db)):
-    return analytics_service.get_distributions(db, field)
+def get_distributions(request: Request, field: str = "brew_method", db: Session = Depends(get_read_db)):
+    return cache_service.cached_json(request, db, lambda: analytics_service.get_distributions(db, field))
+
+
+@router.get("/flavor-notes/predictors")
+def get_flavor_note_predictors(
+    request: Request,
+    kind: Literal["expected", "experienced"] = "experienced",
+    threshold: float = Query(8.0, ge=0, le=10),
+    min_brews: int = Query(5, ge=1),
+    db: Session = Depends(get_read_db),
+):
+    return cache_service.cached_json(request, db, lambda: flavor_service.note_predictors(
+        db, kind, threshold=threshold, min_brews=min_brews
+    ))
+
+
+@router.get("/flavor-notes/hit-rates")
+def get_flavor_note_hit_rates(request: Request, db: Session = Depends(get_read_db)):
+    return cache_service.cached_json(request, db, lambda: flavor_service.hit_rates_by_roaster(db))
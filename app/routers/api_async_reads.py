@@ -0,0 +1,167 @@
+"""Async twins of the hot read endpoints, mounted ahead of the sync routers
+when ASYNC_DB is enabled.
+
+Handlers await the database on the event loop instead of holding a
+threadpool slot; the query logic itself is shared with the sync routers by
+running the existing service functions through ``AsyncSession.run_sync``.
+"""
+
+from datetime import date
+from typing import Callable, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import get_async_db
+from app.schemas.brew import BrewListRead, BrewRead
+from app.services import analytics_service, brew_service, cache_service, inventory_service
+
+router = APIRouter(prefix="/api/v1", tags=["async-reads"])
+
+
+async def _cached(request: Request, db: AsyncSession, build: Callable[[Session], object]):
+    return await db.run_sync(
+        lambda session: cache_service.cached_json(request, session, lambda: build(session))
+    )
+
+
+# ---------------------------------------------------------------------------
+# Brews
+# ---------------------------------------------------------------------------
+
+@router.get("/brews/", response_model=list[BrewListRead])
+async def list_brews(
+    skip: int = 0,
+    limit: int = 50,
+    roaster: str | None = None,
+    brew_method: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    rows = await db.run_sync(
+        lambda session: brew_service.list_brew_rows(
+            session, skip, limit, roaster, brew_method, date_from, date_to
+        )
+    )
+    return Response(brew_service.brew_rows_json(rows), media_type="application/json")
+
+
+# `:int` so non-numeric paths such as /brews/export.csv fall through to the sync router.
+@router.get("/brews/{brew_id:int}", response_model=BrewRead)
+async def get_brew(brew_id: int, db: AsyncSession = Depends(get_async_db)):
+    def load(session: Session):
+        brew = brew_service.get_brew(session, brew_id)
+        # Serialize inside the sync context so no lazy load escapes it.
+        return BrewRead.model_validate(brew) if brew else None
+
+    brew = await db.run_sync(load)
+    if not brew:
+        raise HTTPException(status_code=404, detail="Brew not found")
+    return brew
+
+
+# ---------------------------------------------------------------------------
+# Analytics
+# ---------------------------------------------------------------------------
+
+@router.get("/analytics/summary")
+async def get_summary(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await _cached(request, db, analytics_service.get_summary)
+
+
+@router.get("/analytics/trends")
+async def get_trends(
+    request: Request,
+    group_by: str = "day",
+    bean_name: Optional[str] = Query(None),
+    grinder: Optional[str] = Query(None),
+    brew_method: Optional[str] = Query(None),
+    metric: str = "overall_score",
+    window: int = Query(3, ge=1, le=90),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await _cached(request, db, lambda session: analytics_service.get_trends(
+        session, group_by, bean_name=bean_name, grinder=grinder, brew_method=brew_method,
+        metric=metric, window=window,
+    ))
+
+
+@router.get("/analytics/correlations")
+async def get_correlations(
+    request: Request,
+    x: str = "grind_setting",
+    y: str = "overall_score",
+    bean_name: Optional[str] = Query(None),
+    grinder: Optional[str] = Query(None),
+    brew_method: Optional[str] = Query(None),
+    summary: bool = False,
+    bins: int = Query(20, ge=1, le=100),
+    max_points: int = Query(500, ge=0, le=5000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if summary:
+        return await _cached(request, db, lambda session: analytics_service.get_correlation_stats(
+            session, x, y, bean_name=bean_name, grinder=grinder, brew_method=brew_method,
+            bins=bins, max_points=max_points,
+        ))
+    return await _cached(request, db, lambda session: analytics_service.get_correlations(
+        session, x, y, bean_name=bean_name, grinder=grinder, brew_method=brew_method
+    ))
+
+
+@router.get("/analytics/correlation-matrix")
+async def get_correlation_matrix(
+    request: Request,
+    bean_name: Optional[str] = Query(None),
+    grinder: Optional[str] = Query(None),
+    brew_method: Optional[str] = Query(None),
+    fields: Optional[list[str]] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await _cached(request, db, lambda session: analytics_service.get_correlation_matrix(
+        session, bean_name=bean_name, grinder=grinder, brew_method=brew_method, fields=fields
+    ))
+
+
+@router.get("/analytics/filter-options")
+async def get_filter_options(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await _cached(request, db, analytics_service.get_filter_options)
+
+
+@router.get("/analytics/distributions")
+async def get_distributions(
+    request: Request, field: str = "brew_method", db: AsyncSession = Depends(get_async_db)
+):
+    return await _cached(
+        request, db, lambda session: analytics_service.get_distributions(session, field)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Shelf
+# ---------------------------------------------------------------------------
+
+@router.get("/shelf/lp")
+async def get_lp(
+    request: Request,
+    bean_name: Optional[str] = Query(None),
+    pour_over_grams: Optional[float] = Query(None),
+    espresso_grams: Optional[float] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await _cached(request, db, lambda session: inventory_service.get_lp_data(
+        session, bean_name=bean_name, pour_over_grams=pour_over_grams,
+        espresso_grams=espresso_grams,
+    ))
+
+
+@router.get("/shelf/beans")
+async def list_bean_names(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await _cached(request, db, inventory_service.list_bean_names)
+
+
+@router.get("/shelf")
+async def list_shelf(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await _cached(request, db, inventory_service.list_shelf)
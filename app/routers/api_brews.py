@@ -1,11 +1,16 @@
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.schemas.brew import BrewCreate, BrewListRead, BrewRead, BrewUpdate
-from app.services import brew_service
+from app.database import get_db, get_read_db
+from app.schemas.brew import (
+    BrewBulkResult, BrewCreate, BrewListRead, BrewRead, BrewSearchResult, BrewUpdate,
+)
+from app.services import brew_service, search_service
 
 router = APIRouter(prefix="/api/v1/brews", tags=["brews"])
 
@@ -15,6 +20,25 @@ def create_brew(data: BrewCreate, db: Session = Depends(get_db)):
     return brew_service.create_brew(db, data)
 
 
+@router.post("/bulk", response_model=BrewBulkResult, status_code=201)
+def create_brews_bulk(
+    items: list[dict[str, Any]] = Body(..., max_length=brew_service.MAX_BULK_BREWS),
+    atomic: bool = False,
+    db: Session = Depends(get_db),
+):
+    """Create many brews (each may carry an inline ``rating``) in one transaction.
+
+    Items are validated individually; failures are reported by index. By
+    default the valid items are still created (207 when some failed); with
+    ``atomic=true`` any failure rejects the whole batch with 422.
+    """
+    result = brew_service.create_brews_bulk(db, items, atomic=atomic)
+    if not result["errors"]:
+        return result
+    status = 422 if atomic or not result["ids"] else 207
+    return JSONResponse(status_code=status, content=result)
+
+
 @router.get("/", response_model=list[BrewListRead])
 def list_brews(
     skip: int = 0,
@@ -23,24 +47,67 @@ def list_brews(
     brew_method: str | None = None,
     date_from: date | None = None,
     date_to: date | None = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    brews = brew_service.list_brews(db, skip, limit, roaster, brew_method, date_from, date_to)
-    results = []
-    for b in brews:
-        results.append(BrewListRead(
-            id=b.id,
-            brew_date=b.brew_date,
-            roaster=b.roaster,
-            bean_name=b.bean_name,
-            brew_method=b.brew_method,
-            overall_score=b.rating.overall_score if b.rating else None,
-        ))
-    return results
+    rows = brew_service.list_brew_rows(db, skip, limit, roaster, brew_method, date_from, date_to)
+    return Response(brew_service.brew_rows_json(rows), media_type="application/json")
+
+
+@router.get("/search", response_model=list[BrewSearchResult])
+def search_brews(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=search_service.MAX_RESULTS),
+    roaster: str | None = None,
+    brew_method: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    db: Session = Depends(get_read_db),
+):
+    """Full-text search over notes, rating comments, flavor notes, bean and roaster.
+
+    Every word must match (the last one as a prefix); results are ranked
+    best first and carry a highlighted excerpt.
+    """
+    return search_service.search_brews(db, q, limit, roaster, brew_method, date_from, date_to)
+
+
+@router.get("/export.csv")
+def export_brews_csv(
+    columns: str | None = None,
+    roaster: str | None = None,
+    brew_method: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    db: Session = Depends(get_read_db),
+):
+    """Stream every matching brew with its rating as CSV.
+
+    ``columns`` is a comma-separated subset of the export columns (default:
+    all of them); the filters are those of the list endpoint.
+    """
+    names = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    try:
+        chunks = brew_service.iter_brews_csv(db, names, roaster, brew_method, date_from, date_to)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    def stream():
+        # The dependency closes `db` before the body is sent; the query then
+        # runs on a fresh connection, which is released here when done.
+        try:
+            yield from chunks
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=brews.csv"},
+    )
 
 
 @router.get("/{brew_id}", response_model=BrewRead)
-def get_brew(brew_id: int, db: Session = Depends(get_db)):
+def get_brew(brew_id: int, db: Session = Depends(get_read_db)):
     brew = brew_service.get_brew(db, brew_id)
     if not brew:
         raise HTTPException(status_code=404, detail="Brew not found")
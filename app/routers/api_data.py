@@ -1,19 +1,26 @@
-"""Data export / import endpoints for migrating between deployments."""
+"""Data export / import endpoints for migrating between deployments, and snapshots."""
 
 from datetime import date, datetime
 from io import BytesIO
 import json
+from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.brew import Brew
 from app.models.rating import Rating
 from app.models.template import BrewTemplate
 from app.models.inventory import BeanInventory
+from app.models.bean import Bean
+from app.models.flavor import BrewExpectedNote, BrewExperiencedNote
 from app.models.lookups import FlavorNote, BrewDevice, Grinder, BrewMethod
+from app.services import (
+    backup_service, bean_service, cache_service, event_service, feature_service, flavor_service, lookup_service,
+    rollup_service, search_service, sync_service,
+)
 
 router = APIRouter(prefix="/api/v1/data", tags=["data"])
 
@@ -32,7 +39,7 @@ def _row_to_dict(row, exclude=("_sa_instance_state",)):
 
 
 @router.get("/export")
-def export_all(db: Session = Depends(get_db)):
+def export_all(db: Session = Depends(get_read_db)):
     """Download all user data as a JSON file."""
     templates = [_row_to_dict(t) for t in db.query(BrewTemplate).all()]
     brews = [_row_to_dict(b) for b in db.query(Brew).all()]
@@ -96,10 +103,14 @@ def import_all(file: UploadFile = File(...), db: Session = Depends(get_db)):
     db.query(Brew).delete()
     db.query(BrewTemplate).delete()
     db.query(BeanInventory).delete()
+    db.query(Bean).delete()
+    db.query(BrewExpectedNote).delete()
+    db.query(BrewExperiencedNote).delete()
     db.query(FlavorNote).delete()
     db.query(BrewDevice).delete()
     db.query(BrewMethod).delete()
     db.query(Grinder).delete()
+    sync_service.record_reset(db)
     db.flush()
 
     counts = {}
@@ -228,7 +239,30 @@ def import_all(file: UploadFile = File(...), db: Session = Depends(get_db)):
             updated_at=_parse_datetime(i.get("updated_at")),
         ))
     counts["bean_inventory"] = len(data.get("bean_inventory", []))
+    db.flush()
+
+    bean_service.link_all(db)
 
+    rollup_service.rebuild_rollups(db)
+    search_service.rebuild_index(db)
+    flavor_service.rebuild(db)
+    feature_service.rebuild(db)
+    event_service.publish(db, "data.replaced", {"source": "import"})
+    cache_service.bump_data_version(db)
     db.commit()
+    lookup_service.invalidate_lookups()
 
     return {"status": "ok", "imported": counts}
+
+
+@router.get("/backups")
+def list_backups():
+    return backup_service.list_backups()
+
+
+@router.post("/backups", status_code=202)
+def create_backup(kind: Literal["full", "incremental"] = "full"):
+    """Start a snapshot on a background thread (see ``python -m app.backup``)."""
+    if not backup_service.start_backup(kind):
+        raise HTTPException(status_code=409, detail="A backup is already running")
+    return {"status": "started", "kind": kind}
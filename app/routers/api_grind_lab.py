@@ -1,7 +1,11 @@
 import asyncio
+from dataclasses import asdict
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import FileResponse, PlainTextResponse
 
+from app.config import settings
+from app.services import profile_service
 from app.services.grind_analysis_service import AnalysisParams, analyze_image
 
 router = APIRouter(prefix="/api/v1/grind-lab", tags=["grind-lab"])
@@ -19,6 +23,7 @@ async def analyze_grind(
     min_surface: int = Form(5),
     min_roundness: float = Form(0.0),
     max_dimension: int = Form(2000),
+    profile: bool = Form(False),
 ):
     if image.content_type not in ALLOWED_TYPES:
         raise HTTPException(400, f"Unsupported file type: {image.content_type}")
@@ -36,9 +41,19 @@ async def analyze_grind(
         max_dimension=max_dimension,
     )
 
-    result = await asyncio.to_thread(analyze_image, image_bytes, params)
+    if profile and not settings.grind_profiling:
+        raise HTTPException(400, "Profiling is disabled (set GRIND_PROFILING=true)")
 
-    return {
+    profile_id = None
+    if profile:
+        result, profile_id = await asyncio.to_thread(
+            profile_service.profile_call, "grind", analyze_image, image_bytes, params,
+            trace_memory=True,
+        )
+    else:
+        result = await asyncio.to_thread(analyze_image, image_bytes, params)
+
+    body = {
         "particle_count": result.particle_count,
         "avg_diameter_px": result.avg_diameter_px,
         "std_diameter_px": result.std_diameter_px,
@@ -49,3 +64,26 @@ async def analyze_grind(
         "histogram": result.histogram_data,
         "csv": result.csv_string,
     }
+    if settings.debug or profile:
+        body["stages"] = [asdict(stage) for stage in result.stages]
+    if profile_id:
+        body["profile_id"] = profile_id
+    return body
+
+
+@router.get("/profiles")
+def list_profiles():
+    return profile_service.list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, format: str = "prof"):
+    if format == "text":
+        summary = profile_service.profile_summary(profile_id)
+        if summary is None:
+            raise HTTPException(404, "Profile not found")
+        return PlainTextResponse(summary)
+    path = profile_service.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(404, "Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
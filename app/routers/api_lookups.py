@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.services import lookup_service
+from app.services import autocomplete_service, lookup_service
 
 router = APIRouter(prefix="/api/v1/lookups", tags=["lookups"])
 
@@ -56,3 +58,13 @@ def list_brew_methods(db: Session = Depends(get_db)):
 @router.post("/brew-methods", response_model=LookupItem, status_code=201)
 def add_brew_method(data: LookupCreate, db: Session = Depends(get_db)):
     return lookup_service.add_brew_method(db, data.name.strip())
+
+
+@router.get("/suggestions", response_model=list[str])
+def suggest_values(
+    field: Literal["roaster", "bean_name", "bean_origin", "bean_process", "brew_method"],
+    q: str = Query("", max_length=200),
+    limit: int = Query(10, ge=1, le=autocomplete_service.MAX_SUGGESTIONS),
+    db: Session = Depends(get_db),
+):
+    return autocomplete_service.suggest(db, field, q, limit)
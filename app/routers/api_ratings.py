@@ -1,11 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.schemas.rating import RatingCreate, RatingRead, RatingUpdate
-from app.services import brew_service, rating_service
+from app.schemas.rating import RatingBulkResult, RatingCreate, RatingRead, RatingUpdate
+from app.services import brew_service, idempotency_service, rating_service
 
 router = APIRouter(prefix="/api/v1/brews/{brew_id}/rating", tags=["ratings"])
+bulk_router = APIRouter(prefix="/api/v1/ratings", tags=["ratings"])
+
+
+@bulk_router.post("/bulk", response_model=RatingBulkResult)
+def upsert_ratings(
+    items: list[dict[str, Any]] = Body(..., max_length=rating_service.MAX_BULK_RATINGS),
+    idempotency_key: str | None = Header(default=None, max_length=200),
+    db: Session = Depends(get_db),
+):
+    """Create or replace ratings keyed on ``brew_id`` in one upsert.
+
+    Failed items are reported by index (207 when others succeeded, 422 when
+    none did). Send an ``Idempotency-Key`` header to make retries safe: the
+    same key and body return the original response without re-applying it.
+    """
+    try:
+        status, body = rating_service.upsert_ratings(db, items, idempotency_key)
+    except idempotency_service.IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=422, detail="Idempotency-Key was already used for a different request"
+        )
+    if status == 200:
+        return body
+    return JSONResponse(status_code=status, content=body)
 
 
 @router.post("/", response_model=RatingRead, status_code=201)
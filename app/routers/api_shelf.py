@@ -1,11 +1,11 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.services import inventory_service
+from app.database import get_db, get_read_db
+from app.services import cache_service, inventory_service
 
 router = APIRouter(prefix="/api/v1/shelf", tags=["shelf"])
 
@@ -18,22 +18,25 @@ class InventoryUpsert(BaseModel):
 
 @router.get("/lp")
 def get_lp(
+    request: Request,
     bean_name: Optional[str] = Query(None),
     pour_over_grams: Optional[float] = Query(None),
     espresso_grams: Optional[float] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    return inventory_service.get_lp_data(db, bean_name=bean_name, pour_over_grams=pour_over_grams, espresso_grams=espresso_grams)
+    return cache_service.cached_json(request, db, lambda: inventory_service.get_lp_data(
+        db, bean_name=bean_name, pour_over_grams=pour_over_grams, espresso_grams=espresso_grams
+    ))
 
 
 @router.get("/beans")
-def list_bean_names(db: Session = Depends(get_db)):
-    return inventory_service.list_bean_names(db)
+def list_bean_names(request: Request, db: Session = Depends(get_read_db)):
+    return cache_service.cached_json(request, db, lambda: inventory_service.list_bean_names(db))
 
 
 @router.get("")
-def list_shelf(db: Session = Depends(get_db)):
-    return inventory_service.list_shelf(db)
+def list_shelf(request: Request, db: Session = Depends(get_read_db)):
+    return cache_service.cached_json(request, db, lambda: inventory_service.list_shelf(db))
 
 
 @router.post("")
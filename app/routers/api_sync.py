@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db
+from app.services import sync_service
+
+router = APIRouter(prefix="/api/v1/sync", tags=["sync"])
+
+
+@router.get("")
+def sync(since: str | None = None, page: str | None = None, db: Session = Depends(get_read_db)):
+    """Brews, ratings, templates and inventory changed since the ``since`` cursor.
+
+    Each entity lists ``upserted`` rows and ``deleted`` ids; apply deletions
+    first. While ``next_page`` is set, request it as ``page`` for the rest.
+    Then pass the returned ``cursor`` as ``since`` next time. When ``reset``
+    is true the pages hold the full dataset instead.
+    """
+    try:
+        return sync_service.changes_since(db, since, page)
+    except sync_service.InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.schemas.template import TemplateCreate, TemplateRead, TemplateUpdate
 from app.services import template_service
 
@@ -14,12 +14,12 @@ def create_template(data: TemplateCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=list[TemplateRead])
-def list_templates(db: Session = Depends(get_db)):
+def list_templates(db: Session = Depends(get_read_db)):
     return template_service.list_templates(db)
 
 
 @router.get("/{template_id}", response_model=TemplateRead)
-def get_template(template_id: int, db: Session = Depends(get_db)):
+def get_template(template_id: int, db: Session = Depends(get_read_db)):
     template = template_service.get_template(db, template_id)
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
@@ -6,7 +6,8 @@ from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.profiling import instrument_templates
 from app.schemas.brew import BrewCreate
 from app.schemas.rating import RatingCreate
 from app.schemas.template import TemplateCreate, TemplateUpdate
@@ -16,11 +17,12 @@ from app.services import (
     lookup_service,
     rating_service,
     recommendation_service,
+    search_service,
     template_service,
 )
 
 router = APIRouter(tags=["pages"])
-templates = Jinja2Templates(directory="app/templates")
+templates = instrument_templates(Jinja2Templates(directory="app/templates"))
 
 
 def _parse_time_seconds(value: str, field: str = "time") -> int | None:
@@ -62,18 +64,13 @@ def _parse_int(value: str, field: str) -> int | None:
 
 
 def _get_lookups(db: Session) -> dict:
-    return {
-        "flavor_notes": lookup_service.list_flavor_notes(db),
-        "brew_devices": lookup_service.list_brew_devices(db),
-        "brew_methods": lookup_service.list_brew_methods(db),
-        "grinders": lookup_service.list_grinders(db),
-    }
+    return lookup_service.get_cached_lookups(db)
 
 
 @router.get("/", response_class=HTMLResponse)
-def dashboard(request: Request, db: Session = Depends(get_db)):
+def dashboard(request: Request, db: Session = Depends(get_read_db)):
     summary = analytics_service.get_summary(db)
-    recent_brews = brew_service.list_brews(db, limit=5)
+    recent_brews = brew_service.list_brew_rows(db, limit=5)
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
         "summary": summary,
@@ -86,15 +83,20 @@ def brew_list(
     request: Request,
     roaster: str | None = None,
     brew_method: str | None = None,
-    db: Session = Depends(get_db),
+    q: str | None = None,
+    db: Session = Depends(get_read_db),
 ):
-    brews = brew_service.list_brews(db, roaster=roaster, brew_method=brew_method)
+    q = (q or "").strip()
+    if q:
+        brews = search_service.search_brews(db, q, 50, roaster=roaster, brew_method=brew_method)
+    else:
+        brews = brew_service.list_brew_rows(db, roaster=roaster, brew_method=brew_method)
     if request.headers.get("HX-Request"):
         return templates.TemplateResponse("partials/brew_table.html", {
-            "request": request, "brews": brews,
+            "request": request, "brews": brews, "q": q,
         })
     return templates.TemplateResponse("brew_list.html", {
-        "request": request, "brews": brews,
+        "request": request, "brews": brews, "q": q,
         "roaster": roaster or "", "brew_method": brew_method or "",
     })
 
@@ -199,7 +201,7 @@ def create_brew_form(
 
 
 @router.get("/brews/{brew_id}", response_class=HTMLResponse)
-def brew_detail(request: Request, brew_id: int, db: Session = Depends(get_db)):
+def brew_detail(request: Request, brew_id: int, db: Session = Depends(get_read_db)):
     brew = brew_service.get_brew(db, brew_id)
     if not brew:
         return templates.TemplateResponse("404.html", {"request": request}, status_code=404)
@@ -325,16 +327,8 @@ def submit_rating(
     comments: str = Form(""),
     db: Session = Depends(get_db),
 ):
-    # Calculate flavor accuracy from confirmed checkboxes
-    brew = brew_service.get_brew(db, brew_id)
-    flavor_accuracy = None
+    # Accuracy is worked out by rating_service from the brew's expected notes.
     confirmed_str = ", ".join(flavor_notes_confirmed) if flavor_notes_confirmed else None
-    if brew and brew.flavor_notes_expected:
-        expected = [n.strip() for n in brew.flavor_notes_expected.split(",") if n.strip()]
-        if expected:
-            confirmed_count = len(flavor_notes_confirmed)
-            flavor_accuracy = round(confirmed_count / len(expected) * 100, 1)
-
     data = RatingCreate(
         overall_score=overall_score,
         bitterness=float(bitterness) if bitterness else None,
@@ -344,14 +338,9 @@ def submit_rating(
         aroma=float(aroma) if aroma else None,
         aftertaste=float(aftertaste) if aftertaste else None,
         flavor_notes_experienced=confirmed_str or flavor_notes_experienced or None,
-        flavor_notes_accuracy=flavor_accuracy,
         comments=comments or None,
     )
-    existing = rating_service.get_rating(db, brew_id)
-    if existing:
-        rating_service.update_rating(db, brew_id, data)
-    else:
-        rating_service.create_rating(db, brew_id, data)
+    rating_service.upsert_ratings(db, [{"brew_id": brew_id, **data.model_dump()}])
     return RedirectResponse(f"/brews/{brew_id}", status_code=303)
 
 
@@ -363,7 +352,7 @@ def delete_brew_page(brew_id: int, db: Session = Depends(get_db)):
 
 # Template pages
 @router.get("/templates", response_class=HTMLResponse)
-def template_list(request: Request, db: Session = Depends(get_db)):
+def template_list(request: Request, db: Session = Depends(get_read_db)):
     tpl_list = template_service.list_templates(db)
     return templates.TemplateResponse("template_list.html", {
         "request": request, "templates_list": tpl_list,
@@ -550,7 +539,7 @@ def save_brew_as_template(
 
 # Analytics page
 @router.get("/analytics", response_class=HTMLResponse)
-def analytics_page(request: Request, db: Session = Depends(get_db)):
+def analytics_page(request: Request, db: Session = Depends(get_read_db)):
     summary = analytics_service.get_summary(db)
     return templates.TemplateResponse("analytics.html", {
         "request": request, "summary": summary,
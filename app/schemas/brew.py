@@ -2,6 +2,8 @@ from datetime import date, datetime
 
 from pydantic import BaseModel, Field
 
+from app.schemas.rating import RatingCreate
+
 
 class BrewBase(BaseModel):
     brew_date: date
@@ -42,6 +44,16 @@ class BrewCreate(BrewBase):
     pass
 
 
+class BrewBulkItem(BrewCreate):
+    rating: RatingCreate | None = None
+
+
+class BrewBulkResult(BaseModel):
+    ids: list[int]  # created brew ids, in request order of the created items
+    created: list[dict]  # {"index": i, "id": brew_id}
+    errors: list[dict]  # {"index": i, "errors": [...]}
+
+
 class BrewUpdate(BaseModel):
     brew_date: date | None = None
     roaster: str | None = None
@@ -110,3 +122,9 @@ class BrewListRead(BaseModel):
     overall_score: float | None = None
 
     model_config = {"from_attributes": True}
+
+
+class BrewSearchResult(BrewListRead):
+    rank: float | None = None
+    # HTML excerpt: escaped text with the matched words in <mark>
+    highlight: str | None = None
@@ -18,6 +18,15 @@ class RatingCreate(RatingBase):
     pass
 
 
+class RatingBulkItem(RatingBase):
+    brew_id: int
+
+
+class RatingBulkResult(BaseModel):
+    upserted: list[dict]  # {"index": i, "brew_id": id}
+    errors: list[dict]  # {"index": i, "errors": [...]}
+
+
 class RatingUpdate(BaseModel):
     overall_score: float | None = Field(default=None, ge=1, le=10)
     bitterness: float | None = Field(default=None, ge=1, le=5)
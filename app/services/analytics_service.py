@@ -1,59 +1,96 @@
-from sqlalchemy import func
+import numpy as np
+from sqlalchemy import Integer, func, select
 from sqlalchemy.orm import Session
 
+from app.models.bean import Bean
 from app.models.brew import Brew
+from app.models.feature import BrewFeature
 from app.models.rating import Rating
+from app.models.rollup import RatingRollup
+from app.services import bean_service
+from app.services.rollup_service import ROLLUP_METRICS
 
 
 def get_summary(db: Session) -> dict:
     total_brews = db.query(func.count(Brew.id)).scalar() or 0
-    avg_score = db.query(func.avg(Rating.overall_score)).scalar()
+    rated_brews, avg_score = db.query(func.count(Rating.id), func.avg(Rating.overall_score)).one()
     avg_score = round(avg_score, 2) if avg_score else None
 
-    top_roaster = (
-        db.query(Brew.roaster, func.count(Brew.id).label("cnt"))
-        .group_by(Brew.roaster)
-        .order_by(func.count(Brew.id).desc())
-        .first()
-    )
-    top_bean = (
-        db.query(Brew.bean_name, func.count(Brew.id).label("cnt"))
-        .group_by(Brew.bean_name)
-        .order_by(func.count(Brew.id).desc())
-        .first()
+    # Aggregate per bean on the brews' bean_id index, then roll up the few beans here.
+    brew_counts = dict(
+        db.query(Brew.bean_id, func.count(Brew.id))
+        .filter(Brew.bean_id.isnot(None))
+        .group_by(Brew.bean_id)
+        .all()
     )
-    highest_rated = (
-        db.query(Brew.roaster, Brew.bean_name, func.avg(Rating.overall_score).label("avg"))
+    averages = dict(
+        db.query(Brew.bean_id, func.avg(Rating.overall_score))
         .join(Rating)
-        .group_by(Brew.roaster, Brew.bean_name)
-        .having(func.count(Rating.id) >= 1)
-        .order_by(func.avg(Rating.overall_score).desc())
-        .first()
+        .filter(Brew.bean_id.isnot(None))
+        .group_by(Brew.bean_id)
+        .all()
     )
-    avg_flavor_accuracy = (
-        db.query(func.avg(Rating.flavor_notes_accuracy))
+    beans = {
+        bean.id: bean
+        for bean in db.query(Bean.id, Bean.roaster, Bean.roaster_key, Bean.name)
+        .filter(Bean.id.in_(db.query(Brew.bean_id).filter(Brew.bean_id.isnot(None)).distinct()))
+    }
+    roaster_counts: dict[str, int] = {}
+    roaster_names: dict[str, str] = {}
+    for bean_id, count in sorted(brew_counts.items(), key=lambda item: -item[1]):
+        bean = beans[bean_id]
+        roaster_counts[bean.roaster_key] = roaster_counts.get(bean.roaster_key, 0) + count
+        roaster_names.setdefault(bean.roaster_key, bean.roaster)
+    top_roaster = max(roaster_counts, key=roaster_counts.get, default=None)
+    top_bean = max(brew_counts, key=brew_counts.get, default=None)
+    highest_rated = max(averages, key=averages.get, default=None)
+    accuracy_count, avg_flavor_accuracy = (
+        db.query(func.count(Rating.id), func.avg(Rating.flavor_notes_accuracy))
         .filter(Rating.flavor_notes_accuracy.isnot(None))
-        .scalar()
+        .one()
     )
     avg_flavor_accuracy = round(avg_flavor_accuracy, 1) if avg_flavor_accuracy else None
 
     return {
         "total_brews": total_brews,
         "average_score": avg_score,
-        "top_roaster": top_roaster[0] if top_roaster else None,
-        "top_bean": top_bean[0] if top_bean else None,
+        "top_roaster": roaster_names[top_roaster] if top_roaster is not None else None,
+        "top_bean": beans[top_bean].name if top_bean is not None else None,
         "highest_rated_bean": {
-            "name": f"{highest_rated[0]} — {highest_rated[1]}",
-            "avg_score": round(highest_rated[2], 2),
+            "name": f"{beans[highest_rated].roaster} — {beans[highest_rated].name}",
+            "avg_score": round(averages[highest_rated], 2),
         }
-        if highest_rated
+        if highest_rated is not None
         else None,
         "avg_flavor_accuracy": avg_flavor_accuracy,
+        # Sample sizes, so live pages can update the averages from change events
+        "rated_brews": rated_brews,
+        "flavor_accuracy_count": accuracy_count,
     }
 
 
-def _is_sqlite(db: Session) -> bool:
-    return "sqlite" in str(db.bind.url)
+def _apply_filters(
+    query, bean_name: str | None, grinder: str | None, brew_method: str | None, table=BrewFeature,
+):
+    """Filter a query over brew_features (or the rating rollups) on its indexed filter columns."""
+    if bean_name:
+        query = query.filter(table.bean_id.in_(
+            select(Bean.id).where(Bean.name_key == bean_service.normalize(bean_name))
+        ))
+    if grinder:
+        query = query.filter(table.grinder == grinder)
+    if brew_method:
+        query = query.filter(table.brew_method == brew_method)
+    return query
+
+
+def _period_label(day, group_by: str) -> str:
+    if group_by == "month":
+        return day.strftime("%Y-%m")
+    if group_by == "week":
+        iso_year, iso_week, _ = day.isocalendar()
+        return f"{iso_year}-{iso_week:02d}"
+    return day.isoformat()
 
 
 def get_trends(
@@ -62,35 +99,112 @@ def get_trends(
     bean_name: str | None = None,
     grinder: str | None = None,
     brew_method: str | None = None,
+    metric: str = "overall_score",
+    window: int = 3,
 ) -> list[dict]:
-    if _is_sqlite(db):
-        if group_by == "month":
-            date_expr = func.strftime("%Y-%m", Brew.brew_date)
-        elif group_by == "week":
-            date_expr = func.strftime("%Y-%W", Brew.brew_date)
-        else:
-            date_expr = func.strftime("%Y-%m-%d", Brew.brew_date)
+    """Per-period averages of a rating dimension or brew feature.
+
+    Rating dimensions are read from the daily rating rollups; the other brew
+    features are summed per day from brew_features. Each period also carries
+    its sample count, a count-weighted rolling mean over the last ``window``
+    periods and a 95% confidence band for the mean (None when the period has
+    fewer than two samples).
+    """
+    if metric in ROLLUP_METRICS:
+        query = db.query(
+            RatingRollup.day, RatingRollup.count, RatingRollup.total, RatingRollup.total_sq
+        ).filter(RatingRollup.metric == metric)
+        query = _apply_filters(query, bean_name, grinder, brew_method, RatingRollup).order_by(RatingRollup.day)
     else:
-        if group_by == "month":
-            date_expr = func.to_char(Brew.brew_date, "YYYY-MM")
-        elif group_by == "week":
-            date_expr = func.to_char(Brew.brew_date, "IYYY-IW")
-        else:
-            date_expr = func.to_char(Brew.brew_date, "YYYY-MM-DD")
-
-    query = (
-        db.query(date_expr.label("period"), func.avg(Rating.overall_score).label("avg_score"))
-        .join(Rating)
-    )
-    if bean_name:
-        query = query.filter(Brew.bean_name == bean_name)
-    if grinder:
-        query = query.filter(Brew.grinder == grinder)
-    if brew_method:
-        query = query.filter(Brew.brew_method == brew_method)
+        col = _resolve_col(metric)
+        if col is None:
+            return []
+        query = _apply_filters(
+            db.query(BrewFeature.brew_date, func.count(col), func.sum(col), func.sum(col * col))
+            .filter(col.isnot(None)),
+            bean_name, grinder, brew_method,
+        ).group_by(BrewFeature.brew_date).order_by(BrewFeature.brew_date)
 
-    rows = query.group_by("period").order_by("period").all()
-    return [{"period": r.period, "avg_score": round(r.avg_score, 2)} for r in rows]
+    periods: dict[str, list[float]] = {}
+    for day, count, total, total_sq in query.all():
+        acc = periods.setdefault(_period_label(day, group_by), [0, 0.0, 0.0])
+        acc[0] += count
+        acc[1] += total
+        acc[2] += total_sq
+    if not periods:
+        return []
+
+    labels = list(periods)
+    n, sums, sums_sq = (np.array(col, dtype=float) for col in zip(*periods.values()))
+    mean = sums / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = np.maximum(sums_sq - sums * sums / n, 0) / (n - 1)
+        half_width = 1.96 * np.sqrt(var / n)
+
+    window = max(1, window)
+    cum_n = np.concatenate(([0.0], np.cumsum(n)))
+    cum_sum = np.concatenate(([0.0], np.cumsum(sums)))
+    lo = np.maximum(np.arange(len(n)) + 1 - window, 0)
+    hi = np.arange(len(n)) + 1
+    rolling = (cum_sum[hi] - cum_sum[lo]) / (cum_n[hi] - cum_n[lo])
+
+    results = []
+    for i, period in enumerate(labels):
+        has_band = n[i] >= 2
+        results.append({
+            "period": period,
+            "avg_score": round(float(mean[i]), 2),
+            "count": int(n[i]),
+            "rolling_avg": round(float(rolling[i]), 2),
+            "ci_low": round(float(mean[i] - half_width[i]), 2) if has_band else None,
+            "ci_high": round(float(mean[i] + half_width[i]), 2) if has_band else None,
+        })
+    return results
+
+
+BREW_FIELDS = {
+    "bean_amount_grams", "water_amount_ml",
+    "water_temp_f", "water_temp_c", "brew_time_seconds",
+    "grind_setting", "bloom_time_seconds",
+}
+RATING_FIELDS = {
+    "overall_score", "bitterness", "acidity", "sweetness",
+    "body", "aroma", "aftertaste",
+}
+COMPUTED_FIELDS = {"brew_ratio", "days_since_roast", "pour_count", "pour_total_grams"}
+# Every field is a brew_features column; see feature_service for how each is derived.
+FEATURE_FIELDS = BREW_FIELDS | RATING_FIELDS | COMPUTED_FIELDS
+
+
+def _resolve_col(field: str):
+    return getattr(BrewFeature, field) if field in FEATURE_FIELDS else None
+
+
+def _as_array(field: str, values: list) -> np.ndarray:
+    """Non-null column values as an array; integer features stay integers."""
+    integer = isinstance(BrewFeature.__table__.c[field].type, Integer)
+    return np.array(values, dtype=np.int64 if integer else float)
+
+
+def _load_xy(
+    db: Session,
+    x_field: str,
+    y_field: str,
+    bean_name: str | None = None,
+    grinder: str | None = None,
+    brew_method: str | None = None,
+) -> tuple[np.ndarray, np.ndarray] | None:
+    """x/y pairs of the rated brews that have both values."""
+    x_col = _resolve_col(x_field)
+    y_col = _resolve_col(y_field)
+    if x_col is None or y_col is None:
+        return None
+
+    query = db.query(x_col.label("x"), y_col.label("y")).filter(
+        BrewFeature.overall_score.isnot(None), x_col.isnot(None), y_col.isnot(None)
+    )
+    rows = _apply_filters(query, bean_name, grinder, brew_method).all()
+    return _as_array(x_field, [r.x for r in rows]), _as_array(y_field, [r.y for r in rows])
 
 
 def get_correlations(
@@ -101,83 +215,162 @@ def get_correlations(
     grinder: str | None = None,
     brew_method: str | None = None,
 ) -> list[dict]:
-    brew_fields = {
-        "bean_amount_grams", "water_amount_ml",
-        "water_temp_f", "water_temp_c", "brew_time_seconds",
-        "grind_setting",
-    }
-    rating_fields = {
-        "overall_score", "bitterness", "acidity", "sweetness",
-        "body", "aroma", "aftertaste",
-    }
-    computed_fields = {"days_since_roast"}
-
-    def _resolve_col(field: str):
-        if field == "days_since_roast":
-            if _is_sqlite(db):
-                return func.julianday(Brew.brew_date) - func.julianday(Brew.roast_date)
-            else:
-                return Brew.brew_date - Brew.roast_date
-        if field in brew_fields:
-            return getattr(Brew, field)
-        if field in rating_fields:
-            return getattr(Rating, field)
+    loaded = _load_xy(db, x_field, y_field, bean_name, grinder, brew_method)
+    if loaded is None:
+        return []
+    xs, ys = loaded
+    return [{"x": x, "y": y} for x, y in zip(xs.tolist(), ys.tolist())]
+
+
+def _rankdata(values: np.ndarray) -> np.ndarray:
+    """Ranks starting at 1, with ties given their average rank."""
+    sorter = np.argsort(values, kind="mergesort")
+    inv = np.empty(sorter.size, dtype=np.intp)
+    inv[sorter] = np.arange(sorter.size)
+    ordered = values[sorter]
+    first = np.r_[True, ordered[1:] != ordered[:-1]]
+    dense = first.cumsum()[inv]
+    bounds = np.r_[np.nonzero(first)[0], len(first)]
+    return 0.5 * (bounds[dense] + bounds[dense - 1] + 1)
+
+
+def _pearson(xs: np.ndarray, ys: np.ndarray) -> float | None:
+    if xs.size < 2 or np.ptp(xs) == 0 or np.ptp(ys) == 0:
         return None
+    return float(np.corrcoef(xs, ys)[0, 1])
 
-    x_col = _resolve_col(x_field)
-    if x_col is None:
-        return []
-    y_col = _resolve_col(y_field)
-    if y_col is None:
+
+def _grid_bins(xs: np.ndarray, ys: np.ndarray, bins: int) -> list[dict]:
+    """Aggregate points into a bins x bins grid; only occupied cells are returned."""
+    if xs.size == 0:
         return []
+    x_edges = np.linspace(xs.min(), xs.max(), bins + 1) if np.ptp(xs) else np.array([xs[0], xs[0]])
+    y_edges = np.linspace(ys.min(), ys.max(), bins + 1) if np.ptp(ys) else np.array([ys[0], ys[0]])
+    nx, ny = len(x_edges) - 1, len(y_edges) - 1
+    xi = np.clip(np.searchsorted(x_edges, xs, side="right") - 1, 0, nx - 1)
+    yi = np.clip(np.searchsorted(y_edges, ys, side="right") - 1, 0, ny - 1)
+    cell = xi * ny + yi
 
-    query = (
-        db.query(x_col.label("x"), y_col.label("y"))
-        .join(Rating)
-        .filter(x_col.isnot(None), y_col.isnot(None))
-    )
-    if x_field == "days_since_roast" or y_field == "days_since_roast":
-        query = query.filter(Brew.roast_date.isnot(None), Brew.brew_date.isnot(None))
-    if bean_name:
-        query = query.filter(Brew.bean_name == bean_name)
-    if grinder:
-        query = query.filter(Brew.grinder == grinder)
-    if brew_method:
-        query = query.filter(Brew.brew_method == brew_method)
+    counts = np.bincount(cell, minlength=nx * ny)
+    sum_x = np.bincount(cell, weights=xs, minlength=nx * ny)
+    sum_y = np.bincount(cell, weights=ys, minlength=nx * ny)
 
-    rows = query.all()
+    result = []
+    for c in np.nonzero(counts)[0]:
+        i, j = divmod(int(c), ny)
+        n = int(counts[c])
+        result.append({
+            "x_min": round(float(x_edges[i]), 3),
+            "x_max": round(float(x_edges[i + 1]), 3),
+            "y_min": round(float(y_edges[j]), 3),
+            "y_max": round(float(y_edges[j + 1]), 3),
+            "count": n,
+            "mean_x": round(float(sum_x[c] / n), 3),
+            "mean_y": round(float(sum_y[c] / n), 3),
+        })
+    return result
 
-    results = []
-    for r in rows:
-        x_val = r.x
-        y_val = r.y
-        if x_field == "grind_setting":
-            try:
-                x_val = int(str(x_val).replace(".", ""))
-            except (ValueError, TypeError):
-                continue
-        if y_field == "grind_setting":
-            try:
-                y_val = int(str(y_val).replace(".", ""))
-            except (ValueError, TypeError):
-                continue
-        if x_field == "days_since_roast":
-            try:
-                x_val = int(float(x_val))
-            except (ValueError, TypeError):
-                continue
-        if y_field == "days_since_roast":
-            try:
-                y_val = int(float(y_val))
-            except (ValueError, TypeError):
-                continue
-        results.append({"x": x_val, "y": y_val})
-    return results
+
+def get_correlation_stats(
+    db: Session,
+    x_field: str,
+    y_field: str,
+    bean_name: str | None = None,
+    grinder: str | None = None,
+    brew_method: str | None = None,
+    bins: int = 20,
+    max_points: int = 500,
+) -> dict:
+    """Bounded-size summary of an x/y relationship.
+
+    Returns Pearson and Spearman coefficients, a least-squares trend line,
+    occupied grid bins (count, mean x, mean y) and at most ``max_points``
+    raw points drawn uniformly at random, so the payload does not grow with
+    brew history.
+    """
+    loaded = _load_xy(db, x_field, y_field, bean_name, grinder, brew_method)
+    if loaded is None:
+        xs = ys = np.zeros(0)
+    else:
+        xs, ys = (a.astype(float) for a in loaded)
+    n = int(xs.size)
+
+    pearson = _pearson(xs, ys)
+    spearman = _pearson(_rankdata(xs), _rankdata(ys)) if n >= 2 else None
+    trend = None
+    if n >= 2 and np.ptp(xs) > 0:
+        slope, intercept = np.polyfit(xs, ys, 1)
+        trend = {"slope": round(float(slope), 4), "intercept": round(float(intercept), 4)}
+
+    if n > max_points:
+        # Fixed seed keeps the sample stable between chart reloads.
+        idx = np.sort(np.random.default_rng(0).choice(n, size=max_points, replace=False))
+    else:
+        idx = np.arange(n)
+
+    return {
+        "n": n,
+        "pearson": round(pearson, 4) if pearson is not None else None,
+        "spearman": round(spearman, 4) if spearman is not None else None,
+        "trend": trend,
+        "bins": _grid_bins(xs, ys, bins),
+        "points": [{"x": x, "y": y} for x, y in zip(xs[idx].tolist(), ys[idx].tolist())],
+        "sampled": n > max_points,
+    }
+
+
+def get_correlation_matrix(
+    db: Session,
+    bean_name: str | None = None,
+    grinder: str | None = None,
+    brew_method: str | None = None,
+    fields: list[str] | None = None,
+) -> dict:
+    """Pairwise Pearson correlations between every numeric brew/rating field.
+
+    All columns are loaded in one brew_features query. Missing values are handled pairwise:
+    each cell uses only the brews where both fields are present, and ``counts``
+    reports how many that was. Cells with fewer than two samples or zero
+    variance are None.
+    """
+    if fields is None:
+        fields = [*sorted(BREW_FIELDS), *sorted(COMPUTED_FIELDS), *sorted(RATING_FIELDS)]
+    else:
+        fields = [f for f in dict.fromkeys(fields) if _resolve_col(f) is not None]
+    if not fields:
+        return {"fields": [], "matrix": [], "counts": []}
+
+    cols = [_resolve_col(f).label(f) for f in fields]
+    rows = _apply_filters(db.query(*cols), bean_name, grinder, brew_method).all()
+
+    # None becomes NaN, which marks the value as missing.
+    values = np.array([tuple(r) for r in rows], dtype=float).reshape(len(rows), len(fields))
+    valid = ~np.isnan(values)
+    values[~valid] = 0
+
+    # Pairwise-complete sums: entry [i, j] sums field i over rows where j is also present.
+    v = valid.astype(float)
+    x = values * v
+    n = v.T @ v
+    s = x.T @ v
+    ss = (x * x).T @ v
+    sxy = x.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        num = n * sxy - s * s.T
+        den = np.sqrt((n * ss - s * s) * (n * ss.T - s.T * s.T))
+        r = np.where((n >= 2) & (den > 0), num / den, np.nan)
+    r = np.clip(r, -1.0, 1.0)
+
+    return {
+        "fields": fields,
+        "matrix": [[None if np.isnan(c) else round(float(c), 4) for c in row] for row in r],
+        "counts": n.astype(int).tolist(),
+    }
 
 
 def get_filter_options(db: Session) -> dict:
     bean_names = [
-        r[0] for r in db.query(Brew.bean_name).distinct().filter(Brew.bean_name.isnot(None)).order_by(Brew.bean_name).all()
+        r[0] for r in db.query(Bean.name).join(Brew, Brew.bean_id == Bean.id).distinct().order_by(Bean.name).all()
     ]
     grinders = [
         r[0] for r in db.query(Brew.grinder).distinct().filter(Brew.grinder.isnot(None)).order_by(Brew.grinder).all()
@@ -0,0 +1,228 @@
+"""Autocomplete for brew roaster, bean, origin, process and method values.
+
+Each worker keeps an in-memory index of the distinct values and how many
+brews use each: a sorted word list for short prefixes and trigram postings
+for longer fragments. The index is keyed on the shared data version (see
+cache_service), so every worker notices a write with one primary-key lookup
+per request. It then reads only the brews changed since its last look
+(through the indexed ``updated_at``) and merges in new values. A full
+rebuild, in a background thread every AUTOCOMPLETE_REBUILD_SECONDS, drops
+values no brew uses any more; imports and restores (a new epoch or a reset
+tombstone) rebuild straight away.
+
+Suggestions tolerate that lag, but list filters must not miss a brew. A
+catch-up can: a write committed long after its ``updated_at`` was set falls
+outside the look-back window. So the SQLite list filters resolve "roaster
+contains ..." through the index to an IN list on the indexed column only
+while it is a full build of the current data version; after a catch-up they
+keep ILIKE and start an early rebuild. Postgres always uses ILIKE, served
+by the pg_trgm indexes of migration 0009.
+"""
+
+import heapq
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.brew import Brew
+from app.models.tombstone import Tombstone
+from app.services import cache_service, sync_service
+
+logger = logging.getLogger(__name__)
+
+FIELDS = {
+    "roaster": Brew.roaster,
+    "bean_name": Brew.bean_name,
+    "bean_origin": Brew.bean_origin,
+    "bean_process": Brew.bean_process,
+    "brew_method": Brew.brew_method,
+}
+MAX_SUGGESTIONS = 50
+# Filters matching more values than this fall back to ILIKE.
+MAX_FILTER_VALUES = 500
+
+_WORD = re.compile(r"\w+")
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ValueIndex:
+    """Distinct values of one column, searchable by word prefix and substring."""
+
+    def __init__(self, counts: dict[str, int]):
+        self.counts = counts
+        self._values = list(counts)
+        self._folded = [value.casefold() for value in self._values]
+        self._words = sorted(
+            (word, i) for i, folded in enumerate(self._folded) for word in set(_WORD.findall(folded))
+        )
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        for i, folded in enumerate(self._folded):
+            for trigram in _trigrams(folded):
+                self._postings[trigram].append(i)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _word_prefix(self, prefix: str) -> set[int]:
+        found = set()
+        j = bisect_left(self._words, (prefix,))
+        while j < len(self._words) and self._words[j][0].startswith(prefix):
+            found.add(self._words[j][1])
+            j += 1
+        return found
+
+    def _containing(self, text: str) -> list[int]:
+        if len(text) < 3:
+            return [i for i, folded in enumerate(self._folded) if text in folded]
+        postings = sorted((self._postings.get(t, ()) for t in _trigrams(text)), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+        return [i for i in candidates if text in self._folded[i]]
+
+    def containing(self, text: str) -> list[str]:
+        """Every value containing ``text``, ignoring case."""
+        return [self._values[i] for i in self._containing(text.casefold())]
+
+    def suggest(self, text: str, limit: int) -> list[str]:
+        """Values starting with ``text``, then with a word starting with it, then
+        containing it (fragments of three or more characters); most used first."""
+        text = text.strip().casefold()
+        if not text:
+            ids = range(len(self._values))
+        elif len(text) < 3 and " " not in text:
+            ids = self._word_prefix(text)
+        else:
+            ids = self._containing(text)
+
+        def key(i):
+            folded = self._folded[i]
+            place = 0 if folded.startswith(text) else 1 if f" {text}" in f" {folded}" else 2
+            return place, -self.counts[self._values[i]], folded
+
+        return [self._values[i] for i in heapq.nsmallest(limit, ids, key=key)]
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    indexes: dict[str, ValueIndex]
+    version: str
+    synced_at: datetime  # brews updated since (minus the sync overlap) are re-read
+    built_at: float  # time.monotonic() of the last full build
+    exact: bool  # a full build, no catch-ups since: holds every value in use
+
+
+_lock = threading.Lock()
+_snapshot: _Snapshot | None = None
+_rebuilding = False
+
+
+def _epoch(version: str) -> str:
+    return version.split("-", 1)[0]
+
+
+def _value_counts(db: Session, since: datetime | None = None) -> dict[str, dict[str, int]]:
+    counts = {}
+    for name, column in FIELDS.items():
+        stmt = select(column, func.count()).where(column.isnot(None)).group_by(column)
+        if since is not None:
+            stmt = stmt.where(Brew.updated_at >= since)
+        counts[name] = dict(db.execute(stmt).all())
+    return counts
+
+
+def _build(db: Session, version: str) -> _Snapshot:
+    started = datetime.utcnow()
+    indexes = {name: ValueIndex(counts) for name, counts in _value_counts(db).items()}
+    return _Snapshot(indexes, version, started, time.monotonic(), True)
+
+
+def _catch_up(db: Session, snapshot: _Snapshot, version: str) -> _Snapshot:
+    since = snapshot.synced_at - sync_service.CURSOR_OVERLAP
+    replaced = db.query(Tombstone.id).filter(
+        Tombstone.entity == sync_service.RESET, Tombstone.deleted_at >= since
+    ).first()
+    if replaced or _epoch(version) != _epoch(snapshot.version):
+        return _build(db, version)
+    started = datetime.utcnow()
+    indexes = dict(snapshot.indexes)
+    for name, counts in _value_counts(db, since).items():
+        known = indexes[name].counts
+        added = {value: count for value, count in counts.items() if value not in known}
+        if added:
+            indexes[name] = ValueIndex({**known, **added})
+    return _Snapshot(indexes, version, started, snapshot.built_at, False)
+
+
+def _rebuild_in_background(bind) -> None:
+    global _rebuilding
+
+    def run():
+        global _snapshot, _rebuilding
+        try:
+            with Session(bind) as db:
+                fresh = _build(db, cache_service.get_data_version(db))
+            # Possibly older than a catch-up that ran meanwhile; the next
+            # request then catches up from here.
+            with _lock:
+                _snapshot = fresh
+        except Exception:
+            logger.exception("Rebuilding the autocomplete index failed")
+        finally:
+            _rebuilding = False
+
+    _rebuilding = True
+    threading.Thread(target=run, name="autocomplete-rebuild", daemon=True).start()
+
+
+def _current(db: Session) -> _Snapshot:
+    global _snapshot
+    version = cache_service.get_data_version(db)
+    snapshot = _snapshot
+    if snapshot is None or snapshot.version != version:
+        with _lock:
+            snapshot = _snapshot
+            if snapshot is None:
+                snapshot = _snapshot = _build(db, version)
+            elif snapshot.version != version:
+                snapshot = _snapshot = _catch_up(db, snapshot, version)
+    if time.monotonic() - snapshot.built_at > settings.autocomplete_rebuild_seconds and not _rebuilding:
+        _rebuild_in_background(db.get_bind())
+    return snapshot
+
+
+def invalidate() -> None:
+    """Forget this worker's index; the next request rebuilds it."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+def suggest(db: Session, field: str, text: str = "", limit: int = 10) -> list[str]:
+    if field not in FIELDS:
+        raise ValueError(f"Unknown field: {field!r}")
+    return _current(db).indexes[field].suggest(text, max(1, min(limit, MAX_SUGGESTIONS)))
+
+
+def matching_values(db: Session, field: str, text: str) -> list[str] | None:
+    """Every value of ``field`` containing ``text``, or None when there are too
+    many or the index may be missing some (see the module docstring)."""
+    snapshot = _current(db)
+    if not snapshot.exact:
+        if not _rebuilding:
+            _rebuild_in_background(db.get_bind())
+        return None
+    values = snapshot.indexes[field].containing(text)
+    return values if len(values) <= MAX_FILTER_VALUES else None
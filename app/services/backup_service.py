@@ -0,0 +1,509 @@
+"""Compressed, checksummed database snapshots and restore.
+
+Three kinds of snapshot are written to BACKUP_DIR, each as a gzip file plus
+a ``<name>.json`` manifest (written last, so a snapshot without one is
+incomplete and ignored):
+
+- ``full`` on SQLite: a page copy made with SQLite's online backup API.
+- ``full`` on other databases: a logical dump, one JSON line per row of
+  every table, read from a single repeatable-read transaction through a
+  streaming cursor.
+- ``incremental``: the beans, brews, ratings, templates and inventory rows changed
+  since the previous snapshot (by ``updated_at``) and the tombstones of
+  rows deleted since then, plus a whole copy of the lookup lists and
+  recommendation rules (small, and without ``updated_at``).
+
+Everything streams in fixed-size chunks, so memory use does not grow with
+the database. Restoring a snapshot restores its base full snapshot and
+replays the incrementals up to it. See ``python -m app.backup --help``.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import Date, DateTime, Engine, delete, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import Base, engine as default_engine
+from app.models.tombstone import Tombstone
+from app.services import (
+    bean_service, cache_service, event_service, feature_service, flavor_service, rollup_service, search_service,
+    sync_service,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+CHUNK_SIZE = 1 << 20
+BATCH_SIZE = 1000
+
+# Incremental snapshots replay these in order; deletions in reverse.
+INCREMENTAL_ENTITIES = ("beans", "templates", "brews", "ratings", "inventory")
+# Copied whole into every incremental; replaying one drops the rows it lacks.
+SNAPSHOT_TABLES = ("flavor_notes", "brew_devices", "grinders", "brew_methods", "recommendation_rules")
+
+
+class BackupError(Exception):
+    pass
+
+
+def backup_dir() -> Path:
+    path = Path(settings.backup_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Manifests
+# ---------------------------------------------------------------------------
+
+def list_backups() -> list[dict]:
+    """Manifests of complete snapshots, oldest first."""
+    manifests = []
+    for path in backup_dir().glob("*.json"):
+        try:
+            manifests.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return sorted(manifests, key=lambda m: m["created_at"])
+
+
+def get_manifest(name: str) -> dict:
+    path = backup_dir() / f"{Path(name).name}.json"
+    if not path.exists():
+        raise BackupError(f"No backup named {name!r}")
+    return json.loads(path.read_text())
+
+
+def _chain(name: str) -> list[dict]:
+    """The full snapshot ``name`` builds on, then each incremental up to it."""
+    chain = [get_manifest(name)]
+    while chain[-1]["kind"] == "incremental":
+        chain.append(get_manifest(chain[-1]["parent"]))
+    return chain[::-1]
+
+
+def _new_name(kind: str) -> str:
+    return f"{kind}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}"
+
+
+def _write_manifest(manifest: dict) -> None:
+    path = backup_dir() / f"{manifest['name']}.json"
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2) + "\n")
+    os.replace(tmp, path)
+
+
+def _schema_revision(engine: Engine) -> str | None:
+    from app.bootstrap import current_revision
+
+    return current_revision(engine)
+
+
+def prune(keep: int | None = None) -> list[str]:
+    """Delete all but the newest ``keep`` full snapshots and their incrementals."""
+    keep = settings.backup_keep if keep is None else keep
+    manifests = list_backups()
+    fulls = [m["name"] for m in manifests if m["kind"] == "full"]
+    kept = set(fulls[-keep:]) if keep > 0 else set()
+    removed = []
+    for manifest in manifests:
+        root = manifest["name"] if manifest["kind"] == "full" else manifest["base"]
+        if root not in kept:
+            (backup_dir() / f"{manifest['name']}.json").unlink(missing_ok=True)
+            (backup_dir() / manifest["file"]).unlink(missing_ok=True)
+            removed.append(manifest["name"])
+    return removed
+
+
+# ---------------------------------------------------------------------------
+# Compressed, hashed files
+# ---------------------------------------------------------------------------
+
+class _HashingWriter:
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.raw.write(data)
+
+    def flush(self) -> None:
+        self.raw.flush()
+
+
+class _SnapshotWriter:
+    """Gzip output to a temporary file, renamed into place by finish()."""
+
+    def __init__(self, filename: str):
+        self.path = backup_dir() / filename
+        self.tmp = self.path.with_name(self.path.name + ".tmp")
+        self._raw = open(self.tmp, "wb")
+        self._hasher = _HashingWriter(self._raw)
+        self.gzip = gzip.GzipFile(fileobj=self._hasher, mode="wb", compresslevel=6)
+
+    def write_json(self, record: dict) -> None:
+        self.gzip.write(json.dumps(record, default=_encode_value, separators=(",", ":")).encode())
+        self.gzip.write(b"\n")
+
+    def finish(self) -> dict:
+        self.gzip.close()
+        self._raw.close()
+        os.replace(self.tmp, self.path)
+        return {"file": self.path.name, "sha256": self._hasher.sha256.hexdigest(),
+                "size": self._hasher.size}
+
+    def abort(self) -> None:
+        self.gzip.close()
+        self._raw.close()
+        self.tmp.unlink(missing_ok=True)
+
+
+def verify(name: str) -> dict:
+    """Recompute the checksum of a snapshot file; raises BackupError on mismatch."""
+    manifest = get_manifest(name)
+    digest = hashlib.sha256()
+    with open(backup_dir() / manifest["file"], "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    if digest.hexdigest() != manifest["sha256"]:
+        raise BackupError(f"Checksum mismatch for {name}: the snapshot is corrupt")
+    return manifest
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _decode_row(table, row: dict) -> dict:
+    for column in table.columns:
+        value = row.get(column.name)
+        if isinstance(value, str):
+            if isinstance(column.type, DateTime):
+                row[column.name] = datetime.fromisoformat(value)
+            elif isinstance(column.type, Date):
+                row[column.name] = date.fromisoformat(value)
+    return row
+
+
+def _read_records(manifest: dict):
+    with gzip.open(backup_dir() / manifest["file"], "rb") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+# ---------------------------------------------------------------------------
+# Creating snapshots
+# ---------------------------------------------------------------------------
+
+def _sqlite_path(engine: Engine) -> str | None:
+    if engine.dialect.name != "sqlite":
+        return None
+    path = engine.url.database
+    if not path or path == ":memory:":
+        raise BackupError("In-memory SQLite databases cannot be backed up")
+    return path
+
+
+def _copy_sqlite(path: str, target: str) -> None:
+    src = sqlite3.connect(path, timeout=settings.sqlite_busy_timeout_ms / 1000)
+    dst = sqlite3.connect(target)
+    try:
+        wal = src.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+        # Under WAL one read transaction gives a consistent copy without
+        # blocking writers. Otherwise copy in steps so writers get the lock
+        # between them (SQLite restarts the copy if the source changes).
+        pages = -1 if wal else settings.backup_pages_per_step
+        src.backup(dst, pages=pages, sleep=0.01)
+    finally:
+        dst.close()
+        src.close()
+
+
+def _full_sqlite(path: str, name: str) -> dict:
+    writer = _SnapshotWriter(f"{name}.sqlite.gz")
+    # The backup API can only write to a database file, so the page copy
+    # lands next to the snapshot and is deleted as soon as it is compressed.
+    copy = writer.path.with_name(f"{name}.sqlite.copy")
+    try:
+        _copy_sqlite(path, str(copy))
+        with open(copy, "rb") as f:
+            shutil.copyfileobj(f, writer.gzip, CHUNK_SIZE)
+    except BaseException:
+        writer.abort()
+        raise
+    finally:
+        copy.unlink(missing_ok=True)
+    return {"format": "sqlite", **writer.finish()}
+
+
+def _full_logical(engine: Engine, name: str) -> dict:
+    writer = _SnapshotWriter(f"{name}.jsonl.gz")
+    try:
+        with engine.connect() as conn:
+            if engine.dialect.name == "postgresql":
+                conn = conn.execution_options(isolation_level="REPEATABLE READ")
+                conn.execute(text("SET TRANSACTION READ ONLY"))
+            for table in Base.metadata.sorted_tables:
+                result = conn.execution_options(yield_per=BATCH_SIZE).execute(select(table))
+                for row in result:
+                    writer.write_json({"table": table.name, "row": dict(row._mapping)})
+    except BaseException:
+        writer.abort()
+        raise
+    return {"format": "logical", **writer.finish()}
+
+
+def create_full(engine: Engine = default_engine) -> dict:
+    """Write a full snapshot and return its manifest."""
+    name = _new_name("full")
+    # Anything changed after this moment is picked up by the next incremental.
+    cursor = sync_service.encode_cursor(datetime.utcnow())
+    path = _sqlite_path(engine)
+    details = _full_sqlite(path, name) if path else _full_logical(engine, name)
+    manifest = {
+        "version": FORMAT_VERSION, "name": name, "kind": "full", "base": name, "parent": None,
+        "created_at": datetime.utcnow().isoformat(), "cursor": cursor,
+        "dialect": engine.dialect.name, "schema_revision": _schema_revision(engine), **details,
+    }
+    _write_manifest(manifest)
+    return manifest
+
+
+def create_incremental(engine: Engine = default_engine) -> dict:
+    """Write the changes since the newest snapshot; needs an existing full snapshot."""
+    manifests = list_backups()
+    if not manifests:
+        raise BackupError("No full snapshot to build on; create one first")
+    parent = manifests[-1]
+    since = sync_service.decode_cursor(parent["cursor"]) - sync_service.CURSOR_OVERLAP
+    name = _new_name("incremental")
+    cursor = sync_service.encode_cursor(datetime.utcnow())
+
+    writer = _SnapshotWriter(f"{name}.jsonl.gz")
+    counts = {}
+    try:
+        with Session(engine) as db:
+            replaced = db.execute(
+                select(Tombstone.id).where(
+                    Tombstone.entity == sync_service.RESET,
+                    Tombstone.deleted_at >= since,
+                )
+            ).first()
+            if replaced:
+                raise BackupError("Data was replaced since the last snapshot; create a full one")
+            tombstones = db.execute(
+                select(Tombstone.entity, Tombstone.entity_id)
+                .where(Tombstone.deleted_at >= since)
+                .order_by(Tombstone.id)
+            )
+            for entity, entity_id in tombstones:
+                writer.write_json({"deleted": entity, "id": entity_id})
+            for entity in INCREMENTAL_ENTITIES:
+                table = sync_service.ENTITIES[entity].__table__
+                stmt = select(table).where(table.c.updated_at >= since).order_by(table.c.id)
+                counts[entity] = 0
+                for row in db.execute(stmt, execution_options={"yield_per": BATCH_SIZE}):
+                    writer.write_json({"table": table.name, "row": dict(row._mapping)})
+                    counts[entity] += 1
+            for table_name in SNAPSHOT_TABLES:
+                table = Base.metadata.tables[table_name]
+                counts[table_name] = 0
+                for row in db.execute(select(table).order_by(table.c.id)):
+                    writer.write_json({"table": table_name, "row": dict(row._mapping)})
+                    counts[table_name] += 1
+    except BaseException:
+        writer.abort()
+        raise
+
+    manifest = {
+        "version": FORMAT_VERSION, "name": name, "kind": "incremental",
+        "base": parent["base"], "parent": parent["name"],
+        "created_at": datetime.utcnow().isoformat(), "cursor": cursor,
+        "dialect": engine.dialect.name, "schema_revision": _schema_revision(engine),
+        "format": "logical", "rows": counts, "snapshot_tables": list(SNAPSHOT_TABLES), **writer.finish(),
+    }
+    _write_manifest(manifest)
+    return manifest
+
+
+_running = threading.Lock()
+
+
+def start_backup(kind: str = "full", engine: Engine = default_engine) -> bool:
+    """Run a snapshot on a daemon thread; False if one is already running."""
+    if not _running.acquire(blocking=False):
+        return False
+    create = create_full if kind == "full" else create_incremental
+
+    def run():
+        try:
+            create(engine)
+            prune()
+        except Exception:
+            logger.exception("%s backup failed", kind.capitalize())
+        finally:
+            _running.release()
+
+    threading.Thread(target=run, name=f"backup-{kind}", daemon=True).start()
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Restore
+# ---------------------------------------------------------------------------
+
+def _insert_batches(conn, records) -> None:
+    tables = Base.metadata.tables
+    batch_table, batch = None, []
+    for record in records:
+        table = tables[record["table"]]
+        if table is not batch_table or len(batch) >= BATCH_SIZE:
+            if batch:
+                conn.execute(insert(batch_table), batch)
+            batch_table, batch = table, []
+        batch.append(_decode_row(table, record["row"]))
+    if batch:
+        conn.execute(insert(batch_table), batch)
+
+
+def _reset_sequences(conn) -> None:
+    for table in Base.metadata.sorted_tables:
+        if "id" in table.c and table.c.id.autoincrement is not False and table.c.id.primary_key:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+            ))
+
+
+def _restore_logical_full(conn, manifest: dict) -> None:
+    for table in reversed(Base.metadata.sorted_tables):
+        conn.execute(delete(table))
+    _insert_batches(conn, _read_records(manifest))
+
+
+def _upsert(conn, table, rows: list[dict]) -> None:
+    dialect = conn.dialect.name
+    module = postgresql if dialect == "postgresql" else sqlite if dialect == "sqlite" else None
+    if module is None:
+        raise BackupError(f"Incremental restore is not supported on {dialect!r}")
+    stmt = module.insert(table)
+    keys = [c.name for c in table.primary_key.columns]
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={c.name: stmt.excluded[c.name] for c in table.columns if c.name not in keys},
+    ), rows)
+
+
+def _apply_deletions(conn, deleted: dict[str, list[int]]) -> None:
+    for entity in reversed(INCREMENTAL_ENTITIES):
+        table = sync_service.ENTITIES[entity].__table__
+        ids = deleted.get(entity, [])
+        for start in range(0, len(ids), BATCH_SIZE):
+            conn.execute(delete(table).where(table.c.id.in_(ids[start:start + BATCH_SIZE])))
+
+
+def _apply_incremental(conn, manifest: dict) -> None:
+    # Tombstones come first in the file and are applied before any upsert,
+    # so a row deleted and re-created since the parent ends up present.
+    deleted: dict[str, list[int]] = {}
+    upserts = []
+    # Older incrementals carry no snapshot tables; leave those as they are.
+    kept: dict[str, set[int]] = {name: set() for name in manifest.get("snapshot_tables", ())}
+    for record in _read_records(manifest):
+        if "deleted" in record:
+            deleted.setdefault(record["deleted"], []).append(record["id"])
+            continue
+        if deleted is not None:
+            _apply_deletions(conn, deleted)
+            deleted = None
+        if record["table"] in kept:
+            kept[record["table"]].add(record["row"]["id"])
+        upserts.append(record)
+        if len(upserts) >= BATCH_SIZE:
+            _upsert_records(conn, upserts)
+            upserts = []
+    if deleted:
+        _apply_deletions(conn, deleted)
+    _upsert_records(conn, upserts)
+    for name, ids in kept.items():
+        table = Base.metadata.tables[name]
+        conn.execute(delete(table).where(table.c.id.not_in(ids)))
+
+
+def _upsert_records(conn, records: list[dict]) -> None:
+    by_table: dict[str, list[dict]] = {}
+    for record in records:
+        by_table.setdefault(record["table"], []).append(record["row"])
+    for name, rows in by_table.items():
+        table = Base.metadata.tables[name]
+        _upsert(conn, table, [_decode_row(table, row) for row in rows])
+
+
+def restore(name: str, engine: Engine = default_engine) -> list[str]:
+    """Restore snapshot ``name`` (and the chain it builds on) into ``engine``.
+
+    Stop the app first: the target's data is replaced. The target schema
+    must be at the snapshot's revision (run ``python -m app.bootstrap``);
+    a SQLite page copy brings its own schema. Returns the applied names.
+    """
+    chain = _chain(name)
+    for manifest in chain:
+        verify(manifest["name"])
+
+    full, incrementals = chain[0], chain[1:]
+    path = _sqlite_path(engine)
+    if full["format"] == "sqlite":
+        if not path:
+            raise BackupError("A SQLite page snapshot can only be restored into SQLite")
+        engine.dispose()
+        with tempfile.TemporaryDirectory(dir=backup_dir()) as tmp:
+            copy = os.path.join(tmp, "snapshot.db")
+            with gzip.open(backup_dir() / full["file"], "rb") as src, open(copy, "wb") as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            _copy_sqlite(copy, path)
+    else:
+        revision = _schema_revision(engine)
+        if revision != full["schema_revision"]:
+            raise BackupError(
+                f"Target schema is at {revision or 'none'}, snapshot needs "
+                f"{full['schema_revision']}; run `python -m app.bootstrap` first"
+            )
+        with engine.begin() as conn:
+            _restore_logical_full(conn, full)
+
+    with engine.begin() as conn:
+        for manifest in incrementals:
+            _apply_incremental(conn, manifest)
+        if conn.dialect.name == "postgresql":
+            _reset_sequences(conn)
+
+    with Session(engine) as db:
+        # Snapshots from before the bean catalog carry no bean ids.
+        bean_service.link_all(db)
+        rollup_service.rebuild_rollups(db)
+        search_service.rebuild_index(db)
+        flavor_service.rebuild(db)
+        feature_service.rebuild(db)
+        cache_service.bump_data_version(db)
+        # Sync clients hold cursors into the replaced data.
+        sync_service.record_reset(db)
+        event_service.publish(db, "data.replaced", {"source": "restore"})
+        db.commit()
+    return [m["name"] for m in chain]
@@ -0,0 +1,207 @@
+"""The bean catalog: one ``Bean`` per roaster + bean name.
+
+Brews, templates and inventory entries point at their bean through
+``bean_id``. Beans are matched on normalized keys (case-folded, whitespace
+collapsed), so "onyx  coffee lab" and "Onyx Coffee Lab" are the same roaster.
+Write paths resolve the bean before saving and copy its spelling into the
+row's ``roaster`` / ``bean_name``, so those text columns stay consistent for
+display, search and export. Shelf and analytics queries group and join on
+the integer key.
+
+A bean name without a roaster (inventory and templates allow that) is
+matched to the only roaster that has a bean of that name, if there is
+exactly one.
+"""
+
+from collections.abc import Iterable
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.bean import Bean
+from app.models.brew import Brew
+from app.models.inventory import BeanInventory
+from app.models.template import BrewTemplate
+
+_CHUNK = 500
+
+
+def normalize(text: str | None) -> str:
+    return " ".join(text.split()).casefold() if text else ""
+
+
+def _clean(text: str | None) -> str | None:
+    return " ".join(text.split()) if text and text.strip() else None
+
+
+def _insert_statement(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(Bean).on_conflict_do_nothing(index_elements=["roaster_key", "name_key"])
+    if dialect == "sqlite":
+        return sqlite.insert(Bean).on_conflict_do_nothing(index_elements=["roaster_key", "name_key"])
+    # Elsewhere only the beans just looked up as missing are inserted.
+    return insert(Bean)
+
+
+def _by_name(db: Session, name_keys: set[str]) -> dict[tuple[str, str], Bean]:
+    beans = {}
+    names = sorted(name_keys)
+    for start in range(0, len(names), _CHUNK):
+        for bean in db.scalars(select(Bean).where(Bean.name_key.in_(names[start:start + _CHUNK]))):
+            beans[(bean.roaster_key, bean.name_key)] = bean
+    return beans
+
+
+def resolve(db: Session, entries: Iterable[dict]) -> dict[tuple[str, str], Bean]:
+    """Beans for ``entries`` (dicts with roaster, bean_name and optionally
+    bean_origin / bean_process), created as needed; keyed by ``key(entry)``.
+
+    Entries without a bean name are skipped. New beans take the first
+    entry's spelling; existing ones get a missing origin or process filled in.
+    Does not commit.
+    """
+    wanted: dict[tuple[str, str], dict] = {}
+    for entry in entries:
+        if normalize(entry.get("bean_name")):
+            wanted.setdefault(key(entry), entry)
+    if not wanted:
+        return {}
+    db.flush()
+    beans = _by_name(db, {name for _, name in wanted})
+
+    # A missing roaster means the one roaster with a bean of that name.
+    roasters_by_name: dict[str, list[str]] = {}
+    for roaster_key, name_key in beans:
+        if roaster_key:
+            roasters_by_name.setdefault(name_key, []).append(roaster_key)
+    found = {}
+    for (roaster_key, name_key), entry in wanted.items():
+        candidates = roasters_by_name.get(name_key, [])
+        if not roaster_key and len(candidates) == 1:
+            found[(roaster_key, name_key)] = beans[(candidates[0], name_key)]
+
+    missing = [
+        {
+            "roaster": _clean(entry.get("roaster")), "name": _clean(entry["bean_name"]),
+            "origin": _clean(entry.get("bean_origin")), "process": _clean(entry.get("bean_process")),
+            "roaster_key": bean_key[0], "name_key": bean_key[1],
+        }
+        for bean_key, entry in wanted.items()
+        if bean_key not in beans and bean_key not in found
+    ]
+    if missing:
+        # A concurrent writer may create the same bean; ON CONFLICT keeps theirs
+        # (without ON CONFLICT the unique key rejects the second insert).
+        for start in range(0, len(missing), _CHUNK):
+            db.execute(_insert_statement(db), missing[start:start + _CHUNK])
+        beans = _by_name(db, {name for _, name in wanted})
+
+    for bean_key, entry in wanted.items():
+        bean = found.get(bean_key) or beans[bean_key]
+        found[bean_key] = bean
+        if bean.origin is None and _clean(entry.get("bean_origin")):
+            bean.origin = _clean(entry.get("bean_origin"))
+        if bean.process is None and _clean(entry.get("bean_process")):
+            bean.process = _clean(entry.get("bean_process"))
+    return found
+
+
+def key(entry: dict) -> tuple[str, str]:
+    return normalize(entry.get("roaster")), normalize(entry.get("bean_name"))
+
+
+def _apply(values: dict, bean: Bean | None) -> dict:
+    values["bean_id"] = bean.id if bean else None
+    if bean:
+        values["roaster"] = bean.roaster if bean.roaster is not None else values.get("roaster")
+        values["bean_name"] = bean.name
+    return values
+
+
+def link_rows(db: Session, rows: list[dict]) -> list[dict]:
+    """Set ``bean_id`` and the bean's spelling on column dicts about to be inserted."""
+    beans = resolve(db, rows)
+    for row in rows:
+        _apply(row, beans.get(key(row)))
+    return rows
+
+
+def _values(obj: Brew | BrewTemplate | BeanInventory) -> dict:
+    return {
+        "roaster": obj.roaster, "bean_name": obj.bean_name,
+        "bean_origin": getattr(obj, "bean_origin", None),
+        "bean_process": getattr(obj, "bean_process", None),
+    }
+
+
+def _set(obj: Brew | BrewTemplate | BeanInventory, bean: Bean | None) -> None:
+    values = _apply(_values(obj), bean)
+    obj.bean_id = values["bean_id"]
+    if bean:
+        obj.roaster, obj.bean_name = values["roaster"], values["bean_name"]
+
+
+def link(db: Session, obj: Brew | BrewTemplate | BeanInventory) -> None:
+    """Point a brew, template or inventory entry at the bean its strings name."""
+    values = _values(obj)
+    _set(obj, resolve(db, [values]).get(key(values)))
+
+
+def link_all(db: Session) -> None:
+    """Link every unlinked brew, template and inventory entry (imports, restores).
+
+    Inventory entries that turn out to name the same bean are merged,
+    keeping the most recently updated. Does not commit.
+    """
+    for model in (Brew, BrewTemplate):
+        pairs = db.execute(
+            select(model.roaster, model.bean_name).distinct()
+            .where(model.bean_id.is_(None), model.bean_name.isnot(None))
+        ).all()
+        if not pairs:
+            continue
+        details = {}
+        if model is Brew:
+            for row in db.execute(
+                select(Brew.roaster, Brew.bean_name, Brew.bean_origin, Brew.bean_process)
+                .where(Brew.bean_id.is_(None))
+                .where((Brew.bean_origin.isnot(None)) | (Brew.bean_process.isnot(None)))
+                .distinct()
+            ):
+                details.setdefault((row.roaster, row.bean_name), dict(row._mapping))
+        entries = [details.get(pair, {"roaster": pair[0], "bean_name": pair[1]}) for pair in pairs]
+        beans = resolve(db, entries)
+        for roaster, bean_name in pairs:
+            bean = beans.get(key({"roaster": roaster, "bean_name": bean_name}))
+            if bean is None:
+                continue
+            db.execute(
+                update(model)
+                .where(
+                    model.bean_id.is_(None),
+                    model.roaster.is_not_distinct_from(roaster),
+                    model.bean_name == bean_name,
+                )
+                .values(_apply({"roaster": roaster, "bean_name": bean_name}, bean))
+                .execution_options(synchronize_session=False)
+            )
+
+    unlinked = db.scalars(
+        select(BeanInventory).where(BeanInventory.bean_id.is_(None))
+        .order_by(BeanInventory.updated_at.desc(), BeanInventory.id.desc())
+    ).all()
+    beans = resolve(db, [_values(inv) for inv in unlinked])
+    taken = set(db.scalars(select(BeanInventory.bean_id).where(BeanInventory.bean_id.isnot(None))))
+    kept = []
+    for inv in unlinked:
+        bean = beans.get(key(_values(inv)))
+        if bean is not None and bean.id in taken:
+            db.delete(inv)
+        else:
+            taken.add(bean.id if bean else None)
+            kept.append((inv, bean))
+    db.flush()
+    for inv, bean in kept:
+        _set(inv, bean)
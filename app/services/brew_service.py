@@ -1,28 +1,120 @@
+import csv
+import io
+import json
 from datetime import date
+from typing import Iterator
 
-from sqlalchemy import desc
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Row, desc, insert, select
 from sqlalchemy.orm import Session, joinedload
 
 from app.models.brew import Brew
 from app.models.rating import Rating
-from app.schemas.brew import BrewCreate, BrewUpdate
+from app.models.template import BrewTemplate
+from app.schemas.brew import BrewBulkItem, BrewCreate, BrewUpdate
+from app.services import (
+    autocomplete_service, bean_service, cache_service, event_service, feature_service, flavor_service,
+    rollup_service, search_service, sync_service,
+)
 
+MAX_BULK_BREWS = 5000
 
-def create_brew(db: Session, data: BrewCreate) -> Brew:
+_bulk_item = TypeAdapter(BrewBulkItem)
+
+
+def _convert_temps(values: dict) -> dict:
     # Auto-convert temperatures
-    values = data.model_dump()
     if values.get("water_temp_f") and not values.get("water_temp_c"):
         values["water_temp_c"] = round((values["water_temp_f"] - 32) * 5 / 9, 1)
     elif values.get("water_temp_c") and not values.get("water_temp_f"):
         values["water_temp_f"] = round(values["water_temp_c"] * 9 / 5 + 32, 1)
+    return values
 
+
+def create_brew(db: Session, data: BrewCreate) -> Brew:
+    values = _convert_temps(data.model_dump())
     brew = Brew(**values)
+    bean_service.link(db, brew)
     db.add(brew)
+    db.flush()
+    search_service.reindex(db, [brew.id])
+    flavor_service.reindex(db, [brew.id])
+    feature_service.refresh(db, [brew.id])
+    event_service.publish(db, "brew.created", event_service.brew_fields(brew))
+    cache_service.bump_data_version(db)
     db.commit()
     db.refresh(brew)
     return brew
 
 
+def create_brews_bulk(db: Session, raw_items: list, atomic: bool = False) -> dict:
+    """Validate and insert many brews (with optional inline ratings) at once.
+
+    Every item is validated up front; invalid items are reported by index
+    and skipped, or with ``atomic`` nothing is inserted. Valid brews go in as
+    one multi-row INSERT ... RETURNING, ratings as a second, and the whole
+    batch commits once.
+    """
+    valid: list[tuple[int, BrewBulkItem]] = []
+    errors = []
+    for index, raw in enumerate(raw_items):
+        try:
+            valid.append((index, _bulk_item.validate_python(raw)))
+        except ValidationError as exc:
+            errors.append({"index": index, "errors": exc.errors(include_url=False, include_context=False)})
+
+    template_ids = {item.template_id for _, item in valid if item.template_id is not None}
+    if template_ids:
+        known = {
+            row.id for row in
+            db.query(BrewTemplate.id).filter(BrewTemplate.id.in_(template_ids)).all()
+        }
+        kept = []
+        for index, item in valid:
+            if item.template_id is None or item.template_id in known:
+                kept.append((index, item))
+            else:
+                errors.append({"index": index, "errors": [{
+                    "loc": ["template_id"], "msg": f"Template {item.template_id} not found",
+                    "type": "not_found",
+                }]})
+        valid = kept
+
+    errors.sort(key=lambda e: e["index"])
+    if not valid or (atomic and errors):
+        return {"ids": [], "created": [], "errors": errors}
+
+    rows = [_convert_temps(item.model_dump(exclude={"rating"})) for _, item in valid]
+    bean_service.link_rows(db, rows)
+    ids = db.scalars(
+        insert(Brew).returning(Brew.id, sort_by_parameter_order=True), rows
+    ).all()
+
+    ratings = [
+        {"brew_id": brew_id, **item.rating.model_dump()}
+        for brew_id, (_, item) in zip(ids, valid)
+        if item.rating is not None
+    ]
+    if ratings:
+        db.execute(insert(Rating), ratings)
+        rollup_service.refresh_buckets(db, {
+            (row["brew_date"], row["bean_id"], row["grinder"], row["brew_method"])
+            for row, (_, item) in zip(rows, valid)
+            if item.rating is not None
+        })
+    search_service.reindex(db, ids)
+    flavor_service.reindex(db, ids)
+    feature_service.refresh(db, ids)
+    event_service.publish(db, "data.changed", {"source": "brews.bulk", "count": len(ids)})
+    cache_service.bump_data_version(db)
+    db.commit()
+    return {
+        "ids": list(ids),
+        "created": [{"index": index, "id": brew_id} for brew_id, (index, _) in zip(ids, valid)],
+        "errors": errors,
+    }
+
+
 def get_brew(db: Session, brew_id: int) -> Brew | None:
     return (
         db.query(Brew)
@@ -42,21 +134,84 @@ def list_brews(
     date_to: date | None = None,
 ) -> list[Brew]:
     query = db.query(Brew).options(joinedload(Brew.rating))
+    query = filter_brews(db, query, roaster, brew_method, date_from, date_to)
+    return query.order_by(desc(Brew.brew_date), desc(Brew.id)).offset(skip).limit(limit).all()
+
+
+def _contains(db: Session, field: str, text: str):
+    """``field`` contains ``text``, ignoring case.
+
+    Postgres runs the ILIKE on its trigram index. Elsewhere the autocomplete
+    index turns it into an IN list on the column's B-tree index, unless too
+    many values match to be worth it or the index may be stale.
+    """
+    column = autocomplete_service.FIELDS[field]
+    if db.get_bind().dialect.name != "postgresql":
+        values = autocomplete_service.matching_values(db, field, text)
+        if values is not None:
+            return column.in_(values)
+    return column.ilike(f"%{text}%")
+
+
+def filter_brews(db, query, roaster, brew_method, date_from, date_to):
+    """Apply the brew list filters to a query or select that includes brews."""
     if roaster:
-        query = query.filter(Brew.roaster.ilike(f"%{roaster}%"))
+        query = query.filter(_contains(db, "roaster", roaster))
     if brew_method:
-        query = query.filter(Brew.brew_method.ilike(f"%{brew_method}%"))
+        query = query.filter(_contains(db, "brew_method", brew_method))
     if date_from:
         query = query.filter(Brew.brew_date >= date_from)
     if date_to:
         query = query.filter(Brew.brew_date <= date_to)
-    return query.order_by(desc(Brew.brew_date), desc(Brew.id)).offset(skip).limit(limit).all()
+    return query
+
+
+# Columns the brew tables (API list, /brews, dashboard) actually show.
+LIST_COLUMNS = (
+    Brew.id, Brew.brew_date, Brew.roaster, Brew.bean_name, Brew.brew_method,
+    Brew.bean_amount_grams, Brew.water_amount_ml, Brew.grind_setting, Brew.grinder,
+    Rating.overall_score,
+)
+
+
+def list_brew_rows(
+    db: Session,
+    skip: int = 0,
+    limit: int = 50,
+    roaster: str | None = None,
+    brew_method: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> list[Row]:
+    """Like list_brews, but only the LIST_COLUMNS as plain rows (no ORM objects)."""
+    stmt = select(*LIST_COLUMNS).outerjoin(Rating, Rating.brew_id == Brew.id)
+    stmt = filter_brews(db, stmt, roaster, brew_method, date_from, date_to)
+    stmt = stmt.order_by(desc(Brew.brew_date), desc(Brew.id)).offset(skip).limit(limit)
+    return db.execute(stmt).all()
+
+
+def brew_rows_json(rows: list[Row]) -> bytes:
+    """Serialize list_brew_rows output as a BrewListRead JSON array."""
+    return json.dumps(
+        [
+            {
+                "id": r.id, "brew_date": r.brew_date.isoformat(), "roaster": r.roaster,
+                "bean_name": r.bean_name, "brew_method": r.brew_method,
+                "overall_score": r.overall_score,
+            }
+            for r in rows
+        ],
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode()
 
 
 def update_brew(db: Session, brew_id: int, data: BrewUpdate) -> Brew | None:
     brew = db.query(Brew).filter(Brew.id == brew_id).first()
     if not brew:
         return None
+    old_key = rollup_service.bucket_key(brew)
+    before = event_service.brew_fields(brew)
     updates = data.model_dump(exclude_unset=True)
     # Auto-convert temperatures
     if "water_temp_f" in updates and updates["water_temp_f"] and "water_temp_c" not in updates:
@@ -65,6 +220,17 @@ def update_brew(db: Session, brew_id: int, data: BrewUpdate) -> Brew | None:
         updates["water_temp_f"] = round(updates["water_temp_c"] * 9 / 5 + 32, 1)
     for key, value in updates.items():
         setattr(brew, key, value)
+    if updates.keys() & {"roaster", "bean_name", "bean_origin", "bean_process"}:
+        bean_service.link(db, brew)
+    rollup_service.refresh_buckets(db, [old_key, rollup_service.bucket_key(brew)])
+    search_service.reindex(db, [brew.id])
+    flavor_service.reindex(db, [brew.id])
+    feature_service.refresh(db, [brew.id])
+    event_service.publish(db, "brew.updated", {
+        "before": before, "after": event_service.brew_fields(brew),
+        "rating": event_service.rating_fields(brew.rating),
+    })
+    cache_service.bump_data_version(db)
     db.commit()
     db.refresh(brew)
     return brew
@@ -74,8 +240,67 @@ def delete_brew(db: Session, brew_id: int) -> bool:
     brew = db.query(Brew).filter(Brew.id == brew_id).first()
     if not brew:
         return False
+    key = rollup_service.bucket_key(brew)
+    if brew.rating is not None:
+        sync_service.record_deletion(db, "ratings", [brew.rating.id])
+    sync_service.record_deletion(db, "brews", [brew.id])
+    event_service.publish(db, "brew.deleted", {
+        **event_service.brew_fields(brew), "rating": event_service.rating_fields(brew.rating),
+    })
     db.delete(brew)
+    rollup_service.refresh_buckets(db, [key])
+    search_service.reindex(db, [brew_id])
+    flavor_service.reindex(db, [brew_id])
+    feature_service.refresh(db, [brew_id])
+    cache_service.bump_data_version(db)
     db.commit()
     return True
 
 
+# Export columns: every brew column, then the rating (minus its keys).
+CSV_COLUMNS = {
+    **{c.key: c for c in Brew.__table__.columns},
+    **{c.key: c for c in Rating.__table__.columns if c.key not in ("id", "brew_id")},
+}
+CSV_BATCH_SIZE = 1000
+
+
+def iter_brews_csv(
+    db: Session,
+    columns: list[str] | None = None,
+    roaster: str | None = None,
+    brew_method: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    batch_size: int = CSV_BATCH_SIZE,
+) -> Iterator[str]:
+    """Yield the brew + rating join as CSV text, one chunk per batch of rows.
+
+    Rows are fetched ``batch_size`` at a time (a server-side cursor on
+    Postgres), so memory stays flat however many brews are exported. Unknown
+    column names raise ValueError before anything is yielded.
+    """
+    columns = columns or list(CSV_COLUMNS)
+    unknown = [name for name in columns if name not in CSV_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+
+    stmt = select(*(CSV_COLUMNS[name] for name in columns)).outerjoin(
+        Rating, Rating.brew_id == Brew.id
+    )
+    stmt = filter_brews(db, stmt, roaster, brew_method, date_from, date_to)
+    stmt = stmt.order_by(desc(Brew.brew_date), desc(Brew.id))
+
+    def generate() -> Iterator[str]:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(columns)
+        yield buf.getvalue()
+        result = db.execute(stmt, execution_options={"yield_per": batch_size})
+        for batch in result.partitions():
+            buf.seek(0)
+            buf.truncate()
+            writer.writerows(batch)
+            yield buf.getvalue()
+
+    return generate()
@@ -0,0 +1,101 @@
+"""Response caching for read-heavy JSON endpoints.
+
+A single ``data_version`` row is bumped inside every brew, rating, inventory
+and import transaction. Cached responses and ETags are keyed on that version,
+so every gunicorn worker sees the same invalidation without a shared cache
+service: a request costs one primary-key lookup when nothing has changed.
+"""
+
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.data_version import DataVersion
+
+_ROW_ID = 1
+
+
+def get_data_version(db: Session) -> str:
+    row = db.query(DataVersion.epoch, DataVersion.version).filter(DataVersion.id == _ROW_ID).first()
+    return f"{row.epoch}-{row.version}" if row else "0"
+
+
+def ensure_data_version(db: Session) -> None:
+    if db.query(DataVersion.id).filter(DataVersion.id == _ROW_ID).first() is None:
+        db.add(DataVersion(id=_ROW_ID, epoch=uuid.uuid4().hex, version=0))
+        db.commit()
+
+
+def bump_data_version(db: Session) -> None:
+    """Increment the shared version as part of the caller's transaction."""
+    result = db.execute(
+        update(DataVersion).where(DataVersion.id == _ROW_ID).values(version=DataVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        db.add(DataVersion(id=_ROW_ID, epoch=uuid.uuid4().hex, version=1))
+
+
+class ResponseCache:
+    """Thread-safe LRU of rendered JSON bodies keyed by request."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, version: str, body: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(settings.response_cache_size)
+
+
+def _request_key(request: Request) -> str:
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{params}"
+
+
+def cached_json(request: Request, db: Session, build: Callable[[], Any]) -> Response:
+    """Serve ``build()`` as JSON, reusing the cached body while the data version holds.
+
+    The ETag depends only on the data version and the request, so a matching
+    If-None-Match gets a 304 without building or even caching the payload.
+    """
+    version = get_data_version(db)
+    key = _request_key(request)
+    etag = '"' + hashlib.sha1(f"{version}|{key}".encode()).hexdigest()[:20] + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    body = response_cache.get(key, version)
+    if body is None:
+        body = JSONResponse(jsonable_encoder(build())).body
+        response_cache.set(key, version, body)
+    return Response(body, media_type="application/json", headers=headers)
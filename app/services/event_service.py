@@ -0,0 +1,81 @@
+"""Change events for live updates (see app.events).
+
+Write paths call publish() inside their transaction, next to
+bump_data_version(), so an event becomes visible exactly when its change
+commits. Payloads are small deltas: enough for a page to adjust counts,
+averages and chart series without re-requesting them.
+
+Kinds: brew.created, brew.updated ({"before", "after"}), brew.deleted,
+rating.saved (with the "previous" score, if any), rating.deleted,
+inventory.changed, data.changed (bulk writes, {"source", "count"}) and
+data.replaced (import / restore).
+"""
+
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.change_event import ChangeEvent
+
+# Postgres NOTIFY channel that wakes every worker's bridge on commit.
+CHANNEL = "coffee_events"
+
+BREW_FIELDS = (
+    "id", "brew_date", "roaster", "bean_name", "brew_method", "grinder", "grind_setting",
+    "bean_amount_grams", "water_amount_ml",
+)
+
+
+def brew_fields(brew) -> dict:
+    return {name: getattr(brew, name) for name in BREW_FIELDS}
+
+
+def rating_fields(rating) -> dict | None:
+    if rating is None:
+        return None
+    return {
+        "overall_score": rating.overall_score,
+        "flavor_notes_accuracy": rating.flavor_notes_accuracy,
+    }
+
+
+def publish(db: Session, kind: str, payload: dict) -> None:
+    """Queue an event in the caller's transaction (does not commit)."""
+    db.add(ChangeEvent(kind=kind, payload=json.dumps(payload, default=str)))
+    if db.get_bind().dialect.name == "postgresql":
+        # Delivered when (and only if) the transaction commits.
+        db.execute(select(func.pg_notify(CHANNEL, kind)))
+
+
+def fetch_since(db: Session, last_id: int, limit: int = 500, missing=()) -> list[ChangeEvent]:
+    """Events after ``last_id``, plus those of the ``missing`` ids below it, by id.
+
+    Ids are assigned at insert but rows appear at commit, so on Postgres an
+    event can commit after one with a higher id was read; pollers pass the
+    ids they skipped as ``missing`` until those turn up or time out.
+    """
+    newer = ChangeEvent.id > last_id
+    return (
+        db.query(ChangeEvent)
+        .filter(or_(newer, ChangeEvent.id.in_(list(missing))) if missing else newer)
+        .order_by(ChangeEvent.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def latest_id(db: Session) -> int:
+    return db.query(func.max(ChangeEvent.id)).scalar() or 0
+
+
+def oldest_id(db: Session) -> int | None:
+    return db.query(func.min(ChangeEvent.id)).scalar()
+
+
+def prune(db: Session) -> None:
+    cutoff = datetime.utcnow() - timedelta(minutes=settings.event_retention_minutes)
+    db.query(ChangeEvent).filter(ChangeEvent.created_at < cutoff).delete(synchronize_session=False)
+    db.commit()
@@ -0,0 +1,103 @@
+"""The brew_features table: one row of numeric analytics features per brew.
+
+Values that analytics used to derive on every request are computed once
+here: the brew ratio, a numeric grind setting, days since roast, the water
+temperature in both units, pour schedule totals, and the rating dimensions.
+Like the search index, the table is maintained by the service layer: write
+paths call ``refresh`` with the brews they touched, imports and restores call
+``rebuild``, and app.bootstrap backfills older databases (``ensure_features``).
+"""
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.brew import Brew
+from app.models.feature import BrewFeature
+from app.models.rating import Rating
+
+_CHUNK = 500
+
+RATING_FIELDS = ("overall_score", "bitterness", "acidity", "sweetness", "body", "aroma", "aftertaste")
+_POURS = ("first_pour_grams", "second_pour_grams", "final_pour_grams")
+
+_SOURCE = select(
+    Brew.id, Brew.brew_date, Brew.bean_id, Brew.grinder, Brew.brew_method,
+    Brew.bean_amount_grams, Brew.water_amount_ml, Brew.water_temp_c, Brew.water_temp_f,
+    Brew.grind_setting, Brew.roast_date, Brew.brew_time_seconds,
+    Brew.bloom, Brew.bloom_time_seconds, Brew.bloom_water_ml, *(getattr(Brew, p) for p in _POURS),
+    *(getattr(Rating, f) for f in RATING_FIELDS),
+).outerjoin(Rating, Rating.brew_id == Brew.id)
+
+
+# brew_features.grind_setting is an INTEGER column (32-bit on Postgres).
+_MAX_GRIND = 2**31 - 1
+
+
+def numeric_grind(setting: str | None) -> int | None:
+    """A grind setting as a number: its digits, so "1.3.5" reads as 135.
+
+    Settings whose digits do not fit the column count as non-numeric.
+    """
+    digits = (setting or "").replace(".", "")
+    if not digits.isdecimal() or int(digits) > _MAX_GRIND:
+        return None
+    return int(digits)
+
+
+def features(row) -> dict:
+    """The brew_features values of one row of ``_SOURCE``."""
+    dose, water = row.bean_amount_grams, row.water_amount_ml
+    temp_c, temp_f = row.water_temp_c, row.water_temp_f
+    if temp_c is None and temp_f is not None:
+        temp_c = round((temp_f - 32) * 5 / 9, 1)
+    elif temp_f is None and temp_c is not None:
+        temp_f = round(temp_c * 9 / 5 + 32, 1)
+    pours = [g for g in (row.bloom_water_ml if row.bloom else None, *(getattr(row, p) for p in _POURS))
+             if g is not None]
+    return {
+        "brew_id": row.id, "brew_date": row.brew_date, "bean_id": row.bean_id,
+        "grinder": row.grinder, "brew_method": row.brew_method,
+        "bean_amount_grams": dose, "water_amount_ml": water,
+        "brew_ratio": round(water / dose, 3) if dose and water is not None else None,
+        "water_temp_c": temp_c, "water_temp_f": temp_f,
+        "grind_setting": numeric_grind(row.grind_setting),
+        "days_since_roast": (row.brew_date - row.roast_date).days
+        if row.roast_date and row.brew_date else None,
+        "brew_time_seconds": row.brew_time_seconds,
+        "bloom_time_seconds": row.bloom_time_seconds if row.bloom else None,
+        "pour_count": len(pours) or None,
+        "pour_total_grams": float(sum(pours)) if pours else None,
+        **{f: getattr(row, f) for f in RATING_FIELDS},
+    }
+
+
+def _write(db: Session, brew_ids: list[int]) -> None:
+    rows = [features(row) for row in db.execute(_SOURCE.where(Brew.id.in_(brew_ids)))]
+    if rows:
+        db.execute(insert(BrewFeature), rows)
+
+
+def refresh(db: Session, brew_ids) -> None:
+    """Recompute the features of the given brews; deleted ones drop out (does not commit)."""
+    db.flush()
+    ids = sorted(set(brew_ids))
+    for start in range(0, len(ids), _CHUNK):
+        chunk = ids[start:start + _CHUNK]
+        db.execute(delete(BrewFeature).where(BrewFeature.brew_id.in_(chunk)))
+        _write(db, chunk)
+
+
+def rebuild(db: Session) -> None:
+    """Recompute the features of every brew (does not commit)."""
+    db.flush()
+    db.execute(delete(BrewFeature))
+    ids = db.scalars(select(Brew.id).order_by(Brew.id)).all()
+    for start in range(0, len(ids), _CHUNK):
+        _write(db, ids[start:start + _CHUNK])
+
+
+def ensure_features(db: Session) -> None:
+    """Backfill the table for databases created before it existed."""
+    if db.query(BrewFeature.brew_id).first() is None and db.query(Brew.id).first() is not None:
+        rebuild(db)
+        db.commit()
@@ -0,0 +1,298 @@
+"""Flavor notes per brew, and analytics over them as bitsets.
+
+The comma-separated ``flavor_notes_expected`` (brew) and
+``flavor_notes_experienced`` (rating) stay as entered; their notes are also
+kept in the brew_expected_notes / brew_experienced_notes junction tables,
+referencing ``FlavorNote`` (unknown notes are added to it). Like the search
+index, the tables are maintained by the service layer: write paths call
+``reindex`` with the brews they touched, imports and restores call
+``rebuild``, and app.bootstrap backfills older databases (``ensure_notes``).
+
+For analytics every note becomes a packed bit array over all brews (bit i
+= the i-th brew by id), one row per note in a NumPy uint8 matrix. Questions
+such as "how often do brews tasting of X score high" are then an AND and a
+popcount per note, done for all notes at once. The bitsets are rebuilt when
+the data version changes.
+"""
+
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.bean import Bean
+from app.models.brew import Brew
+from app.models.flavor import BrewExpectedNote, BrewExperiencedNote
+from app.models.lookups import FlavorNote
+from app.models.rating import Rating
+from app.services import cache_service, lookup_service
+
+_CHUNK = 500
+KINDS = ("expected", "experienced")
+_TABLES = {"expected": BrewExpectedNote, "experienced": BrewExperiencedNote}
+
+# Set bits in each byte value.
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def split_notes(text: str | None) -> list[str]:
+    """Notes in a comma-separated string, stripped, without case-insensitive repeats."""
+    notes: dict[str, str] = {}
+    for part in (text or "").split(","):
+        note = " ".join(part.split())
+        if note:
+            notes.setdefault(note.casefold(), note)
+    return list(notes.values())
+
+
+def accuracy(expected: set[int], tasted: set[int]) -> float | None:
+    """Percentage of the expected notes that were tasted."""
+    if not expected:
+        return None
+    return round(len(expected & tasted) / len(expected) * 100, 1)
+
+
+def _insert_notes(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(FlavorNote).on_conflict_do_nothing(index_elements=["name"])
+    if dialect == "sqlite":
+        return sqlite.insert(FlavorNote).on_conflict_do_nothing(index_elements=["name"])
+    # Elsewhere only the notes just looked up as missing are inserted.
+    return insert(FlavorNote)
+
+
+def note_ids(db: Session, names, create: bool = True) -> dict[str, int]:
+    """FlavorNote ids by case-folded name for ``names``; unknown notes are
+    added, or left out with ``create=False``."""
+    wanted = {name.casefold(): name for name in names}
+    if not wanted:
+        return {}
+    known: dict[str, int] = {}
+    for note_id, name in db.query(FlavorNote.id, FlavorNote.name).order_by(FlavorNote.id):
+        known.setdefault(name.casefold(), note_id)
+    missing = [{"name": name} for folded, name in wanted.items() if folded not in known]
+    if missing and create:
+        db.execute(_insert_notes(db), missing)
+        lookup_service.invalidate_after_commit(db)
+        return note_ids(db, names)
+    return {folded: known[folded] for folded in wanted if folded in known}
+
+
+def expected_notes(db: Session, brew_ids) -> dict[int, set[int]]:
+    """Expected FlavorNote ids of each brew in ``brew_ids`` (brews without any are left out)."""
+    notes: dict[int, set[int]] = {}
+    ids = sorted(set(brew_ids))
+    for start in range(0, len(ids), _CHUNK):
+        for brew_id, note_id in db.execute(
+            select(BrewExpectedNote.brew_id, BrewExpectedNote.flavor_note_id)
+            .where(BrewExpectedNote.brew_id.in_(ids[start:start + _CHUNK]))
+        ):
+            notes.setdefault(brew_id, set()).add(note_id)
+    return notes
+
+
+def _write(db: Session, brew_ids: list[int] | None) -> None:
+    stmt = select(Brew.id, Brew.flavor_notes_expected, Rating.flavor_notes_experienced).outerjoin(
+        Rating, Rating.brew_id == Brew.id
+    )
+    if brew_ids is not None:
+        stmt = stmt.where(Brew.id.in_(brew_ids))
+    rows = [
+        (brew_id, split_notes(expected), split_notes(experienced))
+        for brew_id, expected, experienced in db.execute(stmt)
+    ]
+    ids = note_ids(db, {note for _, *kinds in rows for notes in kinds for note in notes})
+    for kind, column in (("expected", 1), ("experienced", 2)):
+        links = [
+            {"brew_id": row[0], "flavor_note_id": ids[note.casefold()]}
+            for row in rows for note in row[column]
+        ]
+        if links:
+            db.execute(insert(_TABLES[kind]), links)
+
+
+def reindex(db: Session, brew_ids) -> None:
+    """Re-read the flavor notes of the given brews; deleted ones drop out (does not commit)."""
+    db.flush()
+    ids = sorted(set(brew_ids))
+    for start in range(0, len(ids), _CHUNK):
+        chunk = ids[start:start + _CHUNK]
+        for table in _TABLES.values():
+            db.execute(delete(table).where(table.brew_id.in_(chunk)))
+        _write(db, chunk)
+
+
+def rebuild(db: Session) -> None:
+    """Re-read the flavor notes of every brew (does not commit)."""
+    db.flush()
+    for table in _TABLES.values():
+        db.execute(delete(table))
+    ids = db.scalars(select(Brew.id).order_by(Brew.id)).all()
+    for start in range(0, len(ids), _CHUNK):
+        _write(db, ids[start:start + _CHUNK])
+
+
+def ensure_notes(db: Session) -> None:
+    """Backfill the junction tables for databases created before they existed."""
+    if db.query(BrewExpectedNote.brew_id).first() is not None \
+            or db.query(BrewExperiencedNote.brew_id).first() is not None:
+        return
+    has_notes = db.query(Brew.id).filter(Brew.flavor_notes_expected.isnot(None)).first() \
+        or db.query(Rating.id).filter(Rating.flavor_notes_experienced.isnot(None)).first()
+    if has_notes:
+        rebuild(db)
+        db.commit()
+
+
+# ---------------------------------------------------------------------------
+# Bitset analytics
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class FlavorBitsets:
+    """Notes x brews bit matrices; brew i is the i-th brew by id."""
+
+    notes: list[str]  # row i of ``expected`` / ``experienced``
+    expected: np.ndarray  # uint8 (notes, bytes), np.packbits layout
+    experienced: np.ndarray
+    scores: np.ndarray  # float (brews,), NaN when unrated
+    roasters: list[str]  # row i of ``roaster_masks``
+    roaster_masks: np.ndarray  # uint8 (roasters, bytes)
+
+
+def _count(bits: np.ndarray) -> np.ndarray:
+    """Set bits along the last axis."""
+    return _POPCOUNT[bits].sum(axis=-1, dtype=np.int64)
+
+
+def _build(db: Session) -> FlavorBitsets:
+    rows = db.connection().execute(
+        select(Brew.id, Rating.overall_score, Bean.roaster_key)
+        .outerjoin(Rating, Rating.brew_id == Brew.id)
+        .outerjoin(Bean, Bean.id == Brew.bean_id)
+        .order_by(Brew.id)
+    ).all()
+    brew_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    scores = np.fromiter(
+        (np.nan if r[1] is None else r[1] for r in rows), dtype=np.float64, count=len(rows)
+    )
+    n_bytes = (len(rows) + 7) // 8
+
+    notes = db.execute(select(FlavorNote.id, FlavorNote.name).order_by(FlavorNote.name)).all()
+    row_of = {note_id: i for i, (note_id, _) in enumerate(notes)}
+
+    def matrix(table) -> np.ndarray:
+        bits = np.zeros((len(notes), n_bytes), dtype=np.uint8)
+        # Core execution: ORM row processing would double the load time.
+        links = db.connection().execute(select(table.brew_id, table.flavor_note_id)).all()
+        if links and len(rows):
+            link_brews = np.fromiter((l[0] for l in links), dtype=np.int64, count=len(links))
+            link_notes = np.fromiter((row_of[l[1]] for l in links), dtype=np.int64, count=len(links))
+            pos = np.searchsorted(brew_ids, link_brews)
+            found = (pos < len(brew_ids)) & (brew_ids[np.minimum(pos, len(brew_ids) - 1)] == link_brews)
+            pos, link_notes = pos[found], link_notes[found]
+            np.bitwise_or.at(bits, (link_notes, pos >> 3), (0x80 >> (pos & 7)).astype(np.uint8))
+        return bits
+
+    roaster_names = dict(
+        db.execute(select(Bean.roaster_key, func.min(Bean.roaster)).group_by(Bean.roaster_key)).all()
+    )
+    keys = np.array([r[2] or "" for r in rows], dtype=object)
+    roaster_keys = sorted(k for k in set(keys.tolist()) if k)
+    roaster_masks = np.stack([np.packbits(keys == k) for k in roaster_keys]) \
+        if roaster_keys else np.zeros((0, n_bytes), dtype=np.uint8)
+
+    return FlavorBitsets(
+        notes=[name for _, name in notes],
+        expected=matrix(BrewExpectedNote),
+        experienced=matrix(BrewExperiencedNote),
+        scores=scores,
+        roasters=[roaster_names.get(k, k) for k in roaster_keys],
+        roaster_masks=roaster_masks,
+    )
+
+
+_lock = threading.Lock()
+_cached: tuple[str, FlavorBitsets] | None = None
+
+
+def get_bitsets(db: Session) -> FlavorBitsets:
+    """The bitsets for the current data version, built at most once per version."""
+    global _cached
+    version = cache_service.get_data_version(db)
+    cached = _cached
+    if cached is None or cached[0] != version:
+        with _lock:
+            cached = _cached
+            if cached is None or cached[0] != version:
+                cached = _cached = (version, _build(db))
+    return cached[1]
+
+
+def note_predictors(
+    db: Session, kind: str = "experienced", threshold: float = 8.0, min_brews: int = 5
+) -> dict:
+    """How much each note raises the chance of a rated brew scoring ``threshold`` or more.
+
+    ``lift`` is the note's high-score rate over the rate among all rated
+    brews; notes on fewer than ``min_brews`` rated brews are left out.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind: {kind!r}")
+    bitsets = get_bitsets(db)
+    rated_flags = ~np.isnan(bitsets.scores)
+    rated = np.packbits(rated_flags)
+    high = np.packbits(rated_flags & (np.nan_to_num(bitsets.scores) >= threshold))
+    n_rated, n_high = int(_count(rated)), int(_count(high))
+    base_rate = n_high / n_rated if n_rated else None
+
+    notes = getattr(bitsets, kind)
+    brews = _count(notes & rated)
+    high_brews = _count(notes & high)
+    filled = np.nan_to_num(bitsets.scores)
+    results = []
+    for i in np.flatnonzero(brews >= max(min_brews, 1)):
+        with_note = np.unpackbits(notes[i] & rated, count=len(filled)).astype(bool)
+        rate = high_brews[i] / brews[i]
+        results.append({
+            "note": bitsets.notes[i],
+            "brews": int(brews[i]),
+            "high_scoring": int(high_brews[i]),
+            "high_rate": round(float(rate), 4),
+            "lift": round(float(rate / base_rate), 3) if base_rate else None,
+            "avg_score": round(float(filled[with_note].mean()), 2),
+        })
+    results.sort(key=lambda r: (-(r["lift"] or 0), -r["brews"], r["note"]))
+    return {
+        "kind": kind, "threshold": threshold, "rated_brews": n_rated,
+        "base_rate": round(base_rate, 4) if base_rate is not None else None,
+        "notes": results,
+    }
+
+
+def hit_rates_by_roaster(db: Session) -> list[dict]:
+    """Per roaster: of the notes expected on rated brews, the share that was tasted."""
+    bitsets = get_bitsets(db)
+    rated = np.packbits(~np.isnan(bitsets.scores))
+    expected = bitsets.expected & rated
+    hits = expected & bitsets.experienced
+    any_expected = np.bitwise_or.reduce(expected, axis=0) if len(expected) else np.zeros_like(rated)
+    results = []
+    for roaster, mask in zip(bitsets.roasters, bitsets.roaster_masks):
+        n_expected = int(_count(expected & mask).sum())
+        if not n_expected:
+            continue
+        n_hits = int(_count(hits & mask).sum())
+        results.append({
+            "roaster": roaster,
+            "brews": int(_count(any_expected & mask)),
+            "expected_notes": n_expected,
+            "tasted_notes": n_hits,
+            "hit_rate": round(n_hits / n_expected * 100, 1),
+        })
+    results.sort(key=lambda r: (-r["brews"], r["roaster"]))
+    return results
@@ -18,7 +18,11 @@ import base64
 import csv
 import io
 import math
+import threading
+import time
+import tracemalloc
 from collections import deque
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 
 import numpy as np
@@ -48,6 +52,59 @@ class Particle:
     _pixels: list[tuple[int, int]] = field(default_factory=list, repr=False)
 
 
+@dataclass
+class StageTiming:
+    name: str  # dotted for nested stages, e.g. "cluster_image.jpeg"
+    seconds: float
+    memory_delta_bytes: int | None = None  # traced memory held after vs before
+    memory_peak_bytes: int | None = None  # peak traced memory above the start
+
+
+class StageTimer:
+    """Record wall time per analysis stage, plus tracemalloc memory with ``trace_memory``.
+
+    Only the run that owns the tracing (see analyze_image) may reset the
+    process-wide tracemalloc peak, so untraced timers never touch it.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.stages: list[StageTiming] = []
+        self._open: list[dict] = []
+        self.trace_memory = trace_memory
+
+    @contextmanager
+    def stage(self, name: str):
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        entry = {"name": ".".join([e["name"] for e in self._open] + [name]), "peak": 0}
+        if tracing:
+            # A nested stage resets the peak counter, so bank the parent's first.
+            if self._open:
+                parent = self._open[-1]
+                parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            entry["before"] = tracemalloc.get_traced_memory()[0]
+        self._open.append(entry)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            self._open.pop()
+            timing = StageTiming(name=entry["name"], seconds=round(seconds, 6))
+            if tracing and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, entry["peak"])
+                if self._open:
+                    self._open[-1]["peak"] = max(self._open[-1]["peak"], peak)
+                timing.memory_delta_bytes = current - entry["before"]
+                timing.memory_peak_bytes = peak - entry["before"]
+            self.stages.append(timing)
+
+
+# One memory-traced analysis at a time: each resets the shared tracemalloc peak.
+_trace_lock = threading.Lock()
+
+
 @dataclass
 class AnalysisResult:
     particle_count: int
@@ -60,40 +117,73 @@ class AnalysisResult:
     cluster_image_b64: str = ""
     histogram_data: dict = field(default_factory=dict)
     csv_string: str = ""
+    stages: list[StageTiming] = field(default_factory=list)
 
 
-def analyze_image(image_bytes: bytes, params: AnalysisParams | None = None) -> AnalysisResult:
-    """Main entry point: analyze a coffee grind image and return results."""
+def analyze_image(
+    image_bytes: bytes, params: AnalysisParams | None = None, trace_memory: bool = False
+) -> AnalysisResult:
+    """Main entry point: analyze a coffee grind image and return results.
+
+    Per-stage wall times are always recorded in ``result.stages``; with
+    ``trace_memory`` the stages also carry tracemalloc memory deltas (this
+    slows the flood fill noticeably, so it is meant for profiling runs).
+    tracemalloc is process-wide, so traced runs take turns; allocations of
+    untraced analyses running meanwhile still count towards their numbers.
+    """
     if params is None:
         params = AnalysisParams()
-
-    img, blue = _load_and_extract_blue_channel(image_bytes, params.max_dimension)
-    width, height = img.size
-    img_array = np.array(img)
-
-    background_median = float(np.median(blue))
-    mask = _compute_threshold_mask(blue, params.threshold, background_median)
-    threshold_b64 = _generate_threshold_image(img_array, mask)
-
-    particles = _find_and_measure_clusters(
-        mask, blue, width, height, background_median, params
-    )
-
-    cluster_b64 = _generate_cluster_image(img_array, particles)
-
-    diameters_px = [p.diameter_px for p in particles]
-    avg_px = float(np.mean(diameters_px)) if diameters_px else 0.0
-    std_px = float(np.std(diameters_px)) if diameters_px else 0.0
-
-    avg_mm = None
-    std_mm = None
-    if params.pixel_scale > 0 and diameters_px:
-        diameters_mm = [p.diameter_mm for p in particles]
-        avg_mm = float(np.mean(diameters_mm))
-        std_mm = float(np.std(diameters_mm))
-
-    histogram_data = _build_histogram_data(particles, params.pixel_scale)
-    csv_string = _build_csv(particles)
+    if not trace_memory:
+        return _analyze(image_bytes, params, StageTimer())
+
+    with _trace_lock:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            return _analyze(image_bytes, params, StageTimer(trace_memory=True))
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+
+
+def _analyze(image_bytes: bytes, params: AnalysisParams, timer: StageTimer) -> AnalysisResult:
+    with timer.stage("decode"):
+        img, blue = _load_and_extract_blue_channel(image_bytes, params.max_dimension)
+        width, height = img.size
+        img_array = np.array(img)
+
+    with timer.stage("threshold"):
+        background_median = float(np.median(blue))
+        mask = _compute_threshold_mask(blue, params.threshold, background_median)
+
+    with timer.stage("threshold_image"):
+        threshold_b64 = _generate_threshold_image(img_array, mask, timer)
+
+    with timer.stage("clusters"):
+        particles = _find_and_measure_clusters(
+            mask, blue, width, height, background_median, params
+        )
+
+    with timer.stage("cluster_image"):
+        cluster_b64 = _generate_cluster_image(img_array, particles, timer)
+
+    with timer.stage("statistics"):
+        diameters_px = [p.diameter_px for p in particles]
+        avg_px = float(np.mean(diameters_px)) if diameters_px else 0.0
+        std_px = float(np.std(diameters_px)) if diameters_px else 0.0
+
+        avg_mm = None
+        std_mm = None
+        if params.pixel_scale > 0 and diameters_px:
+            diameters_mm = [p.diameter_mm for p in particles]
+            avg_mm = float(np.mean(diameters_mm))
+            std_mm = float(np.std(diameters_mm))
+
+        histogram_data = _build_histogram_data(particles, params.pixel_scale)
+
+    with timer.stage("csv"):
+        csv_string = _build_csv(particles)
 
     return AnalysisResult(
         particle_count=len(particles),
@@ -106,6 +196,7 @@ def analyze_image(image_bytes: bytes, params: AnalysisParams | None = None) -> A
         cluster_image_b64=cluster_b64,
         histogram_data=histogram_data,
         csv_string=csv_string,
+        stages=timer.stages,
     )
 
 
@@ -134,16 +225,20 @@ def _compute_threshold_mask(
     return blue < cutoff
 
 
-def _generate_threshold_image(img_array: np.ndarray, mask: np.ndarray) -> str:
+def _generate_threshold_image(
+    img_array: np.ndarray, mask: np.ndarray, timer: StageTimer | None = None
+) -> str:
     """Overlay red on masked pixels, return base64 JPEG.
 
     Matches original: RGB = (255, 0, 0) for thresholded pixels.
     """
-    overlay = img_array.copy()
-    overlay[mask, 0] = 255
-    overlay[mask, 1] = 0
-    overlay[mask, 2] = 0
-    return _array_to_b64_jpeg(overlay)
+    timer = timer or StageTimer()
+    with timer.stage("overlay"):
+        overlay = img_array.copy()
+        overlay[mask, 0] = 255
+        overlay[mask, 1] = 0
+        overlay[mask, 2] = 0
+    return _array_to_b64_jpeg(overlay, timer)
 
 
 def _quick_cluster(
@@ -265,7 +360,7 @@ def _find_and_measure_clusters(
 
 
 def _generate_cluster_image(
-    img_array: np.ndarray, particles: list[Particle]
+    img_array: np.ndarray, particles: list[Particle], timer: StageTimer | None = None
 ) -> str:
     """Draw cluster outlines in red with blue centroids.
 
@@ -301,7 +396,7 @@ def _generate_cluster_image(
         if 0 <= cy < overlay.shape[0] and 0 <= cx < overlay.shape[1]:
             overlay[cy, cx] = [80, 80, 255]
 
-    return _array_to_b64_jpeg(overlay)
+    return _array_to_b64_jpeg(overlay, timer)
 
 
 def _build_histogram_data(particles: list[Particle], pixel_scale: float) -> dict:
@@ -370,9 +465,12 @@ def _build_csv(particles: list[Particle]) -> str:
     return output.getvalue()
 
 
-def _array_to_b64_jpeg(arr: np.ndarray) -> str:
+def _array_to_b64_jpeg(arr: np.ndarray, timer: StageTimer | None = None) -> str:
     """Convert numpy array to base64-encoded JPEG string."""
-    img = Image.fromarray(arr.astype(np.uint8))
-    buf = io.BytesIO()
-    img.save(buf, format="JPEG", quality=85)
-    return base64.b64encode(buf.getvalue()).decode("ascii")
+    timer = timer or StageTimer()
+    with timer.stage("jpeg"):
+        img = Image.fromarray(arr.astype(np.uint8))
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=85)
+    with timer.stage("base64"):
+        return base64.b64encode(buf.getvalue()).decode("ascii")
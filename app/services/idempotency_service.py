@@ -0,0 +1,46 @@
+"""Replay protection for retried batch writes (Idempotency-Key header).
+
+The stored response is written in the same transaction as the batch it
+describes, so a key is only ever remembered for work that committed.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.idempotency import IdempotencyKey
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a request with a different body."""
+
+
+def fingerprint(payload) -> str:
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def replay(db: Session, scope: str, key: str, request_hash: str) -> tuple[int, dict] | None:
+    """Stored (status, body) for this key, or None if it has not been seen."""
+    stored = db.get(IdempotencyKey, (scope, key))
+    if stored is None:
+        return None
+    if stored.request_hash != request_hash:
+        raise IdempotencyKeyReused(key)
+    return stored.status_code, json.loads(stored.response)
+
+
+def remember(db: Session, scope: str, key: str, request_hash: str, status: int, body: dict) -> None:
+    """Record the response (does not commit) and drop expired keys."""
+    cutoff = datetime.utcnow() - timedelta(hours=settings.idempotency_ttl_hours)
+    db.query(IdempotencyKey).filter(IdempotencyKey.created_at < cutoff).delete(
+        synchronize_session=False
+    )
+    db.add(IdempotencyKey(
+        scope=scope, key=key, request_hash=request_hash,
+        status_code=status, response=json.dumps(body, default=str),
+    ))
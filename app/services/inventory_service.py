@@ -3,8 +3,10 @@ import math
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.models.bean import Bean
 from app.models.brew import Brew
 from app.models.inventory import BeanInventory
+from app.services import bean_service, cache_service, event_service, sync_service
 
 POUR_OVER_GRAMS = 25.0
 ESPRESSO_GRAMS = 18.0
@@ -13,18 +15,22 @@ ESPRESSO_GRAMS = 18.0
 def upsert_inventory(
     db: Session, bean_name: str, roaster: str | None, initial_grams: float
 ) -> BeanInventory:
-    inv = (
-        db.query(BeanInventory)
-        .filter(BeanInventory.bean_name == bean_name, BeanInventory.roaster == roaster)
-        .first()
-    )
-    if inv:
-        inv.initial_amount_grams = initial_grams
+    inv = BeanInventory(bean_name=bean_name, roaster=roaster, initial_amount_grams=initial_grams)
+    bean_service.link(db, inv)
+    if inv.bean_id is not None:
+        key = (BeanInventory.bean_id == inv.bean_id,)
+    else:
+        # Blank bean names get no bean; match them on the strings as given.
+        key = (BeanInventory.bean_id.is_(None), BeanInventory.bean_name == bean_name,
+               BeanInventory.roaster == roaster)
+    existing = db.query(BeanInventory).filter(*key).first()
+    if existing:
+        existing.initial_amount_grams = initial_grams
+        inv = existing
     else:
-        inv = BeanInventory(
-            bean_name=bean_name, roaster=roaster, initial_amount_grams=initial_grams
-        )
         db.add(inv)
+    event_service.publish(db, "inventory.changed", {"bean_name": inv.bean_name, "roaster": inv.roaster})
+    cache_service.bump_data_version(db)
     db.commit()
     db.refresh(inv)
     return inv
@@ -34,66 +40,71 @@ def delete_inventory(db: Session, inv_id: int) -> bool:
     inv = db.query(BeanInventory).filter(BeanInventory.id == inv_id).first()
     if not inv:
         return False
+    sync_service.record_deletion(db, "inventory", [inv.id])
+    event_service.publish(db, "inventory.changed", {"bean_name": inv.bean_name, "roaster": inv.roaster})
     db.delete(inv)
+    cache_service.bump_data_version(db)
     db.commit()
     return True
 
 
-def _grams_used(db: Session, bean_name: str, roaster: str | None) -> float:
-    q = db.query(func.sum(Brew.bean_amount_grams)).filter(Brew.bean_name == bean_name)
-    if roaster:
-        q = q.filter(Brew.roaster == roaster)
-    return q.scalar() or 0.0
-
-
 def list_shelf(db: Session) -> list[dict]:
     """
     Returns every tracked bean (has inventory entry) plus any beans seen in brew history
     that have no inventory entry yet (marked as untracked).
     """
-    inventory = db.query(BeanInventory).order_by(BeanInventory.bean_name).all()
-    inv_keys = {(i.bean_name, i.roaster) for i in inventory}
-
+    used = dict(
+        db.query(Brew.bean_id, func.sum(Brew.bean_amount_grams))
+        .filter(Brew.bean_id.isnot(None))
+        .group_by(Brew.bean_id)
+        .all()
+    )
+    inventory = (
+        db.query(BeanInventory, Bean)
+        .outerjoin(Bean, Bean.id == BeanInventory.bean_id)
+        .order_by(
+            func.coalesce(Bean.name, BeanInventory.bean_name), func.coalesce(Bean.roaster, BeanInventory.roaster)
+        )
+        .all()
+    )
+    tracked = {inv.bean_id for inv, _ in inventory}
+    untracked = [bean_id for bean_id in used if bean_id not in tracked]
     # Beans from brew history not yet tracked
     brew_beans = (
-        db.query(Brew.bean_name, Brew.roaster)
-        .distinct()
-        .filter(Brew.bean_name.isnot(None))
-        .order_by(Brew.bean_name)
-        .all()
+        db.query(Bean).filter(Bean.id.in_(untracked)).order_by(Bean.name, Bean.roaster).all()
+        if untracked else []
     )
 
     result = []
 
-    for inv in inventory:
-        used = _grams_used(db, inv.bean_name, inv.roaster)
-        remaining = max(0.0, inv.initial_amount_grams - used)
+    for inv, bean in inventory:
+        # Entries without a bean (blank name) show as entered, with nothing used.
+        grams = used.get(inv.bean_id) or 0.0
+        remaining = max(0.0, inv.initial_amount_grams - grams)
         result.append(
             {
                 "id": inv.id,
-                "bean_name": inv.bean_name,
-                "roaster": inv.roaster,
+                "bean_name": bean.name if bean else inv.bean_name,
+                "roaster": bean.roaster if bean else inv.roaster,
                 "initial_grams": inv.initial_amount_grams,
-                "used_grams": round(used, 1),
+                "used_grams": round(grams, 1),
                 "remaining_grams": round(remaining, 1),
                 "tracked": True,
             }
         )
 
-    for bean_name, roaster in brew_beans:
-        if (bean_name, roaster) not in inv_keys:
-            used = _grams_used(db, bean_name, roaster)
-            result.append(
-                {
-                    "id": None,
-                    "bean_name": bean_name,
-                    "roaster": roaster,
-                    "initial_grams": None,
-                    "used_grams": round(used, 1),
-                    "remaining_grams": None,
-                    "tracked": False,
-                }
-            )
+    for bean in brew_beans:
+        result.append(
+            {
+                "id": None,
+                "bean_name": bean.name,
+                "roaster": bean.roaster,
+                "initial_grams": None,
+                "used_grams": round(used[bean.id], 1),
+                "remaining_grams": None,
+                "tracked": False,
+            }
+        )
 
     return result
 
@@ -179,9 +190,10 @@ def get_lp_data(db: Session, bean_name: str | None = None, pour_over_grams: floa
 def list_bean_names(db: Session) -> list[str]:
     """All distinct bean names that have inventory entries."""
     return [
-        r.bean_name
-        for r in db.query(BeanInventory.bean_name)
+        r.name
+        for r in db.query(Bean.name)
+        .join(BeanInventory, BeanInventory.bean_id == Bean.id)
         .distinct()
-        .order_by(BeanInventory.bean_name)
+        .order_by(Bean.name)
         .all()
     ]
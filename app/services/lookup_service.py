@@ -1,5 +1,15 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.models.lookups import BrewDevice, BrewMethod, FlavorNote, Grinder
 
 
@@ -15,6 +25,7 @@ def add_flavor_note(db: Session, name: str) -> FlavorNote:
     db.add(note)
     db.commit()
     db.refresh(note)
+    invalidate_lookups()
     return note
 
 
@@ -30,6 +41,7 @@ def add_brew_device(db: Session, name: str) -> BrewDevice:
     db.add(device)
     db.commit()
     db.refresh(device)
+    invalidate_lookups()
     return device
 
 
@@ -45,6 +57,7 @@ def add_grinder(db: Session, name: str) -> Grinder:
     db.add(grinder)
     db.commit()
     db.refresh(grinder)
+    invalidate_lookups()
     return grinder
 
 
@@ -60,11 +73,13 @@ def add_brew_method(db: Session, name: str) -> BrewMethod:
     db.add(method)
     db.commit()
     db.refresh(method)
+    invalidate_lookups()
     return method
 
 
 def seed_lookups(db: Session) -> None:
     """Seed default flavor notes and brew devices if none exist."""
+    seeded = False
     if db.query(FlavorNote).count() == 0:
         defaults = [
             "Berry", "Blackberry", "Blueberry", "Caramel", "Cherry",
@@ -78,6 +93,7 @@ def seed_lookups(db: Session) -> None:
         for name in defaults:
             db.add(FlavorNote(name=name))
         db.commit()
+        seeded = True
 
     if db.query(Grinder).count() == 0:
         defaults = [
@@ -91,6 +107,7 @@ def seed_lookups(db: Session) -> None:
         for name in defaults:
             db.add(Grinder(name=name))
         db.commit()
+        seeded = True
 
     if db.query(BrewDevice).count() == 0:
         defaults = [
@@ -99,9 +116,103 @@ def seed_lookups(db: Session) -> None:
         for name in defaults:
             db.add(BrewDevice(name=name))
         db.commit()
+        seeded = True
 
     if db.query(BrewMethod).count() == 0:
         defaults = ["Pour Over", "Espresso"]
         for name in defaults:
             db.add(BrewMethod(name=name))
         db.commit()
+        seeded = True
+
+    if seeded:
+        invalidate_lookups()
+
+
+# --- Cached lookups for form rendering ---
+#
+# Each worker keeps the four lookup lists in memory. Writers touch a stamp file
+# (atomically replaced, so its inode changes) and readers compare its stat
+# result, which keeps every gunicorn worker in the container coherent without
+# a database round-trip. The TTL bounds staleness for writers on other hosts.
+
+
+@dataclass(frozen=True)
+class LookupEntry:
+    id: int
+    name: str
+
+
+_cache_lock = threading.Lock()
+_cached: dict | None = None
+_cached_stamp: tuple | None = None
+_cached_at = 0.0
+
+
+def _stamp_path() -> str:
+    if settings.lookup_stamp_file:
+        return settings.lookup_stamp_file
+    digest = hashlib.sha1(settings.database_url.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"coffee-lookups-{digest}.stamp")
+
+
+def _read_stamp() -> tuple | None:
+    try:
+        st = os.stat(_stamp_path())
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def invalidate_lookups() -> None:
+    """Mark cached lookups stale in every worker sharing the stamp file."""
+    global _cached
+    path = _stamp_path()
+    tmp = f"{path}.{uuid.uuid4().hex}"
+    try:
+        with open(tmp, "w") as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    with _cache_lock:
+        _cached = None
+
+
+def invalidate_after_commit(db: Session) -> None:
+    """Invalidate cached lookups once ``db`` commits (nothing happens on rollback)."""
+    db.info["lookups_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    if session.info.pop("lookups_changed", False):
+        invalidate_lookups()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop("lookups_changed", None)
+
+
+def get_cached_lookups(db: Session) -> dict[str, list[LookupEntry]]:
+    global _cached, _cached_stamp, _cached_at
+    stamp = _read_stamp()
+    now = time.monotonic()
+    with _cache_lock:
+        if (
+            _cached is not None
+            and _cached_stamp == stamp
+            and now - _cached_at < settings.lookup_cache_ttl_seconds
+        ):
+            return _cached
+
+    data = {
+        "flavor_notes": [LookupEntry(r.id, r.name) for r in list_flavor_notes(db)],
+        "brew_devices": [LookupEntry(r.id, r.name) for r in list_brew_devices(db)],
+        "brew_methods": [LookupEntry(r.id, r.name) for r in list_brew_methods(db)],
+        "grinders": [LookupEntry(r.id, r.name) for r in list_grinders(db)],
+    }
+    with _cache_lock:
+        _cached, _cached_stamp, _cached_at = data, stamp, now
+    return data
@@ -0,0 +1,77 @@
+"""Opt-in cProfile captures, stored on disk for later download.
+
+Profiles are written as standard ``.prof`` files (load them with pstats or
+snakeviz). Only the newest PROFILE_KEEP files are kept.
+"""
+
+import cProfile
+import io
+import pstats
+import re
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from app.config import settings
+
+_PROFILE_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# cProfile cannot run two profilers at once on Python 3.12+, and concurrent
+# runs would skew each other's timings anyway.
+_lock = threading.Lock()
+
+
+def _profile_dir() -> Path:
+    path = Path(settings.profile_dir or Path(tempfile.gettempdir()) / "coffee-profiles")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def profile_call(label: str, fn: Callable[..., Any], *args, **kwargs) -> tuple[Any, str]:
+    """Run ``fn`` under cProfile; return its result and the stored profile id."""
+    profiler = cProfile.Profile()
+    with _lock:
+        result = profiler.runcall(fn, *args, **kwargs)
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{uuid.uuid4().hex[:8]}"
+    profiler.dump_stats(_profile_dir() / f"{profile_id}.prof")
+    _prune()
+    return result, profile_id
+
+
+def _prune() -> None:
+    files = sorted(_profile_dir().glob("*.prof"), key=lambda p: p.stat().st_mtime)
+    for stale in files[: max(0, len(files) - settings.profile_keep)]:
+        stale.unlink(missing_ok=True)
+
+
+def list_profiles() -> list[dict]:
+    files = sorted(_profile_dir().glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [
+        {
+            "id": f.stem,
+            "size_bytes": f.stat().st_size,
+            "created_at": datetime.fromtimestamp(f.stat().st_mtime, timezone.utc).isoformat(),
+        }
+        for f in files
+    ]
+
+
+def profile_path(profile_id: str) -> Path | None:
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    path = _profile_dir() / f"{profile_id}.prof"
+    return path if path.exists() else None
+
+
+def profile_summary(profile_id: str, limit: int = 40) -> str | None:
+    """Human-readable top functions by cumulative time."""
+    path = profile_path(profile_id)
+    if path is None:
+        return None
+    out = io.StringIO()
+    pstats.Stats(str(path), stream=out).sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
@@ -1,12 +1,52 @@
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.models.brew import Brew
 from app.models.rating import Rating
-from app.schemas.rating import RatingCreate, RatingUpdate
+from app.schemas.rating import RatingBulkItem, RatingCreate, RatingUpdate
+from app.services import (
+    cache_service, event_service, feature_service, flavor_service, idempotency_service, rollup_service,
+    search_service, sync_service,
+)
+
+MAX_BULK_RATINGS = 5000
+IDEMPOTENCY_SCOPE = "ratings.bulk"
+# Larger upserts publish one data.changed event instead of one per rating.
+EVENT_DETAIL_LIMIT = 20
+
+_bulk_item = TypeAdapter(RatingBulkItem)
+_UPSERT_COLUMNS = [c for c in RatingBulkItem.model_fields if c != "brew_id"]
+
+
+def _refresh_derived(db: Session, brew_id: int) -> Brew | None:
+    """Update the rollup, search index, flavor note links and features after a brew's rating changed."""
+    brew = db.query(Brew).filter(Brew.id == brew_id).first()
+    if brew:
+        rollup_service.refresh_buckets(db, [rollup_service.bucket_key(brew)])
+        search_service.reindex(db, [brew_id])
+        flavor_service.reindex(db, [brew_id])
+        feature_service.refresh(db, [brew_id])
+    return brew
+
+
+def _publish_rating(db: Session, kind: str, brew: Brew | None, rating, previous: dict | None) -> None:
+    if brew is not None:
+        event_service.publish(db, kind, {
+            **event_service.brew_fields(brew),
+            "rating": event_service.rating_fields(rating),
+            "previous": previous,
+        })
 
 
 def create_rating(db: Session, brew_id: int, data: RatingCreate) -> Rating:
     rating = Rating(brew_id=brew_id, **data.model_dump())
     db.add(rating)
+    brew = _refresh_derived(db, brew_id)
+    _publish_rating(db, "rating.saved", brew, rating, None)
+    cache_service.bump_data_version(db)
     db.commit()
     db.refresh(rating)
     return rating
@@ -20,8 +60,12 @@ def update_rating(db: Session, brew_id: int, data: RatingUpdate) -> Rating | Non
     rating = db.query(Rating).filter(Rating.brew_id == brew_id).first()
     if not rating:
         return None
+    previous = event_service.rating_fields(rating)
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(rating, key, value)
+    brew = _refresh_derived(db, brew_id)
+    _publish_rating(db, "rating.saved", brew, rating, previous)
+    cache_service.bump_data_version(db)
     db.commit()
     db.refresh(rating)
     return rating
@@ -31,6 +75,149 @@ def delete_rating(db: Session, brew_id: int) -> bool:
     rating = db.query(Rating).filter(Rating.brew_id == brew_id).first()
     if not rating:
         return False
+    sync_service.record_deletion(db, "ratings", [rating.id])
+    previous = event_service.rating_fields(rating)
     db.delete(rating)
+    brew = _refresh_derived(db, brew_id)
+    _publish_rating(db, "rating.deleted", brew, None, previous)
+    cache_service.bump_data_version(db)
     db.commit()
     return True
+
+
+def _upsert(db: Session, rows: list[dict]) -> None:
+    """Insert or overwrite the ratings in ``rows``, keyed on brew_id (does not commit)."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        stmt = (postgresql if dialect == "postgresql" else sqlite).insert(Rating)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[Rating.brew_id],
+            set_={column: stmt.excluded[column] for column in [*_UPSERT_COLUMNS, "updated_at"]},
+        ), rows)
+        return
+    # Without ON CONFLICT: update the brews that have a rating, insert the rest.
+    rated = set(db.scalars(select(Rating.brew_id).where(Rating.brew_id.in_([r["brew_id"] for r in rows]))))
+    updates = [
+        {**{c: row[c] for c in _UPSERT_COLUMNS}, "rated_brew_id": row["brew_id"]}
+        for row in rows if row["brew_id"] in rated
+    ]
+    inserts = [row for row in rows if row["brew_id"] not in rated]
+    if updates:
+        db.execute(
+            update(Rating.__table__).where(Rating.__table__.c.brew_id == bindparam("rated_brew_id")),
+            updates,
+        )
+    if inserts:
+        db.execute(insert(Rating.__table__), inserts)
+
+
+def upsert_ratings(db: Session, raw_items: list, idempotency_key: str | None = None) -> tuple[int, dict]:
+    """Create or fully replace the ratings of many brews in one statement.
+
+    Items are keyed on ``brew_id``: an existing rating is overwritten with
+    the item's values (INSERT ... ON CONFLICT DO UPDATE on SQLite and
+    Postgres, an UPDATE plus INSERT elsewhere). When an item has
+    no ``flavor_notes_accuracy`` it is computed from the brew's expected
+    note links (see flavor_service). Returns ``(status, body)``; with an ``idempotency_key`` a retry
+    of the same batch gets the stored response back without re-applying it,
+    and reusing the key for a different batch raises IdempotencyKeyReused.
+    """
+    request_hash = None
+    if idempotency_key:
+        request_hash = idempotency_service.fingerprint(raw_items)
+        stored = idempotency_service.replay(db, IDEMPOTENCY_SCOPE, idempotency_key, request_hash)
+        if stored is not None:
+            return stored
+
+    valid: dict[int, tuple[int, RatingBulkItem]] = {}
+    errors = []
+    for index, raw in enumerate(raw_items):
+        try:
+            item = _bulk_item.validate_python(raw)
+        except ValidationError as exc:
+            errors.append({"index": index, "errors": exc.errors(include_url=False, include_context=False)})
+            continue
+        if item.brew_id in valid:
+            # Postgres refuses to update one row twice in a statement; the last item wins.
+            errors.append({"index": valid[item.brew_id][0], "errors": [{
+                "loc": ["brew_id"], "msg": f"Superseded by a later item for brew {item.brew_id}",
+                "type": "duplicate",
+            }]})
+        valid[item.brew_id] = (index, item)
+
+    brews = {}
+    if valid:
+        brews = {
+            row.id: row for row in
+            db.query(Brew.bean_id, *(getattr(Brew, name) for name in event_service.BREW_FIELDS))
+            .filter(Brew.id.in_(valid)).all()
+        }
+    # Accuracy compares the brew's expected note ids with the tasted ones.
+    unscored = [
+        item for _, item in valid.values() if item.flavor_notes_accuracy is None and item.brew_id in brews
+    ]
+    expected = flavor_service.expected_notes(db, [item.brew_id for item in unscored])
+    tasted = {item.brew_id: flavor_service.split_notes(item.flavor_notes_experienced) for item in unscored}
+    known = flavor_service.note_ids(db, {n for notes in tasted.values() for n in notes}, create=False)
+    rows, upserted = [], []
+    for brew_id, (index, item) in valid.items():
+        brew = brews.get(brew_id)
+        if brew is None:
+            errors.append({"index": index, "errors": [{
+                "loc": ["brew_id"], "msg": f"Brew {brew_id} not found", "type": "not_found",
+            }]})
+            continue
+        values = item.model_dump()
+        if values["flavor_notes_accuracy"] is None:
+            values["flavor_notes_accuracy"] = flavor_service.accuracy(
+                expected.get(brew_id, set()),
+                {known[n.casefold()] for n in tasted[brew_id] if n.casefold() in known},
+            )
+        rows.append(values)
+        upserted.append({"index": index, "brew_id": brew_id})
+
+    errors.sort(key=lambda e: e["index"])
+    upserted.sort(key=lambda u: u["index"])
+    body = {"upserted": upserted, "errors": errors}
+    status = 200 if not errors else 207 if upserted else 422
+
+    if rows:
+        previous = {}
+        if len(rows) <= EVENT_DETAIL_LIMIT:
+            previous = {
+                r.brew_id: event_service.rating_fields(r) for r in
+                db.query(Rating.brew_id, Rating.overall_score, Rating.flavor_notes_accuracy)
+                .filter(Rating.brew_id.in_([row["brew_id"] for row in rows]))
+            }
+        _upsert(db, rows)
+        rollup_service.refresh_buckets(db, {
+            (b.brew_date, b.bean_id, b.grinder, b.brew_method)
+            for b in (brews[row["brew_id"]] for row in rows)
+        })
+        search_service.reindex(db, [row["brew_id"] for row in rows])
+        flavor_service.reindex(db, [row["brew_id"] for row in rows])
+        feature_service.refresh(db, [row["brew_id"] for row in rows])
+        if len(rows) <= EVENT_DETAIL_LIMIT:
+            for row in rows:
+                event_service.publish(db, "rating.saved", {
+                    **event_service.brew_fields(brews[row["brew_id"]]),
+                    "rating": {k: row[k] for k in ("overall_score", "flavor_notes_accuracy")},
+                    "previous": previous.get(row["brew_id"]),
+                })
+        else:
+            event_service.publish(db, "data.changed", {"source": "ratings.bulk", "count": len(rows)})
+        cache_service.bump_data_version(db)
+    if idempotency_key:
+        idempotency_service.remember(db, IDEMPOTENCY_SCOPE, idempotency_key, request_hash, status, body)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key committed first; serve its response.
+        db.rollback()
+        if not idempotency_key:
+            raise
+        stored = idempotency_service.replay(db, IDEMPOTENCY_SCOPE, idempotency_key, request_hash)
+        if stored is None:
+            raise
+        return stored
+    return status, body
@@ -0,0 +1,98 @@
+"""Daily rating rollups backing the trend charts.
+
+Each (brew_date, bean_id, grinder, brew_method) bucket stores count, sum and
+sum of squares per rating dimension. Buckets are keyed on the catalog bean
+(app.services.bean_service), so respelling a bean does not move its ratings. Write paths call ``refresh_buckets`` with
+the keys they touched; the bucket is recomputed from its source rows so the
+rollup can never drift from the brews table.
+"""
+
+from datetime import date
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.brew import Brew
+from app.models.rating import Rating
+from app.models.rollup import RatingRollup
+
+ROLLUP_METRICS = (
+    "overall_score", "bitterness", "acidity", "sweetness",
+    "body", "aroma", "aftertaste",
+)
+
+BucketKey = tuple[date, int | None, str | None, str]
+
+
+def bucket_key(brew: Brew) -> BucketKey:
+    return (brew.brew_date, brew.bean_id, brew.grinder, brew.brew_method)
+
+
+def _aggregate_columns() -> list:
+    cols = []
+    for metric in ROLLUP_METRICS:
+        col = getattr(Rating, metric)
+        cols += [func.count(col), func.sum(col), func.sum(col * col)]
+    return cols
+
+
+def _rollup_rows(day, bean_id, grinder, brew_method, aggregates) -> list[RatingRollup]:
+    rows = []
+    for i, metric in enumerate(ROLLUP_METRICS):
+        count, total, total_sq = aggregates[3 * i: 3 * i + 3]
+        if count:
+            rows.append(RatingRollup(
+                day=day, bean_id=bean_id, grinder=grinder, brew_method=brew_method,
+                metric=metric, count=count, total=total, total_sq=total_sq,
+            ))
+    return rows
+
+
+def _key_filter(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def refresh_buckets(db: Session, keys) -> None:
+    """Recompute the rollup rows for the given bucket keys (does not commit)."""
+    db.flush()
+    for day, bean_id, grinder, brew_method in set(keys):
+        db.query(RatingRollup).filter(
+            RatingRollup.day == day,
+            _key_filter(RatingRollup.bean_id, bean_id),
+            _key_filter(RatingRollup.grinder, grinder),
+            RatingRollup.brew_method == brew_method,
+        ).delete(synchronize_session=False)
+        aggregates = (
+            db.query(*_aggregate_columns())
+            .select_from(Brew)
+            .join(Rating)
+            .filter(
+                Brew.brew_date == day,
+                _key_filter(Brew.bean_id, bean_id),
+                _key_filter(Brew.grinder, grinder),
+                Brew.brew_method == brew_method,
+            )
+            .one()
+        )
+        db.add_all(_rollup_rows(day, bean_id, grinder, brew_method, aggregates))
+
+
+def rebuild_rollups(db: Session) -> None:
+    """Drop and recompute every rollup row from the brews table (does not commit)."""
+    db.query(RatingRollup).delete(synchronize_session=False)
+    rows = (
+        db.query(Brew.brew_date, Brew.bean_id, Brew.grinder, Brew.brew_method, *_aggregate_columns())
+        .join(Rating)
+        .group_by(Brew.brew_date, Brew.bean_id, Brew.grinder, Brew.brew_method)
+        .all()
+    )
+    for row in rows:
+        db.add_all(_rollup_rows(row[0], row[1], row[2], row[3], row[4:]))
+    db.flush()
+
+
+def ensure_rollups(db: Session) -> None:
+    """Backfill rollups for databases created before they existed."""
+    if db.query(RatingRollup.id).first() is None and db.query(Rating.id).first() is not None:
+        rebuild_rollups(db)
+        db.commit()
@@ -0,0 +1,235 @@
+"""Full-text search over brews: notes, rating comments, flavor notes, bean and roaster.
+
+The ``brew_search`` index (app.models.search) is maintained by the service
+layer, like the rating rollups: write paths call ``reindex`` with the brew ids
+they touched, and imports / restores call ``rebuild_index``. SQLite uses FTS5
+with bm25 ranking, Postgres weighted tsvectors with a GIN index and
+ts_rank_cd; other databases fall back to ILIKE. Excerpts are highlighted in
+Python for the returned page only.
+
+Queries are reduced to plain words, all of which must match; the last word
+also matches as a prefix so results can follow the search box as you type.
+"""
+
+import re
+import unicodedata
+from datetime import date
+from html import escape
+
+from sqlalchemy import and_, delete, desc, func, insert, literal_column, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.brew import Brew
+from app.models.rating import Rating
+from app.models.search import SEARCH_COLUMNS, SEARCH_TABLE, brew_search
+from app.services import brew_service
+
+MAX_RESULTS = 100
+_REINDEX_CHUNK = 500
+
+# bm25 weights in SEARCH_COLUMNS order: names count most, free text least.
+_BM25_WEIGHTS = (4.0, 4.0, 2.0, 2.0, 1.0, 1.0)
+# Postgres: the same split as tsvector weights A (names), B (flavor notes), C (free text).
+_PG_WEIGHTS = (
+    ("A", ("roaster", "bean_name")),
+    ("B", ("flavor_notes_expected", "flavor_notes_experienced")),
+    ("C", ("notes", "comments")),
+)
+_PG_CONFIG = "english"
+
+_WORD = re.compile(r"\w+")
+# Excerpts: the free-text columns, in the order they are tried, and their length in words.
+_EXCERPT_COLUMNS = ("notes", "comments", "flavor_notes_experienced", "flavor_notes_expected")
+_EXCERPT_WORDS = 16
+_EXCERPT_LEAD = 4
+
+
+def _source_columns() -> dict:
+    return {
+        "roaster": Brew.roaster,
+        "bean_name": Brew.bean_name,
+        "flavor_notes_expected": Brew.flavor_notes_expected,
+        "flavor_notes_experienced": Rating.flavor_notes_experienced,
+        "notes": Brew.notes,
+        "comments": Rating.comments,
+    }
+
+
+def _concat(columns, names):
+    return func.concat_ws(" ", *(columns[name] for name in names))
+
+
+def _pg_document(columns):
+    document = None
+    for weight, names in _PG_WEIGHTS:
+        part = func.setweight(func.to_tsvector(_PG_CONFIG, _concat(columns, names)), weight)
+        document = part if document is None else document.op("||")(part)
+    return document
+
+
+def _write(db: Session, brew_ids: list[int] | None) -> None:
+    source = select(Brew.id, *_source_columns().values()).outerjoin(Rating, Rating.brew_id == Brew.id)
+    if brew_ids is not None:
+        source = source.where(Brew.id.in_(brew_ids))
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(insert(brew_search).from_select(["rowid", *SEARCH_COLUMNS], source))
+    else:
+        rows = source.subquery()
+        db.execute(insert(brew_search).from_select(
+            ["brew_id", "document"], select(rows.c.id, _pg_document(rows.c))
+        ))
+
+
+def _indexed(db: Session) -> bool:
+    return db.get_bind().dialect.name in ("sqlite", "postgresql")
+
+
+def _key(db: Session):
+    return brew_search.c.rowid if db.get_bind().dialect.name == "sqlite" else brew_search.c.brew_id
+
+
+def reindex(db: Session, brew_ids) -> None:
+    """Re-read the given brews into the index; deleted ones drop out (does not commit)."""
+    if not _indexed(db):
+        return
+    db.flush()
+    ids = sorted(set(brew_ids))
+    for start in range(0, len(ids), _REINDEX_CHUNK):
+        chunk = ids[start:start + _REINDEX_CHUNK]
+        db.execute(delete(brew_search).where(_key(db).in_(chunk)))
+        _write(db, chunk)
+
+
+def rebuild_index(db: Session) -> None:
+    """Re-index every brew (does not commit)."""
+    if not _indexed(db):
+        return
+    db.flush()
+    db.execute(delete(brew_search))
+    _write(db, None)
+
+
+def ensure_index(db: Session) -> None:
+    """Backfill the index for databases created before it existed."""
+    if not _indexed(db):
+        return
+    if db.execute(select(_key(db)).select_from(brew_search).limit(1)).first() is None \
+            and db.query(Brew.id).first() is not None:
+        rebuild_index(db)
+        db.commit()
+
+
+def _fts_terms(words: list[str]) -> str:
+    return " ".join(f'"{w}"' for w in words) + "*"
+
+
+def _fold(word: str) -> str:
+    # Like the FTS5 tokenizer: lower case, diacritics removed.
+    return "".join(c for c in unicodedata.normalize("NFKD", word.lower()) if not unicodedata.combining(c))
+
+
+def _excerpt(texts, words: list[str]) -> str | None:
+    """HTML excerpt around the first hit in ``texts``: escaped, hits in <mark>.
+
+    Any word starting with a query word counts as a hit, which covers the
+    prefix match and, near enough, Postgres stemming.
+    """
+    for text in texts:
+        if not text:
+            continue
+        tokens = list(_WORD.finditer(text))
+        hits = {i for i, m in enumerate(tokens) if any(_fold(m.group()).startswith(w) for w in words)}
+        if not hits:
+            continue
+        first = max(0, min(hits) - _EXCERPT_LEAD)
+        last = min(len(tokens), first + _EXCERPT_WORDS) - 1
+        pos = tokens[first].start()
+        parts = ["…" if pos else ""]
+        for i in range(first, last + 1):
+            if i in hits:
+                token = tokens[i]
+                parts += [escape(text[pos:token.start()]), "<mark>", escape(token.group()), "</mark>"]
+                pos = token.end()
+        parts.append(escape(text[pos:tokens[last].end()]))
+        parts.append("…" if tokens[last].end() < len(text) else "")
+        return "".join(parts)
+    return None
+
+
+def _results(db: Session, ranked: list, words: list[str]) -> list[dict]:
+    """Displayed columns and excerpts for ``ranked`` (brew id, rank) pairs, in order."""
+    texts = [_source_columns()[name] for name in _EXCERPT_COLUMNS]
+    stmt = (
+        select(*brew_service.LIST_COLUMNS, *texts)
+        .outerjoin(Rating, Rating.brew_id == Brew.id)
+        .where(Brew.id.in_([brew_id for brew_id, _ in ranked]))
+    )
+    rows = {row.id: row for row in db.execute(stmt)}
+    return [
+        {
+            "id": row.id, "brew_date": row.brew_date, "roaster": row.roaster,
+            "bean_name": row.bean_name, "brew_method": row.brew_method,
+            "bean_amount_grams": row.bean_amount_grams, "water_amount_ml": row.water_amount_ml,
+            "overall_score": row.overall_score, "rank": rank,
+            "highlight": _excerpt((getattr(row, name) for name in _EXCERPT_COLUMNS), words),
+        }
+        for row, rank in ((rows.get(brew_id), rank) for brew_id, rank in ranked)
+        if row is not None
+    ]
+
+
+def search_brews(
+    db: Session,
+    q: str,
+    limit: int = 20,
+    roaster: str | None = None,
+    brew_method: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> list[dict]:
+    """Brews matching every word of ``q``, best first, with a highlighted excerpt.
+
+    ``rank`` is higher for better matches. ``highlight`` is HTML: the
+    matched notes, comments or flavor notes, escaped, with the hits wrapped
+    in ``<mark>`` (None when only the roaster or bean matched).
+    """
+    words = [_fold(w) for w in _WORD.findall(q)]
+    if not words:
+        return []
+    limit = max(1, min(limit, MAX_RESULTS))
+    filters = (roaster, brew_method, date_from, date_to)
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        fts = literal_column(SEARCH_TABLE)
+        expression = _fts_terms(words)
+        roaster_words = [_fold(w) for w in _WORD.findall(roaster or "")]
+        if roaster_words:
+            # Filter on the indexed roaster column rather than joining brews for an
+            # ILIKE: word prefixes ("tim wen") instead of arbitrary substrings.
+            expression += f" AND roaster : ({_fts_terms(roaster_words)})"
+            filters = (None, brew_method, date_from, date_to)
+        match = fts.op("MATCH")(expression)
+        # bm25 is lower for better matches.
+        score = -func.bm25(fts, *_BM25_WEIGHTS)
+    elif dialect == "postgresql":
+        query = func.to_tsquery(_PG_CONFIG, " & ".join(words) + ":*")
+        match = brew_search.c.document.op("@@")(query)
+        score = func.ts_rank_cd(brew_search.c.document, query)
+    else:
+        return _search_ilike(db, words, limit, filters)
+
+    # Every match is scored; the database keeps only the best ``limit``.
+    stmt = select(_key(db).label("brew_id"), score.label("score")).select_from(brew_search).where(match)
+    if any(filters):
+        stmt = brew_service.filter_brews(db, stmt.join(Brew, Brew.id == _key(db)), *filters)
+    ranked = db.execute(stmt.order_by(desc(score), desc(_key(db))).limit(limit)).all()
+    return _results(db, ranked, words) if ranked else []
+
+
+def _search_ilike(db: Session, words: list[str], limit: int, filters) -> list[dict]:
+    columns = list(_source_columns().values())
+    stmt = select(Brew.id).outerjoin(Rating, Rating.brew_id == Brew.id)
+    stmt = stmt.where(and_(*(or_(*(c.ilike(f"%{w}%") for c in columns)) for w in words)))
+    stmt = brew_service.filter_brews(db, stmt, *filters).order_by(desc(Brew.brew_date), desc(Brew.id)).limit(limit)
+    return _results(db, [(brew_id, None) for brew_id in db.scalars(stmt)], words)
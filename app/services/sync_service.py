@@ -0,0 +1,146 @@
+"""Delta sync: what changed in beans, brews, ratings, templates and inventory since a cursor.
+
+Changes are found through the indexed ``updated_at`` columns, deletions
+through the tombstones that the delete paths record. A cursor is the server
+time at which the previous sync started (ISO 8601, UTC); clients should
+treat it as opaque and apply results idempotently, since rows near a cursor
+boundary may be sent twice.
+
+Responses hold at most SYNC_PAGE_SIZE rows. When ``next_page`` is set the
+client asks again with it; every page carries the cursor of the first, so
+changes made while paging are picked up by the next sync.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.bean import Bean
+from app.models.brew import Brew
+from app.models.inventory import BeanInventory
+from app.models.rating import Rating
+from app.models.template import BrewTemplate
+from app.models.tombstone import Tombstone
+
+# Sync payload key -> model; also the ``entity`` names used in tombstones.
+ENTITIES = {
+    "beans": Bean,
+    "brews": Brew,
+    "ratings": Rating,
+    "templates": BrewTemplate,
+    "inventory": BeanInventory,
+}
+RESET = "all"
+
+# Rows committed shortly after a sync started can carry an earlier
+# updated_at (it is set at flush, not commit; clock skew between workers),
+# so each sync looks back this far before the cursor. A write transaction
+# running longer than this can be missed.
+CURSOR_OVERLAP = timedelta(seconds=settings.sync_cursor_overlap_seconds)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def record_deletion(db: Session, entity: str, entity_ids) -> None:
+    """Add tombstones (does not commit) and prune ones past the retention window."""
+    now = datetime.utcnow()
+    db.query(Tombstone).filter(
+        Tombstone.deleted_at < now - timedelta(days=settings.sync_tombstone_days)
+    ).delete(synchronize_session=False)
+    db.add_all(Tombstone(entity=entity, entity_id=i, deleted_at=now) for i in entity_ids)
+
+
+def record_reset(db: Session) -> None:
+    """Mark that all data was replaced; every client cursor before now is void."""
+    record_deletion(db, RESET, [0])
+
+
+def encode_cursor(moment: datetime) -> str:
+    return moment.isoformat(timespec="microseconds")
+
+
+def decode_cursor(cursor: str) -> datetime:
+    try:
+        return datetime.fromisoformat(cursor)
+    except ValueError:
+        raise InvalidCursor(f"Invalid sync cursor: {cursor!r}")
+
+
+def _encode_page(started: datetime, since: datetime | None, entity: str, after_id: int) -> str:
+    return "~".join((encode_cursor(started), encode_cursor(since) if since else "", entity, str(after_id)))
+
+
+def _decode_page(page: str) -> tuple[datetime, datetime | None, str, int]:
+    parts = page.split("~")
+    if len(parts) != 4 or parts[2] not in ENTITIES or not parts[3].isdigit():
+        raise InvalidCursor(f"Invalid sync page: {page!r}")
+    started, since, entity, after_id = parts
+    return decode_cursor(started), decode_cursor(since) if since else None, entity, int(after_id)
+
+
+def _rows(db: Session, model, since: datetime | None, after_id: int, limit: int) -> list[dict]:
+    stmt = select(model.__table__).where(model.id > after_id)
+    if since is not None:
+        stmt = stmt.where(model.updated_at >= since)
+    return [dict(row._mapping) for row in db.execute(stmt.order_by(model.id).limit(limit))]
+
+
+def changes_since(
+    db: Session, cursor: str | None = None, page: str | None = None, limit: int | None = None,
+) -> dict:
+    """Rows created or updated since ``cursor`` and ids deleted since then.
+
+    Without a cursor, or when the cursor predates a data import or the
+    tombstone retention window, the full dataset is returned with
+    ``reset: true`` and the client should replace its copy with the rows of
+    all pages. Rows come entity by entity in id order, ``limit`` (default
+    SYNC_PAGE_SIZE) per page; deletions come with the first page. ``page``
+    is the previous response's ``next_page`` and replaces ``cursor``.
+    """
+    limit = max(1, limit or settings.sync_page_size)
+    if page:
+        started, since, entity, after_id = _decode_page(page)
+        return _page(db, started, since, {}, entity, after_id, limit)
+
+    started = datetime.utcnow()
+    since = None
+    if cursor:
+        since = decode_cursor(cursor) - CURSOR_OVERLAP
+        retained_from = started - timedelta(days=settings.sync_tombstone_days)
+        replaced = db.query(Tombstone.id).filter(
+            Tombstone.entity == RESET, Tombstone.deleted_at >= since
+        ).first()
+        if since < retained_from or replaced:
+            since = None
+
+    deleted: dict[str, list[int]] = {name: [] for name in ENTITIES}
+    if since is not None:
+        for entity, entity_id in (
+            db.query(Tombstone.entity, Tombstone.entity_id)
+            .filter(Tombstone.deleted_at >= since, Tombstone.entity != RESET)
+            .order_by(Tombstone.id)
+        ):
+            deleted.setdefault(entity, []).append(entity_id)
+
+    return _page(db, started, since, deleted, next(iter(ENTITIES)), 0, limit)
+
+
+def _page(db: Session, started, since, deleted: dict, entity: str, after_id: int, limit: int) -> dict:
+    """Up to ``limit`` rows, starting after ``after_id`` in ``entity``."""
+    payload = {"cursor": encode_cursor(started), "reset": since is None, "next_page": None}
+    position = list(ENTITIES).index(entity)
+    for index, (name, model) in enumerate(ENTITIES.items()):
+        rows = []
+        if index >= position and payload["next_page"] is None:
+            start = after_id if index == position else 0
+            rows = _rows(db, model, since, start, limit + 1)
+            if len(rows) > limit:
+                rows = rows[:limit]
+                payload["next_page"] = _encode_page(started, since, name, rows[-1]["id"] if rows else start)
+            limit -= len(rows)
+        payload[name] = {"upserted": rows, "deleted": deleted.get(name, [])}
+    return payload
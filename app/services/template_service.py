@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app.models.brew import Brew
 from app.models.template import BrewTemplate
 from app.schemas.template import TemplateCreate, TemplateUpdate
+from app.services import bean_service, sync_service
 
 # Fields shared between Brew and BrewTemplate (excluding id, timestamps, template_id)
 TEMPLATE_FIELDS = [
@@ -17,6 +18,7 @@ TEMPLATE_FIELDS = [
 
 def create_template(db: Session, data: TemplateCreate) -> BrewTemplate:
     template = BrewTemplate(**data.model_dump())
+    bean_service.link(db, template)
     db.add(template)
     db.commit()
     db.refresh(template)
@@ -30,7 +32,7 @@ def create_template_from_brew(db: Session, brew_id: int, name: str) -> BrewTempl
     values = {"name": name}
     for field in TEMPLATE_FIELDS:
         values[field] = getattr(brew, field)
-    template = BrewTemplate(**values)
+    template = BrewTemplate(**values, bean_id=brew.bean_id)
     db.add(template)
     db.commit()
     db.refresh(template)
@@ -46,6 +48,7 @@ def update_template_from_brew(db: Session, brew_id: int) -> BrewTemplate | None:
         return None
     for field in TEMPLATE_FIELDS:
         setattr(template, field, getattr(brew, field))
+    template.bean_id = brew.bean_id
     db.commit()
     db.refresh(template)
     return template
@@ -63,8 +66,11 @@ def update_template(db: Session, template_id: int, data: TemplateUpdate) -> Brew
     template = db.query(BrewTemplate).filter(BrewTemplate.id == template_id).first()
     if not template:
         return None
-    for key, value in data.model_dump(exclude_unset=True).items():
+    updates = data.model_dump(exclude_unset=True)
+    for key, value in updates.items():
         setattr(template, key, value)
+    if updates.keys() & {"roaster", "bean_name", "bean_origin", "bean_process"}:
+        bean_service.link(db, template)
     db.commit()
     db.refresh(template)
     return template
@@ -74,6 +80,7 @@ def delete_template(db: Session, template_id: int) -> bool:
     template = db.query(BrewTemplate).filter(BrewTemplate.id == template_id).first()
     if not template:
         return False
+    sync_service.record_deletion(db, "templates", [template.id])
     db.delete(template)
     db.commit()
     return True
@@ -109,8 +109,34 @@ document.addEventListener('DOMContentLoaded', () => {
     });
     // Init checkbox limit on load
     enforceCheckboxLimit(4);
+    document.querySelectorAll('input[data-suggest]').forEach(attachSuggestions);
 });
 
+// Autocomplete: <input data-suggest="roaster"> offers values already used for
+// that field (see /api/v1/lookups/suggestions) through a <datalist>
+function attachSuggestions(input) {
+    const list = document.createElement('datalist');
+    list.id = `suggest-${input.name}-${Math.random().toString(36).slice(2)}`;
+    input.after(list);
+    input.setAttribute('list', list.id);
+    input.setAttribute('autocomplete', 'off');
+    let latest = 0;
+    const load = debounce(async () => {
+        const request = ++latest;
+        const params = new URLSearchParams({ field: input.dataset.suggest, q: input.value.trim() });
+        try {
+            const resp = await fetch(`/api/v1/lookups/suggestions?${params}`);
+            if (!resp.ok || request !== latest) return;
+            const values = await resp.json();
+            list.replaceChildren(...values.map(value => new Option(value)));
+        } catch (err) {
+            console.error('Failed to load suggestions:', err);
+        }
+    }, 120);
+    input.addEventListener('input', load);
+    input.addEventListener('focus', load, { once: true });
+}
+
 // Temperature toggle — single input field, switch between F and C
 let currentTempUnit = 'F';
 function toggleTemp(unit) {
@@ -280,31 +306,43 @@ async function addGrinder() {
     }
 }
 
-// CSV export
-async function exportCSV() {
-    try {
-        const resp = await fetch('/api/v1/brews/?limit=10000');
-        if (!resp.ok) return;
-        const brews = await resp.json();
-        if (brews.length === 0) { alert('No brews to export'); return; }
-        const headers = Object.keys(brews[0]);
-        const csv = [headers.join(',')];
-        for (const brew of brews) {
-            csv.push(headers.map(h => {
-                const v = brew[h];
-                if (v == null) return '';
-                const s = String(v);
-                return s.includes(',') ? `"${s}"` : s;
-            }).join(','));
-        }
-        const blob = new Blob([csv.join('\n')], { type: 'text/csv' });
-        const url = URL.createObjectURL(blob);
-        const a = document.createElement('a');
-        a.href = url;
-        a.download = 'brews.csv';
-        a.click();
-        URL.revokeObjectURL(url);
-    } catch (e) {
-        console.error('Export failed:', e);
+// CSV export: streamed by the server with the brew list's current filters
+function exportCSV() {
+    const params = new URLSearchParams();
+    for (const name of ['roaster', 'brew_method']) {
+        const input = document.querySelector(`.filter-bar [name="${name}"]`);
+        if (input && input.value.trim()) params.set(name, input.value.trim());
+    }
+    const query = params.toString();
+    window.location.href = '/api/v1/brews/export.csv' + (query ? `?${query}` : '');
+}
+
+// Run fn once calls have stopped for `ms` milliseconds
+function debounce(fn, ms) {
+    let timer;
+    return (...args) => {
+        clearTimeout(timer);
+        timer = setTimeout(() => fn(...args), ms);
+    };
+}
+
+// Live updates: handlers maps change event kinds (see app/services/event_service.py)
+// to callbacks taking the event payload. The browser reconnects on its own and the
+// server replays what was missed; when it cannot ("resync") or the data was
+// replaced wholesale, the page reloads unless a handler for those kinds is given.
+function subscribeChanges(handlers) {
+    if (!window.EventSource) return null;
+    const reload = () => window.location.reload();
+    handlers = { resync: reload, 'data.replaced': reload, ...handlers };
+    const source = new EventSource('/api/v1/events');
+    for (const [kind, handler] of Object.entries(handlers)) {
+        source.addEventListener(kind, e => {
+            try {
+                handler(JSON.parse(e.data));
+            } catch (err) {
+                console.error(`Failed to apply ${kind} event:`, err);
+            }
+        });
     }
+    return source;
 }
@@ -0,0 +1,165 @@
+"""Compare request capacity of the sync and async read paths.
+
+Starts one uvicorn worker per mode (ASYNC_DB=false / true) against the same
+seeded SQLite file, then drives the hot read endpoints with a fixed number
+of concurrent clients and reports throughput and latency percentiles:
+
+    python -m benchmarks.async_capacity --concurrency 200 --seconds 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+READ_PATHS = (
+    "/api/v1/brews/",
+    "/api/v1/brews/{brew_id}",
+    "/api/v1/analytics/summary",
+    "/api/v1/analytics/trends?group_by=week",
+    "/api/v1/analytics/filter-options",
+    "/api/v1/shelf",
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(db_url: str, async_db: bool) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=db_url,
+        AUTO_MIGRATE="true",
+        ASYNC_DB="true" if async_db else "false",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base}/health").status_code == 200:
+                return proc, base
+        except httpx.TransportError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("server did not start")
+
+
+def _seed(base: str, brews: int) -> list[int]:
+    ids = []
+    with httpx.Client(base_url=base) as client:
+        for i in range(brews):
+            resp = client.post("/api/v1/brews/", json={
+                "brew_date": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+                "roaster": f"Roaster {i % 7}",
+                "bean_name": f"Bean {i % 15}",
+                "bean_amount_grams": 15 + i % 5,
+                "water_amount_ml": 250,
+                "brew_method": ("V60", "Chemex", "Espresso")[i % 3],
+                "grind_setting": str(10 + i % 12),
+            })
+            brew_id = resp.json()["id"]
+            client.post(f"/api/v1/brews/{brew_id}/rating/", json={"overall_score": 5 + i % 5})
+            ids.append(brew_id)
+    return ids
+
+
+async def _drive(base: str, ids: list[int], concurrency: int, seconds: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    stop_at = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async def client_loop(client: httpx.AsyncClient, rng: random.Random):
+        nonlocal errors
+        while time.perf_counter() < stop_at:
+            path = rng.choice(READ_PATHS).format(brew_id=rng.choice(ids))
+            started = time.perf_counter()
+            try:
+                resp = await client.get(path)
+                if resp.status_code >= 400:
+                    errors += 1
+                    continue
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, random.Random(n)) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def pct(p: float):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000, 1)
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+    }
+
+
+def run(concurrency: int, seconds: float, brews: int) -> dict:
+    report = {"concurrency": concurrency, "seconds": seconds}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'capacity.db')}"
+        ids: list[int] = []
+        for mode, async_db in (("sync", False), ("async", True)):
+            proc, base = _start_server(db_url, async_db)
+            try:
+                if not ids:
+                    ids = _seed(base, brews)
+                report[mode] = asyncio.run(_drive(base, ids, concurrency, seconds))
+            finally:
+                proc.terminate()
+                proc.wait()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--brews", type=int, default=300, help="Brews to seed")
+    parser.add_argument("--json", action="store_true", help="Print a JSON summary only")
+    args = parser.parse_args()
+
+    report = run(args.concurrency, args.seconds, args.brews)
+    if args.json:
+        print(json.dumps(report))
+        return
+    print(f"concurrency={report['concurrency']} duration={report['seconds']}s")
+    for mode in ("sync", "async"):
+        row = report[mode]
+        print(f"{mode:>6}: " + "  ".join(f"{k}={v}" for k, v in row.items()))
+
+
+if __name__ == "__main__":
+    main()
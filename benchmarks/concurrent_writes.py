@@ -0,0 +1,121 @@
+"""Hammer brew creation from several processes against one database.
+
+Reports write throughput and how many inserts failed with lock errors, so
+the SQLite pragmas / pool settings in app.config can be compared:
+
+    python -m benchmarks.concurrent_writes --processes 4 --brews 200
+    SQLITE_JOURNAL_MODE=DELETE SQLITE_BUSY_TIMEOUT_MS=0 python -m benchmarks.concurrent_writes
+
+Without --url a throwaway SQLite file is created in a temp directory.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import date
+
+
+def _worker(worker_id: int, count: int, start_at: float) -> dict:
+    # Imported here so each spawned process builds its own engine from
+    # DATABASE_URL set by the parent.
+    from sqlalchemy.exc import OperationalError
+
+    from app.database import SessionLocal
+    from app.schemas.brew import BrewCreate
+    from app.services import brew_service
+
+    while time.time() < start_at:
+        time.sleep(0.001)
+
+    ok = locked = failed = 0
+    latencies = []
+    for i in range(count):
+        data = BrewCreate(
+            brew_date=date.today(),
+            bean_name=f"Bench Bean {worker_id}",
+            roaster="Bench Roasters",
+            brew_method="V60",
+            bean_amount_grams=15.0,
+            water_amount_ml=250.0,
+            water_temp_c=94.0,
+            grind_setting=str(10 + i % 10),
+        )
+        db = SessionLocal()
+        started = time.perf_counter()
+        try:
+            brew_service.create_brew(db, data)
+            ok += 1
+            latencies.append(time.perf_counter() - started)
+        except OperationalError as exc:
+            db.rollback()
+            if "locked" in str(exc.orig).lower() or "busy" in str(exc.orig).lower():
+                locked += 1
+            else:
+                failed += 1
+        finally:
+            db.close()
+    return {"ok": ok, "locked": locked, "failed": failed, "latencies": latencies}
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return round(values[idx] * 1000, 2)
+
+
+def run(url: str, processes: int, brews: int) -> dict:
+    os.environ["DATABASE_URL"] = url
+    from app.bootstrap import bootstrap
+
+    bootstrap()
+
+    ctx = multiprocessing.get_context("spawn")
+    start_at = time.time() + 2.0  # give every child time to import the app
+    with ctx.Pool(processes) as pool:
+        jobs = [pool.apply_async(_worker, (n, brews, start_at)) for n in range(processes)]
+        results = [job.get() for job in jobs]
+    elapsed = time.time() - start_at
+
+    latencies = [lat for r in results for lat in r["latencies"]]
+    ok = sum(r["ok"] for r in results)
+    return {
+        "url": url.split("@")[-1],
+        "processes": processes,
+        "attempted": processes * brews,
+        "ok": ok,
+        "lock_errors": sum(r["locked"] for r in results),
+        "other_errors": sum(r["failed"] for r in results),
+        "seconds": round(elapsed, 3),
+        "writes_per_second": round(ok / elapsed, 1) if elapsed > 0 else None,
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Database URL (default: temp SQLite file)")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--brews", type=int, default=200, help="Brews per process")
+    parser.add_argument("--json", action="store_true", help="Print a JSON summary only")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        report = run(url, args.processes, args.brews)
+
+    if args.json:
+        print(json.dumps(report))
+        return
+    for key, value in report.items():
+        print(f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""Offline load generator and latency SLO report for the whole app.
+
+Starts the app under gunicorn (uvicorn workers, as in the Dockerfile) for
+each --workers value, then runs closed-loop virtual users that replay a
+realistic traffic mix: dashboard and brew list pages, brew and rating
+POSTs, analytics charts, the shelf, and an occasional grind analysis
+upload. For every (workers, users) step it reports throughput and
+p50/p95/p99 per route, and the largest user count whose overall p99 stays
+within --slo-ms:
+
+    python -m benchmarks.loadgen --workers 1 2 4 --users 10 25 50 100
+    python -m benchmarks.loadgen --url postgresql://localhost/coffee_bench --no-seed
+
+Without --url the data lives in a throwaway SQLite file seeded by
+benchmarks.synthetic. Nothing leaves the machine.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# (route label, weight); labels double as the per-route report keys
+MIX = (
+    ("GET /", 12),
+    ("GET /brews", 12),
+    ("GET /brews/{id}", 8),
+    ("POST /api/v1/brews/", 7),
+    ("POST /api/v1/brews/{id}/rating/", 5),
+    ("GET /analytics", 4),
+    ("GET /api/v1/analytics/summary", 8),
+    ("GET /api/v1/analytics/trends", 8),
+    ("GET /api/v1/analytics/correlations", 6),
+    ("GET /api/v1/analytics/distributions", 4),
+    ("GET /api/v1/shelf", 6),
+    ("GET /api/v1/shelf/lp", 4),
+    ("POST /api/v1/grind-lab/analyze", 1),
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _prepare_database(url: str, brews: int, seed: bool) -> None:
+    # Runs in this process before any server starts, like `python -m app.bootstrap`.
+    os.environ["DATABASE_URL"] = url
+    from sqlalchemy.orm import sessionmaker
+
+    from app.bootstrap import bootstrap
+    from app.database import engine
+    from benchmarks.synthetic import populate
+
+    bootstrap()
+    if seed:
+        with sessionmaker(bind=engine)() as db:
+            populate(db, brews=brews)
+
+
+def _start_server(url: str, workers: int) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=url, AUTO_MIGRATE="false")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app.main:app", "-w", str(workers),
+         "-k", "uvicorn.workers.UvicornWorker", "--bind", f"127.0.0.1:{port}",
+         "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base}/health").status_code == 200:
+                return proc, base
+        except httpx.TransportError:
+            time.sleep(0.25)
+    proc.terminate()
+    raise RuntimeError("server did not start")
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random, brew_ids: list[int],
+                 image: bytes):
+        self.client = client
+        self.rng = rng
+        self.brew_ids = brew_ids
+        self.image = image
+        self.unrated: list[int] = []
+
+    async def request(self, label: str) -> httpx.Response:
+        c, rng = self.client, self.rng
+        if label == "GET /brews/{id}":
+            return await c.get(f"/brews/{rng.choice(self.brew_ids)}")
+        if label == "POST /api/v1/brews/":
+            resp = await c.post("/api/v1/brews/", json={
+                "brew_date": date.today().isoformat(),
+                "roaster": rng.choice(("Onyx", "Sey", "Dak")),
+                "bean_name": f"Load Bean {rng.randint(1, 20)}",
+                "bean_amount_grams": round(rng.uniform(14, 20), 1),
+                "water_amount_ml": rng.choice((240, 250, 300)),
+                "brew_method": rng.choice(("Pour Over", "AeroPress", "Espresso")),
+                "grind_setting": str(rng.randint(8, 30)),
+                "water_temp_c": round(rng.uniform(90, 96), 1),
+            })
+            if resp.status_code == 201:
+                self.unrated.append(resp.json()["id"])
+            return resp
+        if label == "POST /api/v1/brews/{id}/rating/":
+            if not self.unrated:
+                return await self.request("POST /api/v1/brews/")
+            brew_id = self.unrated.pop()
+            return await c.post(f"/api/v1/brews/{brew_id}/rating/", json={
+                "overall_score": rng.choice((5, 6, 6.5, 7, 7.5, 8, 9)),
+                "acidity": 3, "sweetness": 3.5,
+            })
+        if label == "GET /api/v1/analytics/trends":
+            return await c.get("/api/v1/analytics/trends",
+                               params={"group_by": rng.choice(("day", "week", "month"))})
+        if label == "GET /api/v1/analytics/correlations":
+            return await c.get("/api/v1/analytics/correlations", params={
+                "x": rng.choice(("grind_setting", "water_temp_c", "bean_amount_grams")),
+                "y": "overall_score", "summary": "true", "max_points": 0,
+            })
+        if label == "GET /api/v1/analytics/distributions":
+            return await c.get("/api/v1/analytics/distributions",
+                               params={"field": rng.choice(("brew_method", "roaster"))})
+        if label == "POST /api/v1/grind-lab/analyze":
+            return await c.post("/api/v1/grind-lab/analyze",
+                                files={"image": ("grind.png", self.image, "image/png")})
+        method, path = label.split(" ", 1)
+        return await c.request(method, path)
+
+
+async def _run_step(base: str, users: int, seconds: float, think_ms: float,
+                    brew_ids: list[int], image: bytes) -> dict:
+    labels = [label for label, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    stop_at = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+
+    async def user_loop(user: VirtualUser):
+        while time.perf_counter() < stop_at:
+            label = user.rng.choices(labels, weights)[0]
+            started = time.perf_counter()
+            try:
+                resp = await user.request(label)
+                ok = resp.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies[label].append(time.perf_counter() - started)
+            else:
+                errors[label] += 1
+            if think_ms:
+                await asyncio.sleep(user.rng.expovariate(1000 / think_ms))
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            user_loop(VirtualUser(client, random.Random(n), brew_ids, image)) for n in range(users)
+        ))
+        elapsed = time.perf_counter() - started
+
+    everything = sorted(lat for lats in latencies.values() for lat in lats)
+    return {
+        "users": users,
+        "requests": len(everything),
+        "errors": sum(errors.values()),
+        "throughput_rps": round(len(everything) / elapsed, 1),
+        **_percentiles(everything),
+        "routes": {
+            label: {"requests": len(latencies[label]), "errors": errors[label],
+                    **_percentiles(sorted(latencies[label]))}
+            for label in labels if latencies[label] or errors[label]
+        },
+    }
+
+
+def _percentiles(values: list[float]) -> dict:
+    def pct(p: float):
+        if not values:
+            return None
+        return round(values[min(len(values) - 1, int(p / 100 * len(values)))] * 1000, 1)
+    return {"p50_ms": pct(50), "p95_ms": pct(95), "p99_ms": pct(99)}
+
+
+def run(url: str, workers_list: list[int], users_list: list[int], seconds: float,
+        think_ms: float, slo_ms: float, brews: int, seed: bool) -> dict:
+    _prepare_database(url, brews, seed)  # first: it points app.database at `url`
+    from benchmarks.synthetic import grind_image
+
+    image = grind_image(300, size=(800, 600))
+    report = {"database": url.split("@")[-1], "seconds_per_step": seconds,
+              "think_ms": think_ms, "slo_p99_ms": slo_ms, "runs": []}
+
+    for workers in workers_list:
+        proc, base = _start_server(url, workers)
+        try:
+            brew_ids = [b["id"] for b in httpx.get(f"{base}/api/v1/brews/?limit=200").json()]
+            steps = []
+            for users in users_list:
+                step = asyncio.run(_run_step(base, users, seconds, think_ms, brew_ids, image))
+                steps.append(step)
+                print(f"workers={workers} users={users:>4} rps={step['throughput_rps']:>7} "
+                      f"p50={step['p50_ms']}ms p95={step['p95_ms']}ms p99={step['p99_ms']}ms "
+                      f"errors={step['errors']}", file=sys.stderr)
+            within = [s["users"] for s in steps
+                      if s["p99_ms"] is not None and s["p99_ms"] <= slo_ms and not s["errors"]]
+            report["runs"].append({
+                "workers": workers,
+                "max_users_within_slo": max(within) if within else 0,
+                "steps": steps,
+            })
+        finally:
+            proc.terminate()
+            proc.wait()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Database URL (default: temp SQLite file)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--users", type=int, nargs="+", default=[5, 10, 25, 50])
+    parser.add_argument("--seconds", type=float, default=15.0, help="Duration of each step")
+    parser.add_argument("--think-ms", type=float, default=100.0, help="Mean pause between requests")
+    parser.add_argument("--slo-ms", type=float, default=500.0, help="p99 latency objective")
+    parser.add_argument("--brews", type=int, default=1000, help="Synthetic brews to seed")
+    parser.add_argument("--no-seed", action="store_true", help="Use the database as it is")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{os.path.join(tmp, 'load.db')}"
+        report = run(url, args.workers, args.users, args.seconds, args.think_ms,
+                     args.slo_ms, args.brews, not args.no_seed)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Benchmark suite for the service layer, key API endpoints and grind analysis.
+
+Builds a throwaway SQLite database filled by benchmarks.synthetic, times each
+case (--repeat runs after a warm-up), writes the results as JSON
+and compares them with a stored baseline:
+
+    python -m benchmarks.suite                      # compare with benchmarks/baseline.json
+    python -m benchmarks.suite --output results.json --threshold 0.3
+    python -m benchmarks.suite --update-baseline    # after an intended change
+
+Comparison uses each case's fastest run, the most stable estimate on a
+noisy machine. A case regresses when it is slower than the baseline by more
+than the threshold (a fraction, default 0.25) and by at least --min-delta-ms;
+the exit status is then 1.
+Baselines are machine specific, so benchmarks/baseline.json is not checked
+in: record one with --update-baseline on the machine that runs comparisons.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+GRIND_DENSITIES = {"sparse": 150, "medium": 600, "dense": 1500}
+
+
+def _time(fn: Callable[[], object], repeat: int) -> dict:
+    fn()  # warm-up: imports, statement caches, page cache
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return {
+        "median_s": round(statistics.median(runs), 6),
+        "min_s": round(min(runs), 6),
+        "max_s": round(max(runs), 6),
+        "runs": repeat,
+    }
+
+
+def _service_cases(session_factory) -> dict[str, Callable[[], object]]:
+    from app.schemas.brew import BrewListRead
+    from app.services import (
+        analytics_service, autocomplete_service, brew_service, flavor_service, inventory_service,
+        search_service,
+    )
+
+    def with_session(fn):
+        def run():
+            with session_factory() as db:
+                return fn(db)
+        return run
+
+    return {
+        "list_brews": with_session(lambda db: brew_service.list_brews(db)),
+        # The list endpoint before and after column projection, 500 rows each.
+        "list_brews_500_orm_pydantic": with_session(lambda db: [
+            BrewListRead(
+                id=b.id, brew_date=b.brew_date, roaster=b.roaster, bean_name=b.bean_name,
+                brew_method=b.brew_method,
+                overall_score=b.rating.overall_score if b.rating else None,
+            ).model_dump(mode="json")
+            for b in brew_service.list_brews(db, limit=500)
+        ]),
+        "list_brews_500_projected_json": with_session(
+            lambda db: brew_service.brew_rows_json(brew_service.list_brew_rows(db, limit=500))
+        ),
+        "list_brews_filtered": with_session(
+            lambda db: brew_service.list_brews(db, roaster="Onyx", brew_method="Pour Over")
+        ),
+        "autocomplete_roaster": with_session(lambda db: autocomplete_service.suggest(db, "roaster", "on")),
+        "search_brews": with_session(lambda db: search_service.search_brews(db, "juicy")),
+        "search_brews_prefix": with_session(lambda db: search_service.search_brews(db, "great clar")),
+        "get_summary": with_session(analytics_service.get_summary),
+        "get_trends_week": with_session(lambda db: analytics_service.get_trends(db, "week")),
+        "get_correlations": with_session(
+            lambda db: analytics_service.get_correlations(db, "grind_setting", "overall_score")
+        ),
+        "get_correlation_stats": with_session(
+            lambda db: analytics_service.get_correlation_stats(db, "water_temp_c", "overall_score")
+        ),
+        "flavor_note_predictors": with_session(flavor_service.note_predictors),
+        "flavor_note_hit_rates": with_session(flavor_service.hit_rates_by_roaster),
+        "list_shelf": with_session(inventory_service.list_shelf),
+        "get_lp_data": with_session(inventory_service.get_lp_data),
+    }
+
+
+def _api_cases(client) -> dict[str, Callable[[], object]]:
+    export = client.get("/api/v1/data/export").content
+    bulk = [
+        {"brew_date": "2025-03-01", "roaster": "Onyx", "bean_name": f"Bulk {i % 10}",
+         "bean_amount_grams": 18.0, "water_amount_ml": 36.0, "brew_method": "Espresso",
+         "grind_setting": str(8 + i % 5), "rating": {"overall_score": 7.0}}
+        for i in range(500)
+    ]
+
+    def check(resp):
+        resp.raise_for_status()
+        return resp
+
+    return {
+        "api_list_brews": lambda: check(client.get("/api/v1/brews/")),
+        "page_brew_list": lambda: check(client.get("/brews")),
+        "api_export": lambda: check(client.get("/api/v1/data/export")),
+        "api_import": lambda: check(client.post(
+            "/api/v1/data/import", files={"file": ("export.json", export, "application/json")}
+        )),
+        # Last: it grows the dataset the cases above measure.
+        "api_bulk_create_500": lambda: check(client.post("/api/v1/brews/bulk", json=bulk)),
+    }
+
+
+def _grind_cases() -> dict[str, Callable[[], object]]:
+    from app.services.grind_analysis_service import analyze_image
+
+    from benchmarks.synthetic import grind_image
+
+    cases = {}
+    for name, particles in GRIND_DENSITIES.items():
+        image = grind_image(particles, seed=particles)
+        cases[f"analyze_image_{name}"] = lambda image=image: analyze_image(image)
+    return cases
+
+
+def run(brews: int, repeat: int, only: list[str] | None = None) -> dict:
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import sessionmaker
+
+    from app.bootstrap import bootstrap
+    from app.database import engine
+    from app.main import app
+    from benchmarks.synthetic import populate
+
+    bootstrap()
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    with session_factory() as db:
+        counts = populate(db, brews=brews)
+
+    results = {}
+    with TestClient(app) as client:
+        groups = (
+            lambda: _service_cases(session_factory),
+            lambda: _api_cases(client),
+            _grind_cases,
+        )
+        for build in groups:
+            for name, fn in build().items():
+                if only and not any(pattern in name for pattern in only):
+                    continue
+                results[name] = _time(fn, repeat)
+                print(f"  {name:<26} {results[name]['median_s'] * 1000:9.2f} ms", file=sys.stderr)
+
+    return {"meta": _meta(counts, repeat), "results": results}
+
+
+def _meta(counts: dict, repeat: int) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "dataset": counts,
+        "repeat": repeat,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float, min_delta_s: float = 0.001) -> list[dict]:
+    rows = []
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            rows.append({"case": name, "min_s": result["min_s"], "baseline_s": None,
+                         "change": None, "regressed": False})
+            continue
+        change = result["min_s"] / base["min_s"] - 1 if base["min_s"] else 0.0
+        rows.append({
+            "case": name,
+            "min_s": result["min_s"],
+            "baseline_s": base["min_s"],
+            "change": round(change, 4),
+            "regressed": change > threshold and result["min_s"] - base["min_s"] >= min_delta_s,
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--brews", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="Run cases whose name contains any of these")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="Ignore slowdowns smaller than this many milliseconds")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before anything imports app.database.
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.setdefault("METRICS_ENABLED", "false")
+        report = run(args.brews, args.repeat, args.only)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {baseline_path}", file=sys.stderr)
+    elif baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+        if baseline.get("meta", {}).get("dataset") != report["meta"]["dataset"]:
+            print("warning: baseline was recorded with a different dataset size", file=sys.stderr)
+        report["comparison"] = {
+            "baseline": str(baseline_path),
+            "threshold": args.threshold,
+            "cases": compare(report, baseline, args.threshold, args.min_delta_ms / 1000),
+        }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+    regressions = [c for c in report.get("comparison", {}).get("cases", []) if c["regressed"]]
+    for case in regressions:
+        print(f"REGRESSION {case['case']}: {case['baseline_s'] * 1000:.2f} ms -> "
+              f"{case['min_s'] * 1000:.2f} ms ({case['change']:+.0%})", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Synthetic data for benchmarks: a brew history and grind photos.
+
+The brew history is shaped like a real user's: a handful of roasters and
+beans, methods weighted towards pour over, doses and ratios that depend on
+the method, two years of dates, and scores that peak near a per-bean ideal
+grind so the analytics have real structure to find. Everything is driven
+by a seeded RNG, so two runs with the same arguments produce the same data.
+"""
+
+import io
+import random
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from PIL import Image, ImageDraw
+from sqlalchemy.orm import Session
+
+from app.models import Brew, BrewTemplate, Rating
+from app.models.inventory import BeanInventory
+from app.services import (
+    bean_service, cache_service, feature_service, flavor_service, rollup_service, search_service,
+)
+
+ROASTERS = ("Onyx", "Counter Culture", "Sey", "Black & White", "Prodigal", "Passenger", "Dak", "Tim Wendelboe")
+ORIGINS = (
+    ("Ethiopia", "Washed"), ("Ethiopia", "Natural"), ("Kenya", "Washed"), ("Colombia", "Washed"),
+    ("Colombia", "Anaerobic"), ("Guatemala", "Washed"), ("Costa Rica", "Honey"), ("Brazil", "Natural"),
+    ("Rwanda", "Washed"), ("Panama", "Natural"),
+)
+VARIETIES = ("Geisha", "Heirloom", "SL28", "Caturra", "Bourbon", "Pink Bourbon", "Typica", "Catuai")
+FLAVOR_NOTES = (
+    "Blueberry", "Jasmine", "Chocolate", "Caramel", "Citrus", "Stone Fruit", "Honey",
+    "Black Tea", "Cherry", "Floral", "Brown Sugar", "Grapefruit", "Red Apple", "Nutty",
+)
+ROAST_LEVELS = ("Light", "Medium-Light", "Medium", "Medium-Dark")
+
+# method: (weight, dose grams, ratio, grind range, device, grinder)
+METHODS = {
+    "Pour Over": (0.40, 18.0, 16.0, (18, 30), "V60", "Comandante C40"),
+    "Espresso": (0.25, 18.0, 2.0, (4, 12), "Espresso Machine", "Niche Zero"),
+    "AeroPress": (0.15, 15.0, 14.0, (14, 22), "AeroPress", "1Zpresso JX-Pro"),
+    "Chemex": (0.10, 30.0, 16.5, (24, 34), "Chemex", "Baratza Encore"),
+    "French Press": (0.10, 30.0, 15.0, (30, 40), "French Press", "Baratza Encore"),
+}
+
+
+def _beans(rng: random.Random, count: int) -> list[dict]:
+    beans = []
+    for i in range(count):
+        origin, process = rng.choice(ORIGINS)
+        beans.append({
+            "bean_name": f"{origin} {rng.choice(VARIETIES)} {i + 1}",
+            "roaster": rng.choice(ROASTERS),
+            "bean_origin": origin,
+            "bean_process": process,
+            "roast_level": rng.choice(ROAST_LEVELS),
+            "flavor_notes_expected": ", ".join(rng.sample(FLAVOR_NOTES, 3)),
+            "ideal_offset": rng.uniform(-3, 3),
+            "quality": rng.gauss(0, 0.7),
+        })
+    return beans
+
+
+def populate(db: Session, brews: int = 1000, beans: int = 30, templates: int = 20, seed: int = 0) -> dict:
+    """Fill an empty database; returns the row counts written."""
+    rng = random.Random(seed)
+    bean_pool = _beans(rng, beans)
+    method_names = list(METHODS)
+    method_weights = [METHODS[m][0] for m in method_names]
+    today = date.today()
+    now = datetime.utcnow()
+
+    template_rows = []
+    for i in range(templates):
+        bean = rng.choice(bean_pool)
+        method = rng.choices(method_names, method_weights)[0]
+        _, dose, ratio, grind, device, grinder = METHODS[method]
+        template_rows.append(BrewTemplate(
+            name=f"{bean['bean_name']} {method} #{i + 1}",
+            roaster=bean["roaster"], bean_name=bean["bean_name"],
+            bean_origin=bean["bean_origin"], bean_process=bean["bean_process"],
+            roast_level=bean["roast_level"], flavor_notes_expected=bean["flavor_notes_expected"],
+            bean_amount_grams=dose, water_amount_ml=round(dose * ratio),
+            grind_setting=str(sum(grind) // 2), grinder=grinder,
+            brew_method=method, brew_device=device, water_temp_c=94.0, water_temp_f=201.2,
+            created_at=now, updated_at=now,
+        ))
+    db.add_all(template_rows)
+
+    db.add_all(
+        BeanInventory(
+            bean_name=bean["bean_name"], roaster=bean["roaster"],
+            initial_amount_grams=float(rng.choice((250, 340, 500, 1000))),
+            created_at=now, updated_at=now,
+        )
+        for bean in bean_pool
+    )
+
+    rated = 0
+    brew_rows = []
+    for i in range(brews):
+        bean = rng.choice(bean_pool)
+        method = rng.choices(method_names, method_weights)[0]
+        _, dose, ratio, (grind_lo, grind_hi), device, grinder = METHODS[method]
+        brew_day = today - timedelta(days=int(rng.triangular(0, 730, 0)))
+        dose = round(rng.gauss(dose, 1.0), 1)
+        temp_c = round(rng.gauss(93.5, 1.5), 1)
+        grind = rng.randint(grind_lo, grind_hi)
+        brew = Brew(
+            brew_date=brew_day,
+            roaster=bean["roaster"], bean_name=bean["bean_name"],
+            bean_origin=bean["bean_origin"], bean_process=bean["bean_process"],
+            roast_date=brew_day - timedelta(days=rng.randint(4, 40)),
+            roast_level=bean["roast_level"], flavor_notes_expected=bean["flavor_notes_expected"],
+            bean_amount_grams=dose, water_amount_ml=round(dose * rng.gauss(ratio, 0.6), 1),
+            grind_setting=str(grind), grinder=grinder,
+            bloom=method != "Espresso", bloom_time_seconds=rng.choice((30, 40, 45)),
+            water_temp_c=temp_c, water_temp_f=round(temp_c * 9 / 5 + 32, 1),
+            brew_method=method, brew_device=device,
+            brew_time_seconds=rng.randint(25, 35) if method == "Espresso" else rng.randint(150, 270),
+            notes=rng.choice((None, None, "Dialled finer", "Slight channeling", "Sweet cup")),
+            created_at=now, updated_at=now,
+        )
+        if rng.random() < 0.85:
+            ideal = (grind_lo + grind_hi) / 2 + bean["ideal_offset"]
+            score = 7.0 + bean["quality"] - 0.12 * (grind - ideal) ** 2 - 0.3 * abs(temp_c - 94)
+            score = min(10.0, max(1.0, round(rng.gauss(score, 0.6) * 2) / 2))
+            dims = {d: min(5.0, max(1.0, round(rng.gauss(3, 0.8), 1)))
+                    for d in ("bitterness", "acidity", "sweetness", "body", "aroma", "aftertaste")}
+            brew.rating = Rating(
+                overall_score=score,
+                flavor_notes_experienced=", ".join(rng.sample(FLAVOR_NOTES, 2)),
+                comments=rng.choice((None, "Great clarity", "A bit muddy", "Juicy")),
+                **dims,
+            )
+            rated += 1
+        brew_rows.append(brew)
+    db.add_all(brew_rows)
+    db.flush()
+
+    bean_service.link_all(db)
+    rollup_service.rebuild_rollups(db)
+    search_service.rebuild_index(db)
+    flavor_service.rebuild(db)
+    feature_service.rebuild(db)
+    cache_service.bump_data_version(db)
+    db.commit()
+    return {"brews": brews, "ratings": rated, "templates": templates, "inventory": beans}
+
+
+def grind_image(particles: int, size: tuple[int, int] = (1200, 900), seed: int = 0) -> bytes:
+    """PNG of dark grounds on a light background with log-normal particle sizes."""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    img = Image.new("RGB", size, (232, 230, 224))
+    draw = ImageDraw.Draw(img)
+    radii = np.clip(rng.lognormal(mean=1.2, sigma=0.5, size=particles), 1, 20)
+    xs = rng.uniform(25, width - 25, size=particles)
+    ys = rng.uniform(25, height - 25, size=particles)
+    for x, y, r in zip(xs, ys, radii):
+        squash = rng.uniform(0.6, 1.0)
+        shade = int(rng.uniform(20, 70))
+        draw.ellipse((x - r, y - r * squash, x + r, y + r * squash), fill=(shade + 20, shade, shade // 2))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
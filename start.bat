@@ -10,4 +10,5 @@ echo  Close this window to stop the server
 echo ========================================
 echo.
 cd /d "%~dp0"
+python -m app.bootstrap
 python -m uvicorn app.main:app --reload
@@ -1,11 +1,18 @@
+import os
+
+# Let the app lifespan migrate its own database instead of requiring
+# `python -m app.bootstrap` before the test run.
+os.environ.setdefault("AUTO_MIGRATE", "true")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.auth import serializer, COOKIE_NAME
-from app.database import Base, get_db
+from app.database import Base, get_db, get_read_db
 from app.main import app
+from app.services import autocomplete_service
 from app.services.lookup_service import seed_lookups
 from app.services.recommendation_service import seed_rules
 
@@ -20,6 +27,7 @@ def setup_db():
     seed_rules(db)
     seed_lookups(db)
     db.close()
+    autocomplete_service.invalidate()
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -43,6 +51,7 @@ def client():
             session.close()
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     with TestClient(app) as c:
         # Set auth cookie so tests bypass login
         token = serializer.dumps("authenticated")
@@ -1,3 +1,6 @@
+from app.models.feature import BrewFeature
+
+
 def _create_rated_brew(client, roaster="Onyx", method="Pour Over", score=7.5):
     brew = client.post("/api/v1/brews/", json={
         "brew_date": "2025-01-15",
@@ -49,3 +52,136 @@ def test_distributions(client):
     resp = client.get("/api/v1/analytics/distributions?field=brew_method")
     data = resp.json()
     assert len(data) == 2
+
+
+def test_correlation_summary(client):
+    for score in (6.0, 7.0, 8.0):
+        brew = client.post("/api/v1/brews/", json={
+            "brew_date": "2025-01-15",
+            "roaster": "Onyx",
+            "bean_name": "Test",
+            "bean_amount_grams": 18.0,
+            "water_amount_ml": 300.0,
+            "brew_method": "Pour Over",
+            "water_temp_f": 190.0 + score * 2,
+        })
+        client.post(f"/api/v1/brews/{brew.json()['id']}/rating/", json={"overall_score": score})
+    resp = client.get("/api/v1/analytics/correlations?x=water_temp_f&y=overall_score&summary=true&max_points=2")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["n"] == 3
+    assert data["pearson"] == 1.0
+    assert data["spearman"] == 1.0
+    assert data["trend"]["slope"] == 0.5
+    assert sum(b["count"] for b in data["bins"]) == 3
+    assert len(data["points"]) == 2
+    assert data["sampled"] is True
+
+
+def test_correlation_matrix(client):
+    _create_rated_brew(client, score=6.0)
+    _create_rated_brew(client, score=8.0)
+    client.post("/api/v1/brews/", json={
+        "brew_date": "2025-01-16",
+        "roaster": "Onyx",
+        "bean_name": "Unrated",
+        "bean_amount_grams": 20.0,
+        "water_amount_ml": 320.0,
+        "brew_method": "Pour Over",
+    })
+    resp = client.get("/api/v1/analytics/correlation-matrix")
+    assert resp.status_code == 200
+    data = resp.json()
+    fields = data["fields"]
+    assert "days_since_roast" in fields and "overall_score" in fields
+    dose, water, score = (fields.index(f) for f in ("bean_amount_grams", "water_amount_ml", "overall_score"))
+    assert data["counts"][dose][water] == 3
+    assert data["counts"][dose][score] == 2
+    assert data["matrix"][dose][water] == 1.0
+    # Dose is constant across the rated brews, so that pair has no correlation
+    assert data["matrix"][dose][score] is None
+
+
+def test_trends_follow_rating_writes(client):
+    first = _create_rated_brew(client, score=6.0)
+    _create_rated_brew(client, score=8.0)
+    data = client.get("/api/v1/analytics/trends?group_by=month").json()
+    assert data == [{
+        "period": "2025-01", "avg_score": 7.0, "count": 2, "rolling_avg": 7.0,
+        "ci_low": data[0]["ci_low"], "ci_high": data[0]["ci_high"],
+    }]
+    assert data[0]["ci_low"] < 7.0 < data[0]["ci_high"]
+
+    client.put(f"/api/v1/brews/{first}/rating/", json={"overall_score": 9.0})
+    assert client.get("/api/v1/analytics/trends").json()[0]["avg_score"] == 8.5
+
+    client.put(f"/api/v1/brews/{first}", json={"brew_date": "2025-02-03"})
+    data = client.get("/api/v1/analytics/trends?group_by=month&window=2").json()
+    assert [d["period"] for d in data] == ["2025-01", "2025-02"]
+    assert data[1]["rolling_avg"] == 8.5
+
+    client.delete(f"/api/v1/brews/{first}")
+    data = client.get("/api/v1/analytics/trends?group_by=week").json()
+    assert data == [{
+        "period": "2025-03", "avg_score": 8.0, "count": 1, "rolling_avg": 8.0,
+        "ci_low": None, "ci_high": None,
+    }]
+
+
+def test_summary_etag_revalidation(client):
+    _create_rated_brew(client, score=8.0)
+    resp = client.get("/api/v1/analytics/summary")
+    etag = resp.headers["etag"]
+    assert resp.json()["total_brews"] == 1
+
+    resp = client.get("/api/v1/analytics/summary", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+    _create_rated_brew(client, score=6.0)
+    resp = client.get("/api/v1/analytics/summary", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+    assert resp.json()["total_brews"] == 2
+
+
+def test_brew_features_follow_writes(client, db):
+    brew_id = client.post("/api/v1/brews/", json={
+        "brew_date": "2025-01-15", "roast_date": "2025-01-01", "roaster": "Onyx", "bean_name": "Test",
+        "bean_amount_grams": 20.0, "water_amount_ml": 320.0, "brew_method": "Pour Over",
+        "grind_setting": "1.2.5", "water_temp_c": 93.0,
+        "bloom": True, "bloom_water_ml": 40.0, "first_pour_grams": 140, "final_pour_grams": 140,
+    }).json()["id"]
+    features = db.get(BrewFeature, brew_id)
+    assert (features.brew_ratio, features.grind_setting, features.days_since_roast) == (16.0, 125, 14)
+    assert (features.water_temp_f, features.pour_count, features.pour_total_grams) == (199.4, 3, 320.0)
+    assert features.overall_score is None
+
+    client.post(f"/api/v1/brews/{brew_id}/rating/", json={"overall_score": 8.0})
+    data = client.get("/api/v1/analytics/correlations?x=brew_ratio&y=overall_score").json()
+    assert data == [{"x": 16.0, "y": 8.0}]
+
+    client.put(f"/api/v1/brews/{brew_id}", json={"water_amount_ml": 300.0})
+    trends = client.get("/api/v1/analytics/trends?metric=brew_ratio").json()
+    assert [(t["period"], t["avg_score"]) for t in trends] == [("2025-01-15", 15.0)]
+
+    client.delete(f"/api/v1/brews/{brew_id}")
+    db.expire_all()
+    assert db.get(BrewFeature, brew_id) is None
+
+
+def test_overlong_grind_setting_is_not_a_feature(client, db):
+    resp = client.post("/api/v1/brews/", json={
+        "brew_date": "2025-01-15", "roaster": "Onyx", "bean_name": "Test",
+        "bean_amount_grams": 18.0, "water_amount_ml": 300.0, "brew_method": "Pour Over",
+        "grind_setting": "9" * 20,
+    })
+    assert resp.status_code == 201
+    assert db.get(BrewFeature, resp.json()["id"]).grind_setting is None
+
+
+def test_trends_bean_filter_matches_for_rollup_and_feature_metrics(client):
+    _create_rated_brew(client, score=8.0)
+    _create_rated_brew(client, score=6.0)
+    for metric in ("overall_score", "brew_ratio"):
+        trends = client.get(f"/api/v1/analytics/trends?metric={metric}&bean_name=  test ").json()
+        assert [t["count"] for t in trends] == [2], metric
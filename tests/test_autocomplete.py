@@ -0,0 +1,88 @@
+import time
+from datetime import date, datetime, timedelta
+
+from app.models.brew import Brew
+from app.services import autocomplete_service, cache_service
+
+
+def _brew(client, **fields):
+    return client.post("/api/v1/brews/", json={
+        "brew_date": "2025-01-15", "roaster": "Onyx Coffee Lab", "bean_name": "Geometry",
+        "bean_amount_grams": 18.0, "water_amount_ml": 300.0, "brew_method": "Pour Over",
+        **fields,
+    }).json()["id"]
+
+
+def _wait_for_rebuild():
+    deadline = time.monotonic() + 5
+    while autocomplete_service._rebuilding and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _suggest(client, field, q="", **params):
+    resp = client.get("/api/v1/lookups/suggestions", params={"field": field, "q": q, **params})
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def test_suggestions_rank_and_follow_writes(client):
+    _brew(client)
+    _brew(client)
+    _brew(client, roaster="Sey", bean_origin="Ethiopia")
+    _brew(client, roaster="Black & White", bean_name="Onyx Blend")
+
+    # Most used first when nothing is typed; word prefixes from one character.
+    assert _suggest(client, "roaster") == ["Onyx Coffee Lab", "Black & White", "Sey"]
+    assert _suggest(client, "roaster", "w") == ["Black & White"]
+    assert _suggest(client, "roaster", "LAB") == ["Onyx Coffee Lab"]
+    assert _suggest(client, "roaster", "ffee l") == ["Onyx Coffee Lab"]
+    assert _suggest(client, "bean_origin", "eth") == ["Ethiopia"]
+    assert _suggest(client, "roaster", "", limit=1) == ["Onyx Coffee Lab"]
+
+    # A value written after the index was built shows up on the next request.
+    _brew(client, roaster="Onyx Labs")
+    assert _suggest(client, "roaster", "onyx") == ["Onyx Coffee Lab", "Onyx Labs"]
+
+    assert client.get("/api/v1/lookups/suggestions", params={"field": "notes"}).status_code == 422
+
+
+def test_list_filter_resolves_through_index(client, db):
+    onyx = _brew(client)
+    assert [b["id"] for b in client.get("/api/v1/brews/", params={"roaster": "coffee"}).json()] == [onyx]
+
+    sey = _brew(client, roaster="Sey", brew_method="AeroPress")
+    assert [b["id"] for b in client.get("/api/v1/brews/", params={"roaster": "SEY"}).json()] == [sey]
+    assert [b["id"] for b in client.get("/api/v1/brews/", params={"brew_method": "press"}).json()] == [sey]
+    assert client.get("/api/v1/brews/", params={"roaster": "durian"}).json() == []
+
+    # Past MAX_FILTER_VALUES matches the filter stays an ILIKE.
+    _wait_for_rebuild()
+    values = autocomplete_service.matching_values(db, "roaster", "o")
+    assert values == ["Onyx Coffee Lab"]
+    db.add_all(
+        Brew(brew_date=date(2025, 1, 1), roaster=f"Roaster {i}", bean_name="X",
+             bean_amount_grams=15, water_amount_ml=250, brew_method="V60")
+        for i in range(autocomplete_service.MAX_FILTER_VALUES + 1)
+    )
+    db.commit()
+    autocomplete_service.invalidate()
+    assert autocomplete_service.matching_values(db, "roaster", "roaster") is None
+    assert len(client.get("/api/v1/brews/", params={"roaster": "roaster 12", "limit": 100}).json()) == 11
+
+
+def test_list_filter_sees_late_commits(client, db):
+    _brew(client)
+    assert autocomplete_service.matching_values(db, "roaster", "onyx") == ["Onyx Coffee Lab"]
+
+    # Committed long after its updated_at was set, so a catch-up misses it.
+    _brew(client, roaster="Sey")
+    db.add(Brew(brew_date=date(2025, 1, 2), roaster="Onyx Late", bean_name="X", bean_amount_grams=15,
+                water_amount_ml=250, brew_method="V60", updated_at=datetime.utcnow() - timedelta(hours=1)))
+    cache_service.bump_data_version(db)
+    db.commit()
+    assert autocomplete_service.matching_values(db, "roaster", "onyx") is None
+    assert len(client.get("/api/v1/brews/", params={"roaster": "onyx"}).json()) == 2
+
+    # The early rebuild makes the index exact again.
+    _wait_for_rebuild()
+    assert sorted(autocomplete_service.matching_values(db, "roaster", "onyx")) == ["Onyx Coffee Lab", "Onyx Late"]
@@ -0,0 +1,124 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.bootstrap import migrate
+from app.config import settings
+from app.models import Brew, Grinder, Rating
+from app.services import backup_service, brew_service, lookup_service, sync_service
+from app.schemas.brew import BrewCreate
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "backup_dir", str(tmp_path / "backups"))
+    monkeypatch.setattr(sync_service, "CURSOR_OVERLAP", sync_service.CURSOR_OVERLAP * 0)
+    engine = create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    migrate(engine)
+    yield engine
+    engine.dispose()
+
+
+def _add_brew(engine, bean: str, score: float | None = None) -> int:
+    with Session(engine) as db:
+        brew = brew_service.create_brew(db, BrewCreate(
+            brew_date="2025-02-01", roaster="Onyx", bean_name=bean,
+            bean_amount_grams=18.0, water_amount_ml=300.0, brew_method="Pour Over",
+        ))
+        if score is not None:
+            db.add(Rating(brew_id=brew.id, overall_score=score))
+            db.commit()
+        return brew.id
+
+
+def _beans(engine) -> dict[str, float | None]:
+    with Session(engine) as db:
+        rows = db.execute(
+            select(Brew.bean_name, Rating.overall_score).outerjoin(Rating, Rating.brew_id == Brew.id)
+        )
+        return dict(rows.all())
+
+
+def test_full_and_incremental_restore(source, tmp_path):
+    _add_brew(source, "Kept", 7.0)
+    doomed = _add_brew(source, "Doomed")
+    full = backup_service.create_full(source)
+    assert full["format"] == "sqlite" and full["kind"] == "full"
+    # Only the compressed snapshot and its manifest are left behind.
+    assert sorted(p.name for p in backup_service.backup_dir().iterdir()) == [
+        f"{full['name']}.json", full["file"],
+    ]
+
+    with Session(source) as db:
+        brew_service.delete_brew(db, doomed)
+    _add_brew(source, "Later", 8.5)
+    with Session(source) as db:
+        lookup_service.add_grinder(db, "Lagom P64")
+    inc = backup_service.create_incremental(source)
+    assert inc["parent"] == full["name"] and inc["rows"]["brews"] == 1
+
+    _add_brew(source, "After the backup")
+    backup_service.restore(full["name"], source)
+    assert _beans(source) == {"Kept": 7.0, "Doomed": None}
+
+    target = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    assert backup_service.restore(inc["name"], target) == [full["name"], inc["name"]]
+    assert _beans(target) == {"Kept": 7.0, "Later": 8.5}
+    with Session(target) as db:
+        assert db.query(Grinder).filter_by(name="Lagom P64").count() == 1
+    target.dispose()
+
+
+
+def test_restore_follows_a_chain_of_incrementals(source, tmp_path):
+    full = backup_service.create_full(source)
+    _add_brew(source, "First", 6.0)
+    first = backup_service.create_incremental(source)
+    _add_brew(source, "Second", 7.0)
+    second = backup_service.create_incremental(source)
+    assert first["name"].startswith("incremental-") and second["parent"] == first["name"]
+    assert backup_service.get_manifest(first["name"]) == first
+
+    target = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    assert backup_service.restore(second["name"], target) == [full["name"], first["name"], second["name"]]
+    assert _beans(target) == {"First": 6.0, "Second": 7.0}
+    target.dispose()
+
+
+def test_failed_background_backup_is_logged(source, caplog):
+    assert backup_service.start_backup("incremental", source)  # no full snapshot to build on
+    with backup_service._running:
+        pass  # released once the worker is done
+    assert "Incremental backup failed" in caplog.text
+
+def test_logical_snapshot_roundtrip(source, tmp_path, monkeypatch):
+    _add_brew(source, "Logical", 6.5)
+    monkeypatch.setattr(backup_service, "_sqlite_path", lambda engine: None)
+    full = backup_service.create_full(source)
+    assert full["format"] == "logical" and full["file"].endswith(".jsonl.gz")
+
+    target = create_engine(f"sqlite:///{tmp_path / 'target.db'}")
+    with pytest.raises(backup_service.BackupError):
+        backup_service.restore(full["name"], target)  # not migrated yet
+    migrate(target)
+    backup_service.restore(full["name"], target)
+    assert _beans(target) == {"Logical": 6.5}
+    target.dispose()
+
+
+def test_corrupt_snapshot_is_rejected(source):
+    _add_brew(source, "Bean")
+    full = backup_service.create_full(source)
+    path = backup_service.backup_dir() / full["file"]
+    path.write_bytes(path.read_bytes()[:-8] + b"corrupt!")
+    with pytest.raises(backup_service.BackupError, match="Checksum"):
+        backup_service.restore(full["name"], source)
+
+
+def test_prune_keeps_newest_chains(source):
+    first = backup_service.create_full(source)
+    backup_service.create_incremental(source)
+    second = backup_service.create_full(source)
+    assert len(backup_service.prune(keep=1)) == 2
+    assert [m["name"] for m in backup_service.list_backups()] == [second["name"]]
+    assert not (backup_service.backup_dir() / first["file"]).exists()
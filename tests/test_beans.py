@@ -0,0 +1,53 @@
+from app.models.bean import Bean
+
+
+def _brew(client, **fields):
+    return client.post("/api/v1/brews/", json={
+        "brew_date": "2025-01-15", "roaster": "Onyx Coffee Lab", "bean_name": "Geometry",
+        "bean_amount_grams": 20.0, "water_amount_ml": 300.0, "brew_method": "Pour Over",
+        **fields,
+    }).json()
+
+
+def test_spelling_variants_share_one_bean(client, db):
+    first = _brew(client, bean_origin="Ethiopia")
+    second = _brew(client, roaster=" onyx  coffee LAB", bean_name="geometry")
+    assert (second["roaster"], second["bean_name"]) == ("Onyx Coffee Lab", "Geometry")
+    _brew(client, roaster="Sey", bean_name="Geometry")
+    client.post("/api/v1/brews/bulk", json=[{
+        "brew_date": "2025-01-16", "roaster": "ONYX COFFEE LAB", "bean_name": "Geometry ",
+        "bean_amount_grams": 10.0, "water_amount_ml": 160.0, "brew_method": "Espresso",
+    }])
+
+    beans = db.query(Bean).order_by(Bean.id).all()
+    assert [(b.roaster, b.name, b.origin) for b in beans] == [
+        ("Onyx Coffee Lab", "Geometry", "Ethiopia"), ("Sey", "Geometry", None),
+    ]
+
+    # Inventory and brews meet on the bean id, whatever the spelling.
+    assert client.post("/api/v1/shelf", json={"bean_name": "GEOMETRY", "roaster": "onyx coffee lab",
+                                               "initial_amount_grams": 250}).status_code == 200
+    shelf = client.get("/api/v1/shelf").json()
+    assert [(r["roaster"], r["used_grams"], r["remaining_grams"], r["tracked"]) for r in shelf] == [
+        ("Onyx Coffee Lab", 50.0, 200.0, True), ("Sey", 20.0, None, False),
+    ]
+
+    summary = client.get("/api/v1/analytics/summary").json()
+    assert (summary["top_roaster"], summary["top_bean"]) == ("Onyx Coffee Lab", "Geometry")
+
+    # Changing a brew's roaster moves it to the other bean.
+    client.put(f"/api/v1/brews/{first['id']}", json={"roaster": "sey"})
+    shelf = client.get("/api/v1/shelf").json()
+    assert [(r["roaster"], r["used_grams"]) for r in shelf] == [("Onyx Coffee Lab", 30.0), ("Sey", 40.0)]
+    assert client.get("/api/v1/analytics/filter-options").json()["bean_names"] == ["Geometry"]
+
+
+def test_blank_bean_names_stay_on_the_shelf_by_roaster(client):
+    for roaster, grams in (("Sey", 100), ("Onyx", 250)):
+        assert client.post("/api/v1/shelf", json={
+            "bean_name": " ", "roaster": roaster, "initial_amount_grams": grams,
+        }).status_code == 200
+    shelf = client.get("/api/v1/shelf").json()
+    assert sorted((r["roaster"], r["initial_grams"], r["tracked"]) for r in shelf) == [
+        ("Onyx", 250, True), ("Sey", 100, True),
+    ]
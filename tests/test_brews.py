@@ -83,3 +83,106 @@ def test_filter_brews(client):
     assert len(resp.json()) == 1
     resp = client.get("/api/v1/brews/?brew_method=Espresso")
     assert len(resp.json()) == 1
+
+
+def _bulk_item(**overrides):
+    item = {
+        "brew_date": "2025-02-01",
+        "roaster": "Sey",
+        "bean_name": "Bulk",
+        "bean_amount_grams": 18.0,
+        "water_amount_ml": 36.0,
+        "brew_method": "Espresso",
+        "water_temp_c": 93.0,
+    }
+    item.update(overrides)
+    return item
+
+
+def test_bulk_create_brews_with_ratings(client):
+    items = [_bulk_item(grind_setting=str(i)) for i in range(5)]
+    items[1]["rating"] = {"overall_score": 8.0, "acidity": 3.0}
+    resp = client.post("/api/v1/brews/bulk", json=items)
+    assert resp.status_code == 201
+    data = resp.json()
+    assert len(data["ids"]) == 5 and data["errors"] == []
+    assert [c["index"] for c in data["created"]] == [0, 1, 2, 3, 4]
+
+    brew = client.get(f"/api/v1/brews/{data['ids'][1]}").json()
+    assert brew["grind_setting"] == "1"
+    assert brew["water_temp_f"] == 199.4
+    assert brew["rating"]["overall_score"] == 8.0
+    assert client.get("/api/v1/analytics/summary").json()["total_brews"] == 5
+
+
+def test_bulk_create_reports_partial_failures(client):
+    items = [
+        _bulk_item(),
+        _bulk_item(bean_amount_grams="lots"),
+        _bulk_item(template_id=999),
+        _bulk_item(rating={"overall_score": 11}),
+    ]
+    resp = client.post("/api/v1/brews/bulk", json=items)
+    assert resp.status_code == 207
+    data = resp.json()
+    assert [c["index"] for c in data["created"]] == [0]
+    assert [e["index"] for e in data["errors"]] == [1, 2, 3]
+    assert data["errors"][1]["errors"][0]["loc"] == ["template_id"]
+
+
+def test_bulk_create_atomic_rejects_batch(client):
+    resp = client.post("/api/v1/brews/bulk?atomic=true", json=[_bulk_item(), _bulk_item(roaster=None)])
+    assert resp.status_code == 422
+    assert resp.json()["ids"] == []
+    assert client.get("/api/v1/brews/").json() == []
+
+
+def test_list_brews_projection(client):
+    rated = client.post("/api/v1/brews/", json={
+        "brew_date": "2025-01-16", "roaster": "Sey", "bean_name": "Rated",
+        "bean_amount_grams": 15.0, "water_amount_ml": 250.0, "brew_method": "AeroPress",
+        "notes": "not part of the list payload",
+    }).json()["id"]
+    client.post(f"/api/v1/brews/{rated}/rating/", json={"overall_score": 8.5})
+    client.post("/api/v1/brews/", json={
+        "brew_date": "2025-01-15", "roaster": "Onyx", "bean_name": "Unrated",
+        "bean_amount_grams": 18.0, "water_amount_ml": 300.0, "brew_method": "Pour Over",
+    })
+
+    resp = client.get("/api/v1/brews/")
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.json() == [
+        {"id": rated, "brew_date": "2025-01-16", "roaster": "Sey", "bean_name": "Rated",
+         "brew_method": "AeroPress", "overall_score": 8.5},
+        {"id": rated + 1, "brew_date": "2025-01-15", "roaster": "Onyx", "bean_name": "Unrated",
+         "brew_method": "Pour Over", "overall_score": None},
+    ]
+
+    page = client.get("/brews", headers={"HX-Request": "true"}).text
+    assert "8.5/10" in page and "15.0g / 250.0ml" in page
+
+
+def test_export_csv(client):
+    for i, (roaster, score) in enumerate((("Onyx", 8.0), ("Sey, Brooklyn", None), ("Onyx", 6.5))):
+        brew_id = client.post("/api/v1/brews/", json={
+            "brew_date": f"2025-01-1{i}", "roaster": roaster, "bean_name": f"Bean {i}",
+            "bean_amount_grams": 18.0, "water_amount_ml": 300.0, "brew_method": "Pour Over",
+        }).json()["id"]
+        if score:
+            client.post(f"/api/v1/brews/{brew_id}/rating/", json={"overall_score": score})
+
+    resp = client.get("/api/v1/brews/export.csv")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/csv")
+    lines = resp.text.splitlines()
+    assert lines[0].startswith("id,brew_date,roaster,")
+    assert "overall_score" in lines[0] and len(lines) == 4
+    assert '"Sey, Brooklyn"' in resp.text
+
+    resp = client.get("/api/v1/brews/export.csv",
+                      params={"columns": "brew_date,roaster,overall_score", "roaster": "onyx"})
+    assert resp.text.splitlines() == [
+        "brew_date,roaster,overall_score", "2025-01-12,Onyx,6.5", "2025-01-10,Onyx,8.0",
+    ]
+
+    assert client.get("/api/v1/brews/export.csv?columns=roaster,nope").status_code == 400
@@ -0,0 +1,18 @@
+from sqlalchemy import text
+
+from app.database import create_app_engine, normalize_url
+
+
+def test_normalize_postgres_scheme():
+    assert normalize_url("postgres://u:p@host/db") == "postgresql://u:p@host/db"
+    assert normalize_url("sqlite:///./coffee.db") == "sqlite:///./coffee.db"
+
+
+def test_sqlite_connections_get_wal_profile(tmp_path):
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        # synchronous=NORMAL is reported as 1
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+    engine.dispose()
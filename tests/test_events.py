@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+from app.config import settings
+from app.events import RESYNC, Broadcaster, EventBridge, replay, stream
+from app.models.change_event import ChangeEvent
+from tests.conftest import TestSession, engine
+
+
+def _brew(client, name="Bean"):
+    return client.post("/api/v1/brews/", json={
+        "brew_date": "2025-01-15", "roaster": "Onyx", "bean_name": name,
+        "bean_amount_grams": 18.0, "water_amount_ml": 300.0, "brew_method": "Pour Over",
+    }).json()["id"]
+
+
+def _frames(messages):
+    """(kind, payload) of each SSE frame."""
+    out = []
+    for _, frame in messages:
+        fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+        out.append((fields["event"], json.loads(fields["data"])))
+    return out
+
+
+def test_write_paths_publish_deltas(client, db):
+    brew_id = _brew(client)
+    client.post(f"/api/v1/brews/{brew_id}/rating/", json={"overall_score": 6.0})
+    client.put(f"/api/v1/brews/{brew_id}/rating/", json={"overall_score": 8.0})
+    client.put(f"/api/v1/brews/{brew_id}", json={"roaster": "Sey"})
+    client.delete(f"/api/v1/brews/{brew_id}")
+
+    events = [(e.kind, json.loads(e.payload)) for e in db.query(ChangeEvent).order_by(ChangeEvent.id)]
+    assert [kind for kind, _ in events] == [
+        "brew.created", "rating.saved", "rating.saved", "brew.updated", "brew.deleted",
+    ]
+    assert events[0][1]["roaster"] == "Onyx"
+    assert events[1][1]["previous"] is None
+    assert events[2][1]["previous"]["overall_score"] == 6.0
+    assert events[2][1]["rating"]["overall_score"] == 8.0
+    assert (events[3][1]["before"]["roaster"], events[3][1]["after"]["roaster"]) == ("Onyx", "Sey")
+    assert events[4][1]["rating"]["overall_score"] == 8.0
+
+
+def test_bridge_fans_out_and_replays(client, db):
+    bridge = EventBridge(Broadcaster(), TestSession, engine)
+    assert bridge.poll_once() == []  # starts at the current end of the outbox
+
+    first = _brew(client, "First")
+    _brew(client, "Second")
+    messages = bridge.poll_once()
+    assert [p["bean_name"] for _, p in _frames(messages)] == ["First", "Second"]
+    assert bridge.poll_once() == []
+
+    # A reconnecting client gets what came after its Last-Event-ID.
+    assert replay(db, messages[0][0]) == messages[1:]
+    assert replay(db, messages[-1][0]) == []
+    assert replay(db, messages[-1][0] + 10) == [RESYNC]
+
+    # Events pruned from the outbox can no longer be replayed.
+    db.query(ChangeEvent).filter(ChangeEvent.id <= messages[0][0]).delete()
+    db.commit()
+    assert replay(db, messages[0][0] - 1) == [RESYNC]
+
+    # The outbox going backwards (a restore) resyncs every client.
+    db.query(ChangeEvent).delete()
+    db.commit()
+    assert bridge.poll_once() == [RESYNC]
+    client.delete(f"/api/v1/brews/{first}")
+    assert [kind for kind, _ in _frames(bridge.poll_once())] == ["brew.deleted"]
+
+
+
+def test_bridge_picks_up_events_that_commit_out_of_id_order(db, monkeypatch):
+    bridge = EventBridge(Broadcaster(), TestSession, engine)
+    bridge.poll_once()
+    start = bridge.last_id
+    # Ids are taken at insert but seen at commit: start + 1 commits last.
+    db.add(ChangeEvent(id=start + 2, kind="data.changed", payload="{}"))
+    db.commit()
+    assert [m[0] for m in bridge.poll_once()] == [start + 2]
+    db.add(ChangeEvent(id=start + 1, kind="data.changed", payload="{}"))
+    db.commit()
+    assert [m[0] for m in bridge.poll_once()] == [start + 1]
+    assert bridge.poll_once() == [] and bridge.gaps == {}
+
+    # An id that never commits (a rollback) is given up on.
+    monkeypatch.setattr(settings, "event_gap_seconds", 0)
+    db.add(ChangeEvent(id=start + 4, kind="data.changed", payload="{}"))
+    db.commit()
+    assert [m[0] for m in bridge.poll_once()] == [start + 4]
+    assert bridge.gaps == {}
+
+def test_stream_skips_backlog_duplicates_and_slow_clients_resync():
+    async def run():
+        broadcaster = Broadcaster(queue_size=2)
+        queue = broadcaster.subscribe()
+        backlog = [(1, b"one"), (2, b"two")]
+        broadcaster.publish((2, b"two"))
+        broadcaster.publish((3, b"three"))
+        frames = stream(queue, backlog)
+        received = [await frames.__anext__() for _ in range(4)]
+        assert received == [b"retry: 3000\n\n", b"one", b"two", b"three"]
+
+        for i in range(4, 7):
+            broadcaster.publish((i, b"late"))
+        assert queue.qsize() == 1 and queue.get_nowait() == RESYNC
+        broadcaster.unsubscribe(queue)
+        assert len(broadcaster) == 0
+
+    asyncio.run(run())
@@ -0,0 +1,69 @@
+from app.models.flavor import BrewExpectedNote, BrewExperiencedNote
+from app.services import flavor_service
+
+
+def _rated_brew(client, roaster, expected, experienced, score):
+    brew_id = client.post("/api/v1/brews/", json={
+        "brew_date": "2025-01-15", "roaster": roaster, "bean_name": "Test",
+        "bean_amount_grams": 18.0, "water_amount_ml": 300.0, "brew_method": "Pour Over",
+        "flavor_notes_expected": expected,
+    }).json()["id"]
+    client.post(f"/api/v1/brews/{brew_id}/rating/", json={
+        "overall_score": score, "flavor_notes_experienced": experienced,
+    })
+    return brew_id
+
+
+def test_notes_are_linked_and_analysed(client, db):
+    first = _rated_brew(client, "Onyx", "Blueberry, Jasmine", "jasmine, Lemon", 9.0)
+    _rated_brew(client, "Onyx", "Blueberry", "Blueberry", 8.5)
+    _rated_brew(client, "Sey", "Chocolate, Jasmine", "Caramel", 6.0)
+
+    assert db.query(BrewExpectedNote).filter_by(brew_id=first).count() == 2
+    assert db.query(BrewExperiencedNote).count() == 4  # "Lemon" and "Caramel" were added as notes
+
+    predictors = client.get(
+        "/api/v1/analytics/flavor-notes/predictors", params={"min_brews": 1, "kind": "expected"}
+    ).json()
+    assert predictors["base_rate"] == round(2 / 3, 4)
+    by_note = {n["note"]: n for n in predictors["notes"]}
+    assert (by_note["Blueberry"]["brews"], by_note["Blueberry"]["high_rate"]) == (2, 1.0)
+    assert by_note["Chocolate"]["high_scoring"] == 0
+    assert by_note["Jasmine"]["avg_score"] == 7.5
+
+    hit_rates = client.get("/api/v1/analytics/flavor-notes/hit-rates").json()
+    assert [(r["roaster"], r["expected_notes"], r["tasted_notes"], r["hit_rate"]) for r in hit_rates] == [
+        ("Onyx", 3, 2, 66.7), ("Sey", 2, 0, 0.0),
+    ]
+
+    # Editing the expected notes re-links them; deleting the brew drops them.
+    client.put(f"/api/v1/brews/{first}", json={"flavor_notes_expected": "Lemon"})
+    assert client.get("/api/v1/analytics/flavor-notes/hit-rates").json()[0]["hit_rate"] == 100.0
+    client.delete(f"/api/v1/brews/{first}")
+    assert db.query(BrewExpectedNote).filter_by(brew_id=first).count() == 0
+
+
+def test_ensure_notes_backfills_empty_tables(client, db):
+    brew_id = _rated_brew(client, "Onyx", "Plum, Cocoa", "plum", 7.0)
+    db.query(BrewExpectedNote).delete()
+    db.query(BrewExperiencedNote).delete()
+    db.commit()
+
+    flavor_service.ensure_notes(db)
+    assert db.query(BrewExpectedNote).filter_by(brew_id=brew_id).count() == 2
+    assert db.query(BrewExperiencedNote).filter_by(brew_id=brew_id).count() == 1
+
+
+def test_new_notes_invalidate_lookups_after_commit(db, monkeypatch):
+    calls = []
+    monkeypatch.setattr(flavor_service.lookup_service, "invalidate_lookups", lambda: calls.append(1))
+
+    flavor_service.note_ids(db, ["Bergamot"])
+    assert calls == []
+    db.rollback()
+    db.commit()
+    assert calls == []
+
+    flavor_service.note_ids(db, ["Bergamot"])
+    db.commit()
+    assert calls == [1]
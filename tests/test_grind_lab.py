@@ -0,0 +1,77 @@
+import io
+import tracemalloc
+
+from PIL import Image, ImageDraw
+
+from app.config import settings
+from app.services.grind_analysis_service import analyze_image
+
+
+def _grind_image() -> bytes:
+    img = Image.new("RGB", (120, 90), (235, 235, 230))
+    draw = ImageDraw.Draw(img)
+    for i in range(12):
+        x, y = 10 + (i % 6) * 18, 15 + (i // 6) * 35
+        draw.ellipse((x, y, x + 4 + i % 4, y + 4 + i % 3), fill=(40, 25, 15))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_analyze_image_reports_stages():
+    result = analyze_image(_grind_image())
+    assert result.particle_count == 12
+    names = [s.name for s in result.stages]
+    for name in ("decode", "threshold", "clusters", "cluster_image",
+                 "threshold_image.overlay", "threshold_image.jpeg", "cluster_image.base64"):
+        assert name in names
+    assert all(s.seconds >= 0 and s.memory_delta_bytes is None for s in result.stages)
+
+
+def test_analyze_image_traces_memory():
+    result = analyze_image(_grind_image(), trace_memory=True)
+    decode = next(s for s in result.stages if s.name == "decode")
+    assert decode.memory_peak_bytes > 0
+
+
+def test_untraced_analysis_leaves_tracemalloc_alone():
+    tracemalloc.start()
+    try:
+        buffer = bytearray(5_000_000)
+        del buffer
+        peak = tracemalloc.get_traced_memory()[1]
+        result = analyze_image(_grind_image())
+        assert tracemalloc.get_traced_memory()[1] >= peak
+        assert all(s.memory_peak_bytes is None for s in result.stages)
+    finally:
+        tracemalloc.stop()
+
+
+def test_profile_requires_opt_in(client):
+    resp = client.post(
+        "/api/v1/grind-lab/analyze",
+        files={"image": ("g.png", _grind_image(), "image/png")},
+        data={"profile": "true"},
+    )
+    assert resp.status_code == 400
+
+
+def test_profiled_analysis_is_downloadable(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "grind_profiling", True)
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    resp = client.post(
+        "/api/v1/grind-lab/analyze",
+        files={"image": ("g.png", _grind_image(), "image/png")},
+        data={"profile": "true"},
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["particle_count"] == 12
+    assert any(s["name"] == "clusters" for s in body["stages"])
+
+    profile_id = body["profile_id"]
+    assert [p["id"] for p in client.get("/api/v1/grind-lab/profiles").json()] == [profile_id]
+    assert client.get(f"/api/v1/grind-lab/profiles/{profile_id}").content
+    text = client.get(f"/api/v1/grind-lab/profiles/{profile_id}?format=text").text
+    assert "_find_and_measure_clusters" in text
+    assert client.get("/api/v1/grind-lab/profiles/..%2Fetc").status_code == 404
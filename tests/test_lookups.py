@@ -0,0 +1,23 @@
+from sqlalchemy import event
+
+from app.services import lookup_service
+
+
+def test_cached_lookups_skip_queries(db):
+    lookup_service.get_cached_lookups(db)
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.bind, "before_cursor_execute", listener)
+    try:
+        lookups = lookup_service.get_cached_lookups(db)
+    finally:
+        event.remove(db.bind, "before_cursor_execute", listener)
+    assert statements == []
+    assert "Pour Over" in [m.name for m in lookups["brew_methods"]]
+
+
+def test_added_lookup_appears_in_form(client):
+    assert "Cardamom" not in client.get("/brews/new").text
+    resp = client.post("/api/v1/lookups/flavor-notes", json={"name": "Cardamom"})
+    assert resp.status_code == 201
+    assert "Cardamom" in client.get("/brews/new").text
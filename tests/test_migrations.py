@@ -0,0 +1,92 @@
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+import app.models  # noqa: F401
+import app.models.inventory  # noqa: F401
+from app.bootstrap import SCHEMA_REVISION, check_schema, current_revision, migrate
+from app.database import Base
+
+
+def _script_head():
+    config = Config()
+    config.set_main_option("script_location", "alembic")
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def test_schema_revision_matches_head():
+    assert SCHEMA_REVISION == _script_head()
+
+
+def test_fresh_database_matches_models(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    migrate(engine)
+    check_schema(engine)
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        assert columns == {c.name for c in table.columns}, table.name
+
+
+def test_legacy_database_is_adopted(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE brews (id INTEGER PRIMARY KEY, brew_date DATE NOT NULL, "
+            "roaster VARCHAR(200) NOT NULL, bean_name VARCHAR(200) NOT NULL, "
+            "bean_amount_grams FLOAT NOT NULL, water_amount_ml FLOAT NOT NULL, "
+            "brew_method VARCHAR(100) NOT NULL)"
+        ))
+        conn.execute(text("CREATE TABLE coffee_inventory (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("CREATE TABLE brew_devices (id INTEGER PRIMARY KEY, name VARCHAR(100))"))
+        conn.execute(text("INSERT INTO brew_devices (name) VALUES ('AeroPress'), ('Chemex')"))
+    assert current_revision(engine) is None
+
+    migrate(engine)
+
+    inspector = inspect(engine)
+    assert "coffee_inventory" not in inspector.get_table_names()
+    assert "first_pour_grams" in {c["name"] for c in inspector.get_columns("brews")}
+    with engine.connect() as conn:
+        devices = {r[0] for r in conn.execute(text("SELECT name FROM brew_devices"))}
+    assert "AeroPress" not in devices and "V60 02" in devices
+    assert current_revision(engine) == SCHEMA_REVISION
+
+
+def test_bean_catalog_dedupes_existing_strings(tmp_path):
+    from alembic import command
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'beans.db'}")
+    config = Config()
+    config.set_main_option("script_location", "alembic")
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "0009")
+        for roaster, bean in [
+            ("Onyx", "Geometry"), ("Onyx", "Geometry"), ("onyx ", "geometry"), ("Sey", "Geometry"), ("  ", "  "),
+        ]:
+            conn.execute(text(
+                "INSERT INTO brews (brew_date, roaster, bean_name, bean_amount_grams, water_amount_ml, "
+                "brew_method, updated_at) VALUES ('2025-01-01', :r, :b, 18, 300, 'V60', '2025-01-01')"
+            ), {"r": roaster, "b": bean})
+        conn.execute(text(
+            "INSERT INTO bean_inventory (bean_name, roaster, initial_amount_grams, updated_at) VALUES "
+            "('Geometry', 'Onyx', 250, '2025-01-01'), ('GEOMETRY', 'onyx', 340, '2025-02-01'), "
+            "(' ', 'Sey', 100, '2025-01-01')"
+        ))
+        command.upgrade(config, "head")
+
+    with engine.connect() as conn:
+        beans = conn.execute(text("SELECT id, roaster, name FROM beans ORDER BY id")).all()
+        assert [(r.roaster, r.name) for r in beans] == [("Onyx", "Geometry"), ("Sey", "Geometry")]
+        brews = conn.execute(text("SELECT roaster, bean_name, bean_id FROM brews ORDER BY id")).all()
+        assert [tuple(r) for r in brews] == (
+            [("Onyx", "Geometry", beans[0].id)] * 3 + [("Sey", "Geometry", beans[1].id), ("  ", "  ", None)]
+        )
+        # Inventory entries for the same bean merge into the newer one, grams summed;
+        # a blank name gets no bean.
+        inventory = conn.execute(text(
+            "SELECT roaster, bean_name, initial_amount_grams, bean_id FROM bean_inventory ORDER BY id"
+        )).all()
+        assert [tuple(r) for r in inventory] == [("Onyx", "Geometry", 590, beans[0].id), ("Sey", " ", 100, None)]
+        assert conn.execute(text("SELECT entity FROM tombstones")).scalars().all() == ["inventory"]
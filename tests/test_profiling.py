@@ -0,0 +1,54 @@
+import logging
+
+from app.config import settings
+from app.profiling import reset_metrics
+
+
+def _metric_lines(client, name):
+    body = client.get("/metrics").text
+    return [line for line in body.splitlines() if line.startswith(name)]
+
+
+def test_metrics_record_route_latency_and_queries(client):
+    reset_metrics()
+    client.get("/api/v1/brews/")
+    client.get("/api/v1/brews/")
+
+    counts = _metric_lines(client, "coffee_http_request_duration_seconds_count")
+    assert 'coffee_http_request_duration_seconds_count{method="GET",route="/api/v1/brews/"} 2' in counts
+    queries = _metric_lines(client, 'coffee_db_queries_total{method="GET",route="/api/v1/brews/"}')
+    assert queries and int(queries[0].split()[-1]) >= 2
+
+
+def test_template_render_time_recorded(client):
+    reset_metrics()
+    assert client.get("/brews").status_code == 200
+    line = _metric_lines(client, 'coffee_template_render_seconds_total{method="GET",route="/brews"}')
+    assert float(line[0].split()[-1]) > 0
+
+
+def test_server_timing_header(client, monkeypatch):
+    monkeypatch.setattr(settings, "server_timing", True)
+    resp = client.get("/api/v1/brews/")
+    assert "db;dur=" in resp.headers["server-timing"]
+    monkeypatch.setattr(settings, "server_timing", False)
+    assert "server-timing" not in client.get("/api/v1/brews/").headers
+
+
+def test_query_budget_flags_n_plus_one(client, monkeypatch, caplog):
+    for name in ("A", "B", "C", "D"):
+        client.post("/api/v1/shelf", json={"bean_name": name, "initial_amount_grams": 250})
+    # The shelf's query count does not grow with the number of beans...
+    monkeypatch.setattr(settings, "query_budget", 4)
+    with caplog.at_level(logging.WARNING, logger="app.profiling"):
+        client.get("/api/v1/shelf")
+    assert not any("possible N+1" in r.getMessage() for r in caplog.records)
+    # ...but is still flagged when over a tighter budget.
+    monkeypatch.setattr(settings, "query_budget", 1)
+    client.post("/api/v1/shelf", json={"bean_name": "E", "initial_amount_grams": 250})
+    reset_metrics()
+    with caplog.at_level(logging.WARNING, logger="app.profiling"):
+        client.get("/api/v1/shelf")
+    assert any("possible N+1" in r.getMessage() for r in caplog.records)
+    over = _metric_lines(client, 'coffee_query_budget_exceeded_total{method="GET",route="/api/v1/shelf"}')
+    assert over[0].endswith(" 1")
@@ -1,3 +1,6 @@
+from tests.conftest import engine
+
+
 def _create_brew(client):
     resp = client.post("/api/v1/brews/", json={
         "brew_date": "2025-01-15",
@@ -50,3 +53,67 @@ def test_brew_cascade_deletes_rating(client):
     client.delete(f"/api/v1/brews/{brew_id}")
     resp = client.get(f"/api/v1/brews/{brew_id}/rating/")
     assert resp.status_code == 404
+
+
+def test_bulk_upsert_creates_and_replaces(client):
+    first, second = _create_brew(client), _create_brew(client)
+    client.post(f"/api/v1/brews/{first}/rating/", json={"overall_score": 5.0, "acidity": 2.0})
+    resp = client.post("/api/v1/ratings/bulk", json=[
+        {"brew_id": first, "overall_score": 9.0},
+        {"brew_id": second, "overall_score": 6.5},
+        {"brew_id": 999999, "overall_score": 7.0},
+    ])
+    assert resp.status_code == 207
+    assert [u["brew_id"] for u in resp.json()["upserted"]] == [first, second]
+    assert resp.json()["errors"][0]["index"] == 2
+    replaced = client.get(f"/api/v1/brews/{first}/rating/").json()
+    assert replaced["overall_score"] == 9.0
+    assert replaced["acidity"] is None
+    assert client.get(f"/api/v1/brews/{second}/rating/").json()["overall_score"] == 6.5
+
+
+
+def test_bulk_upsert_without_on_conflict(client, monkeypatch):
+    # Dialects other than SQLite and Postgres update and insert separately.
+    monkeypatch.setattr(engine.dialect, "name", "other")
+    first, second = _create_brew(client), _create_brew(client)
+    client.post(f"/api/v1/brews/{first}/rating/", json={"overall_score": 5.0, "acidity": 2.0})
+    resp = client.post("/api/v1/ratings/bulk", json=[
+        {"brew_id": first, "overall_score": 9.0},
+        {"brew_id": second, "overall_score": 6.5},
+    ])
+    assert resp.status_code == 200
+    replaced = client.get(f"/api/v1/brews/{first}/rating/").json()
+    assert (replaced["overall_score"], replaced["acidity"]) == (9.0, None)
+    assert client.get(f"/api/v1/brews/{second}/rating/").json()["overall_score"] == 6.5
+
+def test_bulk_upsert_computes_flavor_accuracy(client):
+    brew_id = client.post("/api/v1/brews/", json={
+        "brew_date": "2025-01-15", "roaster": "Onyx", "bean_name": "Test",
+        "bean_amount_grams": 18.0, "water_amount_ml": 300.0, "brew_method": "Pour Over",
+        "flavor_notes_expected": "Blueberry, Jasmine, Chocolate, Honey",
+    }).json()["id"]
+    resp = client.post("/api/v1/ratings/bulk", json=[{
+        "brew_id": brew_id, "overall_score": 8.0,
+        "flavor_notes_experienced": "jasmine, Honey, Lemon",
+    }])
+    assert resp.status_code == 200
+    assert client.get(f"/api/v1/brews/{brew_id}/rating/").json()["flavor_notes_accuracy"] == 50.0
+
+
+def test_bulk_upsert_idempotency_key(client):
+    brew_id = _create_brew(client)
+    batch = [{"brew_id": brew_id, "overall_score": 7.0}]
+    headers = {"Idempotency-Key": "device-1-batch-1"}
+    first = client.post("/api/v1/ratings/bulk", json=batch, headers=headers)
+    client.put(f"/api/v1/brews/{brew_id}/rating/", json={"overall_score": 3.0})
+
+    retry = client.post("/api/v1/ratings/bulk", json=batch, headers=headers)
+    assert retry.status_code == first.status_code == 200
+    assert retry.json() == first.json()
+    # The retry was not re-applied over the later edit.
+    assert client.get(f"/api/v1/brews/{brew_id}/rating/").json()["overall_score"] == 3.0
+
+    reused = client.post("/api/v1/ratings/bulk", json=[{"brew_id": brew_id, "overall_score": 9.0}],
+                         headers=headers)
+    assert reused.status_code == 422
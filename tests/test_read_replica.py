@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.database import PRIMARY_COOKIE, Base, RoutingSession, create_app_engine
+from app.main import stick_to_primary_after_write
+from app.models import Brew
+from app.routers import api_brews
+from tests.conftest import engine as primary_engine
+
+BREW = {
+    "brew_date": "2025-01-15",
+    "roaster": "Onyx",
+    "bean_name": "Geometry",
+    "bean_amount_grams": 18.0,
+    "water_amount_ml": 300.0,
+    "brew_method": "Pour Over",
+}
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    # Two SQLite files stand in for primary and replica; nothing replicates,
+    # so anything read back from the replica file is visibly stale.
+    replica = create_app_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(bind=replica)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(
+        autoflush=False, bind=primary_engine, class_=RoutingSession, replica=replica,
+    ))
+    app = FastAPI()
+    app.include_router(api_brews.router)
+    app.middleware("http")(stick_to_primary_after_write)
+    yield app
+    replica.dispose()
+
+
+def test_reads_go_to_replica_and_writes_to_primary(replica_app):
+    writer = TestClient(replica_app)
+    resp = writer.post("/api/v1/brews/", json=BREW)
+    assert resp.status_code == 201
+    assert PRIMARY_COOKIE in resp.cookies
+
+    # The writer reads its own write from the primary...
+    assert len(writer.get("/api/v1/brews/").json()) == 1
+    # ...while a client that has not written is served by the (stale) replica.
+    reader = TestClient(replica_app)
+    assert reader.get("/api/v1/brews/").json() == []
+    assert PRIMARY_COOKIE not in reader.get("/api/v1/brews/").cookies
+
+
+def test_write_on_read_session_goes_to_primary(tmp_path):
+    replica = create_app_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(bind=replica)
+    factory = sessionmaker(bind=primary_engine, class_=RoutingSession, replica=replica)
+    db = factory()
+    db.use_replica = True
+
+    assert db.get_bind() is replica
+    db.add(Brew(**{**BREW, "brew_date": date(2025, 1, 15)}))
+    db.commit()
+    assert db.use_replica is False
+    assert db.query(Brew).count() == 1
+    db.close()
+    replica.dispose()
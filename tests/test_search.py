@@ -0,0 +1,73 @@
+from app.services import search_service
+
+
+def _brew(client, **fields):
+    return client.post("/api/v1/brews/", json={
+        "brew_date": "2025-01-15", "roaster": "Onyx", "bean_name": "Geometry",
+        "bean_amount_grams": 18.0, "water_amount_ml": 300.0, "brew_method": "Pour Over",
+        **fields,
+    }).json()["id"]
+
+
+def _search(client, q, **params):
+    resp = client.get("/api/v1/brews/search", params={"q": q, **params})
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def test_search_ranks_highlights_and_follows_writes(client):
+    jasmine = _brew(client, bean_name="Jasmine Gesha", notes="Floral <b>and</b> tea-like")
+    noted = _brew(client, notes="A hint of jasmine at the end")
+    other = _brew(client, roaster="Sey", notes="Chocolate")
+
+    hits = _search(client, "jasmine")
+    # A bean-name match outranks one in the notes.
+    assert [h["id"] for h in hits] == [jasmine, noted]
+    assert hits[0]["rank"] > hits[1]["rank"]
+    assert hits[1]["highlight"] == "A hint of <mark>jasmine</mark> at the end"
+    assert [h["id"] for h in _search(client, "tea")] == [jasmine]
+    assert "&lt;b&gt;" in _search(client, "floral")[0]["highlight"]
+
+    # Prefix match on the last word, every word required.
+    assert {h["id"] for h in _search(client, "jasm")} == {jasmine, noted}
+    assert _search(client, "jasmine chocolate") == []
+
+    # Rating comments and experienced flavor notes are searchable.
+    client.post(f"/api/v1/brews/{other}/rating/", json={
+        "overall_score": 7.0, "comments": "Syrupy body", "flavor_notes_experienced": "Plum",
+    })
+    assert [h["id"] for h in _search(client, "syrupy")] == [other]
+    assert _search(client, "plum")[0]["overall_score"] == 7.0
+    client.put(f"/api/v1/brews/{other}/rating/", json={"comments": "Thin"})
+    assert _search(client, "syrupy") == []
+
+    client.put(f"/api/v1/brews/{noted}", json={"notes": "Bergamot"})
+    assert [h["id"] for h in _search(client, "jasmine")] == [jasmine]
+    client.delete(f"/api/v1/brews/{jasmine}")
+    assert _search(client, "jasmine") == []
+
+    assert [h["id"] for h in _search(client, "bergamot", roaster="sey")] == []
+    assert _search(client, "?!") == []
+    assert client.get("/api/v1/brews/search").status_code == 422
+
+
+def test_search_box_and_backfill(client, db):
+    brew_id = _brew(client, notes="Blueberry jam")
+    resp = client.get("/brews", params={"q": "blueberry"}, headers={"HX-Request": "true"})
+    assert f"/brews/{brew_id}" in resp.text and "<mark>Blueberry</mark>" in resp.text
+    assert "No brews match" in client.get("/brews", params={"q": "durian"}).text
+
+    db.execute(search_service.brew_search.delete())
+    db.commit()
+    assert _search(client, "blueberry") == []
+    search_service.ensure_index(db)
+    assert [h["id"] for h in _search(client, "blueberry")] == [brew_id]
+
+
+def test_best_match_wins_among_many_newer_ones(client):
+    best = _brew(client, bean_name="Jasmine Gesha", notes="Jasmine, jasmine tea")
+    client.post("/api/v1/brews/bulk", json=[{
+        "brew_date": "2025-01-16", "roaster": "Onyx", "bean_name": "Geometry", "bean_amount_grams": 18.0,
+        "water_amount_ml": 300.0, "brew_method": "Pour Over", "notes": f"Brew {i}, a long note with some jasmine",
+    } for i in range(600)])
+    assert _search(client, "jasmine", limit=1)[0]["id"] == best
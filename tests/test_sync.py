@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.models.tombstone import Tombstone
+from app.services import sync_service
+
+
+def _brew(client, name="Bean"):
+    return client.post("/api/v1/brews/", json={
+        "brew_date": "2025-01-15", "roaster": "Onyx", "bean_name": name,
+        "bean_amount_grams": 18.0, "water_amount_ml": 300.0, "brew_method": "Pour Over",
+    }).json()["id"]
+
+
+def _sync(client, since=None):
+    resp = client.get("/api/v1/sync", params={"since": since} if since else None)
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def test_full_then_delta(client, monkeypatch):
+    kept, dropped = _brew(client, "Kept"), _brew(client, "Dropped")
+    client.post(f"/api/v1/brews/{dropped}/rating/", json={"overall_score": 6.0})
+
+    first = _sync(client)
+    assert first["reset"] is True
+    assert [b["id"] for b in first["brews"]["upserted"]] == [kept, dropped]
+    assert len(first["ratings"]["upserted"]) == 1
+
+    # Everything above is older than the cursor once the overlap is gone.
+    monkeypatch.setattr(sync_service, "CURSOR_OVERLAP", timedelta(0))
+    assert _sync(client, first["cursor"])["brews"] == {"upserted": [], "deleted": []}
+
+    client.put(f"/api/v1/brews/{kept}", json={"notes": "Dialled finer"})
+    rating_id = first["ratings"]["upserted"][0]["id"]
+    client.delete(f"/api/v1/brews/{dropped}")
+
+    delta = _sync(client, first["cursor"])
+    assert delta["reset"] is False
+    assert [b["notes"] for b in delta["brews"]["upserted"]] == ["Dialled finer"]
+    assert delta["brews"]["deleted"] == [dropped]
+    assert delta["ratings"] == {"upserted": [], "deleted": [rating_id]}
+    assert delta["templates"]["upserted"] == [] and delta["inventory"]["upserted"] == []
+
+
+def test_stale_cursor_resets(client, db):
+    _brew(client)
+    old = sync_service.encode_cursor(datetime.utcnow() - timedelta(days=365))
+    assert _sync(client, old)["reset"] is True
+
+    cursor = _sync(client)["cursor"]
+    db.add(Tombstone(entity=sync_service.RESET, entity_id=0))
+    db.commit()
+    assert _sync(client, cursor)["reset"] is True
+
+
+def test_invalid_cursor(client):
+    assert client.get("/api/v1/sync", params={"since": "yesterday"}).status_code == 400
+
+
+def test_pages_share_the_first_cursor(client, monkeypatch):
+    monkeypatch.setattr(settings, "sync_page_size", 2)
+    ids = [_brew(client, name) for name in ("A", "B", "C")]
+    client.post(f"/api/v1/brews/{ids[0]}/rating/", json={"overall_score": 7.0})
+
+    pages = [_sync(client)]
+    while pages[-1]["next_page"]:
+        resp = client.get("/api/v1/sync", params={"page": pages[-1]["next_page"]})
+        pages.append(resp.json())
+    assert [sum(len(p[name]["upserted"]) for name in sync_service.ENTITIES) for p in pages] == [2, 2, 2, 1]
+    assert {p["cursor"] for p in pages} == {pages[0]["cursor"]} and all(p["reset"] for p in pages)
+    assert [b["id"] for p in pages for b in p["brews"]["upserted"]] == ids
+    assert len([r for p in pages for r in p["ratings"]["upserted"]]) == 1
+
+    assert client.get("/api/v1/sync", params={"page": "nope"}).status_code == 400